@@ -0,0 +1,87 @@
+# Contracts-per-second benchmark: scalar black_scholes functions one by one,
+# the fused scalar price_and_greeks kernel and the vectorized chain pricer.
+#
+#   python benchmarks/bench_chain.py --strikes 5000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lib'))
+
+import black_scholes as bs  # noqa: E402
+import vectorized as vbs  # noqa: E402
+
+SCALAR_FUNCTIONS = [
+    bs.call,
+    bs.bs_put,
+    bs.call_delta,
+    bs.call_gamma,
+    bs.call_vega,
+    bs.call_theta,
+    bs.call_rho,
+    bs.put_delta,
+    bs.put_theta,
+    bs.put_rho,
+]
+
+
+def make_chain(n_strikes, S=100.0, r=0.045, sigma=0.25, T=0.25):
+    K = np.linspace(0.5 * S, 1.5 * S, n_strikes)
+    return S, K, T, r, sigma
+
+
+def time_it(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_scalar(S, K, T, r, sigma):
+    for k in K:
+        for fn in SCALAR_FUNCTIONS:
+            fn(S, float(k), T, r, sigma)
+
+
+def bench_fused(S, K, T, r, sigma):
+    for k in K:
+        bs.price_and_greeks(S, float(k), T, r, sigma)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Scalar vs vectorized Black-Scholes throughput.'
+    )
+    parser.add_argument('--strikes', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument(
+        '--scalar-strikes',
+        type=int,
+        default=500,
+        help='scalar loop is slow, so time it on a smaller slice',
+    )
+    args = parser.parse_args()
+
+    S, K, T, r, sigma = make_chain(args.strikes)
+    scalar_K = K[: args.scalar_strikes]
+
+    scalar_time = time_it(lambda: bench_scalar(S, scalar_K, T, r, sigma), 1)
+    fused_time = time_it(lambda: bench_fused(S, scalar_K, T, r, sigma), 1)
+    vector_time = time_it(lambda: vbs.price_chain(S, K, T, r, sigma), args.repeat)
+
+    scalar_rate = len(scalar_K) / scalar_time
+    fused_rate = len(scalar_K) / fused_time
+    vector_rate = len(K) / vector_time
+    print(f'scalar     : {scalar_rate:>14,.0f} contracts/s ({len(scalar_K)} strikes)')
+    print(f'fused      : {fused_rate:>14,.0f} contracts/s ({len(scalar_K)} strikes)')
+    print(f'vectorized : {vector_rate:>14,.0f} contracts/s ({len(K)} strikes)')
+    print(f'speedup    : {vector_rate / scalar_rate:>14,.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# Full-book higher-order greeks: book_greeks (prices, first-order and
+# higher-order greeks from one set of intermediates), price_chain plus a
+# separate higher_greeks pass, and bump-and-reprice finite differences of the
+# first-order greeks, which is what the higher greeks replace.
+#
+#   python benchmarks/bench_greeks.py --contracts 200000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lib'))
+
+import vectorized as vbs  # noqa: E402
+
+
+# a book of contracts across underlyings, strikes and expiries
+def make_book(n, seed=1):
+    rng = np.random.default_rng(seed)
+    S = rng.uniform(20.0, 500.0, n)
+    K = S * rng.uniform(0.7, 1.3, n)
+    T = rng.uniform(1 / 365, 2.0, n)
+    sigma = rng.uniform(0.1, 0.8, n)
+    return S, K, T, 0.045, sigma
+
+
+def time_it(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def separate(S, K, T, r, sigma):
+    return vbs.price_chain(S, K, T, r, sigma), vbs.higher_greeks(S, K, T, r, sigma)
+
+
+# the same six sensitivities from central differences of delta, vega and gamma
+def finite_differences(S, K, T, r, sigma, h=1e-4):
+    def diff(fn, **bumps):
+        up = {'S': S, 'K': K, 'T': T, 'r': r, 'sigma': sigma}
+        down = dict(up)
+        for name, step in bumps.items():
+            up[name] = up[name] + step
+            down[name] = down[name] - step
+        return fn(**up) - fn(**down)
+
+    chain = vbs.price_chain(S, K, T, r, sigma)
+    return chain, (
+        diff(vbs.call_delta, sigma=h),
+        diff(vbs.call_vega, sigma=h),
+        diff(vbs.call_delta, T=h),
+        diff(vbs.call_gamma, S=h * S),
+        diff(vbs.call_gamma, sigma=h),
+        diff(vbs.call_gamma, T=h),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Higher-order greeks throughput over a full book.'
+    )
+    parser.add_argument('--contracts', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    book = make_book(args.contracts)
+    runs = [
+        ('book_greeks', lambda: vbs.book_greeks(*book)),
+        ('separate', lambda: separate(*book)),
+        ('finite diff', lambda: finite_differences(*book)),
+    ]
+    print(f'{"method":<12}{"time":>12}{"contracts/s":>16}')
+    times = {}
+    for name, fn in runs:
+        times[name] = time_it(fn, args.repeat)
+        print(
+            f'{name:<12}{1e3 * times[name]:>9,.1f} ms'
+            f'{args.contracts / times[name]:>16,.0f}'
+        )
+    print(f'speedup vs finite diff: {times["finite diff"] / times["book_greeks"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# Quotes-per-second benchmark for the batched implied volatility solver on an
+# SPX-sized chain.
+#
+#   python benchmarks/bench_implied_vol.py --quotes 20000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lib'))
+
+import vectorized as vbs  # noqa: E402
+from implied_vol import CONVERGED, implied_volatility  # noqa: E402
+
+
+def make_quotes(n, S=4500.0, r=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    K = S * rng.uniform(0.6, 1.4, n)
+    T = rng.choice([1, 2, 7, 14, 30, 60, 90, 180, 365, 730], n) / 365
+    sigma = 0.15 + 0.4 * np.abs(np.log(K / S))
+    option_type = np.where(K < S, 'put', 'call')
+    price = np.where(
+        option_type == 'call',
+        vbs.call(S, K, T, r, sigma),
+        vbs.bs_put(S, K, T, r, sigma),
+    )
+    return price, S, K, T, r, option_type, sigma
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Implied volatility throughput.')
+    parser.add_argument('--quotes', type=int, default=20000)
+    parser.add_argument('--tol', type=float, default=1e-8)
+    parser.add_argument('--max-iter', type=int, default=100)
+    args = parser.parse_args()
+
+    price, S, K, T, r, option_type, sigma = make_quotes(args.quotes)
+    start = time.perf_counter()
+    result = implied_volatility(
+        price, S, K, T, r, option_type, tol=args.tol, max_iter=args.max_iter
+    )
+    elapsed = time.perf_counter() - start
+
+    converged = result.status == CONVERGED
+    error = np.abs(result.sigma[converged] - sigma[converged])
+    print(f'quotes     : {args.quotes:>14,}')
+    print(f'converged  : {converged.mean():>14.2%}')
+    print(f'iterations : {result.iterations.max():>14}')
+    print(f'median err : {np.median(error):>14.2e}')
+    print(f'throughput : {args.quotes / elapsed:>14,.0f} quotes/s')
+
+
+if __name__ == '__main__':
+    main()
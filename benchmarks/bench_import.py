@@ -0,0 +1,58 @@
+# Cold-start benchmark for the pricing core: how long a fresh interpreter
+# takes to import black_scholes, and to get its first price, compared with
+# the eager scipy.stats + pandas imports the module used to pay up front.
+#
+#   python benchmarks/bench_import.py --runs 10
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+LIB = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib')
+
+SNIPPETS = {
+    'eager imports (old module)': (
+        'import scipy.stats, pandas, black_scholes',
+        '',
+    ),
+    'import black_scholes': ('import black_scholes', ''),
+    'import + first price': (
+        'import black_scholes',
+        'black_scholes.price_and_greeks(100.0, 105.0, 0.5, 0.05, 0.25)',
+    ),
+    'import vectorized': ('import vectorized', ''),
+}
+
+TEMPLATE = """
+import time
+start = time.perf_counter()
+{}
+{}
+print(time.perf_counter() - start)
+"""
+
+
+def cold_start(setup, work):
+    output = subprocess.run(
+        [sys.executable, '-c', TEMPLATE.format(setup, work)],
+        cwd=LIB,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(output.stdout.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pricing core cold start times.')
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    for name, (setup, work) in SNIPPETS.items():
+        times = [cold_start(setup, work) for _ in range(args.runs)]
+        print(f'{name:<28}: {1000 * statistics.median(times):>9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
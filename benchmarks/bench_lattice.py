@@ -0,0 +1,36 @@
+# Throughput benchmark for the batched binomial and trinomial pricers: lattice
+# steps per second and contracts per second for a batch of American puts.
+#
+#   python benchmarks/bench_lattice.py --contracts 1000 --steps 500
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lib'))
+
+from lattice import binomial, trinomial  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lattice pricer throughput.')
+    parser.add_argument('--contracts', type=int, default=1000)
+    parser.add_argument('--steps', type=int, default=500)
+    args = parser.parse_args()
+
+    K = np.linspace(80.0, 120.0, args.contracts)
+    for pricer in (binomial, trinomial):
+        start = time.perf_counter()
+        pricer(100.0, K, 0.5, 0.05, 0.25, 'put', steps=args.steps)
+        elapsed = time.perf_counter() - start
+        print(
+            f'{pricer.__name__:<10}: {args.steps / elapsed:>10,.0f} steps/s, '
+            f'{args.contracts / elapsed:>10,.0f} contracts/s '
+            f'({args.contracts} contracts x {args.steps} steps)'
+        )
+
+
+if __name__ == '__main__':
+    main()
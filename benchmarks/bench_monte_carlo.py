@@ -0,0 +1,50 @@
+# Paths-per-second benchmark for the Monte Carlo engine, serial and across a
+# process pool, with the standard error each configuration reaches.
+#
+#   python benchmarks/bench_monte_carlo.py --paths 2000000 --workers 0
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lib'))
+
+import monte_carlo as mc  # noqa: E402
+
+PAYOFFS = {
+    'asian call': mc.Asian(100.0),
+    'up-and-out call': mc.Barrier(100.0, 130.0),
+    'lookback call': mc.Lookback(),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Monte Carlo engine throughput.')
+    parser.add_argument('--paths', type=int, default=1_000_000)
+    parser.add_argument('--steps', type=int, default=100)
+    parser.add_argument('--block-size', type=int, default=50_000)
+    parser.add_argument(
+        '--workers', type=int, default=None, help='0 for one process per core'
+    )
+    args = parser.parse_args()
+
+    for name, payoff in PAYOFFS.items():
+        result = mc.price(
+            payoff,
+            100.0,
+            1.0,
+            0.05,
+            0.2,
+            n_paths=args.paths,
+            steps=args.steps,
+            block_size=args.block_size,
+            seed=0,
+            workers=args.workers,
+        )
+        print(
+            f'{name:<16}: {result.price:>9.4f} +/- {result.std_error:.4f}  '
+            f'{result.paths_per_second:>12,.0f} paths/s'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# Micro-benchmark and accuracy comparison of the normal CDF / PDF backends in
+# lib/normal.py: single-float calls, whole arrays, and the per-contract
+# price_and_greeks kernel on each backend.
+#
+#   python benchmarks/bench_normal.py
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+from scipy.special import log_ndtr
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lib'))
+
+import black_scholes as bs  # noqa: E402
+import normal  # noqa: E402
+
+
+def accuracy(name):
+    # reference values from log_ndtr, which stays accurate far into the tails
+    x = np.linspace(-37.0, 8.0, 4501)
+    reference = np.exp(log_ndtr(x))
+    with normal.use_backend(name):
+        cdf = np.asarray(normal.cdf(x), dtype=float)
+    return np.max(np.abs(cdf - reference) / reference)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Normal backend comparison.')
+    parser.add_argument('--number', type=int, default=20000)
+    parser.add_argument('--size', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    array = np.linspace(-5.0, 5.0, args.size)
+    print(
+        f'{"backend":<8}{"scalar cdf":>14}{"array cdf":>16}'
+        f'{"price_and_greeks":>20}{"max rel err":>14}'
+    )
+    for name in normal.BACKENDS:
+        with normal.use_backend(name):
+            normal.cdf(0.5)
+            scalar = timeit.timeit(lambda: normal.cdf(0.5), number=args.number)
+            kernel = timeit.timeit(
+                lambda: bs.price_and_greeks(100.0, 105.0, 0.5, 0.05, 0.25),
+                number=args.number,
+            )
+            vector = timeit.timeit(lambda: normal.cdf(array), number=1)
+        print(
+            f'{name:<8}'
+            f'{1e9 * scalar / args.number:>11,.0f} ns'
+            f'{1e9 * vector / args.size:>10,.1f} ns/elt'
+            f'{1e9 * kernel / args.number:>17,.0f} ns'
+            f'{accuracy(name):>14.1e}'
+        )
+
+
+if __name__ == '__main__':
+    main()
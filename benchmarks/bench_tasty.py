@@ -0,0 +1,64 @@
+# Per-report Tastytrade latency against the local stub server: a fresh login
+# plus sequential balance and position requests every report (what the bot
+# used to do) vs one long-lived client that reuses its session token and
+# fetches both concurrently.
+#
+#   python benchmarks/bench_tasty.py --latency 0.05 --reports 20
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from aiohttp.test_utils import TestServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'discord'))
+
+from stubs import tastytrade_app  # noqa: E402
+from tasty_async import AsyncTastytrade  # noqa: E402
+
+ACCOUNT = '5WT00001'
+
+
+async def fresh_login_report(base_url):
+    async with AsyncTastytrade('user', 'pass', base_url=base_url) as client:
+        await client.balances(ACCOUNT)
+        await client.positions(ACCOUNT)
+
+
+async def pooled_report(client):
+    await client.snapshot(ACCOUNT)
+
+
+async def timed(coroutine_factory, reports):
+    times = []
+    for _ in range(reports):
+        start = time.perf_counter()
+        await coroutine_factory()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+async def main(latency, reports):
+    app, _ = tastytrade_app(latency=latency)
+    server = TestServer(app)
+    await server.start_server()
+    base_url = str(server.make_url(''))
+    try:
+        old = await timed(lambda: fresh_login_report(base_url), reports)
+        async with AsyncTastytrade('user', 'pass', base_url=base_url) as client:
+            await client.balances(ACCOUNT)
+            new = await timed(lambda: pooled_report(client), reports)
+    finally:
+        await server.close()
+    print(f'fresh login, sequential : {1000 * old:>8.1f} ms/report')
+    print(f'pooled, concurrent      : {1000 * new:>8.1f} ms/report')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Tastytrade report latency.')
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--reports', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.reports))
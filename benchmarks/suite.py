@@ -0,0 +1,406 @@
+# Benchmark suite with machine-readable results and regression tracking.
+#
+# Times the pricing core (each black_scholes function on one contract, the
+# fused kernel over a chain and the vectorized chain pricer), the holiday
+# lookups the portfolio bot makes before every report, and end-to-end
+# report_balance / on_message handling against the local Tastytrade, OpenAI
+# and Discord stubs in discord/stubs.py. Results are written as JSON, and
+# compared with a baseline (a results file from an earlier run): a case whose
+# median is more than --threshold slower than its baseline is flagged and the
+# exit status is 1, so a CI job can fail on it. Baselines only compare on the
+# machine that recorded them, so none is committed: a missing baseline, or one
+# whose machine metadata differs from this run's, is reported and skipped
+# (exit status 0) until one is recorded here with --save-baseline.
+#
+#   python benchmarks/suite.py --save-baseline         # record the baseline
+#   python benchmarks/suite.py                         # compare with it
+#   python benchmarks/suite.py --group pricing --output pricing.json
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
+from types import SimpleNamespace
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'lib'))
+sys.path.insert(0, os.path.join(HERE, '..', 'discord'))
+
+import black_scholes as bs  # noqa: E402
+import vectorized as vbs  # noqa: E402
+
+GROUPS = ('pricing', 'holidays', 'bot')
+BASELINE = os.path.join(HERE, 'baseline.json')
+RESULTS = os.path.join(HERE, 'results.json')
+
+SCALAR_FUNCTIONS = [
+    'call',
+    'bs_put',
+    'call_delta',
+    'call_gamma',
+    'call_vega',
+    'call_theta',
+    'call_rho',
+    'put_delta',
+    'put_theta',
+    'put_rho',
+    'price_and_greeks',
+]
+CONTRACT = (100.0, 105.0, 0.5, 0.05, 0.25)
+
+
+def make_chain(n_strikes, S=100.0, r=0.045, sigma=0.25, T=0.25):
+    K = np.linspace(0.5 * S, 1.5 * S, n_strikes)
+    return S, K, T, r, sigma
+
+
+# A timed case: fn is a function, or a coroutine function for the bot cases,
+# called with no arguments; ops is how many operations one call performs, so
+# results are per operation (per contract, per lookup, per message).
+class Case:
+    def __init__(self, name, fn, ops=1):
+        self.name = name
+        self.fn = fn
+        self.ops = ops
+
+    async def sample(self, number):
+        start = time.perf_counter()
+        if asyncio.iscoroutinefunction(self.fn):
+            for _ in range(number):
+                await self.fn()
+        else:
+            for _ in range(number):
+                self.fn()
+        return (time.perf_counter() - start) / (number * self.ops)
+
+    # enough calls per sample to last min_time, then repeat samples
+    async def run(self, repeat, min_time):
+        number = 1
+        while True:
+            elapsed = await self.sample(number) * number * self.ops
+            if elapsed >= min_time or number >= 1_000_000:
+                break
+            number *= 10 if elapsed < min_time / 10 else 2
+        samples = [await self.sample(number) for _ in range(repeat)]
+        return {
+            'median': statistics.median(samples),
+            'min': min(samples),
+            'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            'number': number,
+            'repeat': repeat,
+            'ops': self.ops,
+        }
+
+
+def pricing_cases():
+    cases = [
+        Case(f'pricing.{name}.single', partial(getattr(bs, name), *CONTRACT))
+        for name in SCALAR_FUNCTIONS
+    ]
+    S, K, T, r, sigma = make_chain(1000)
+
+    def fused_chain():
+        for k in K:
+            bs.price_and_greeks(S, float(k), T, r, sigma)
+
+    cases.append(Case('pricing.price_and_greeks.chain_1k', fused_chain, len(K)))
+    for n in (1000, 100_000):
+        chain = make_chain(n)
+        label = f'{n // 1000}k'
+        cases.append(
+            Case(
+                f'pricing.price_chain.chain_{label}',
+                lambda c=chain: vbs.price_chain(*c),
+                n,
+            )
+        )
+        cases.append(
+            Case(
+                f'pricing.book_greeks.chain_{label}',
+                lambda c=chain: vbs.book_greeks(*c),
+                n,
+            )
+        )
+    return cases
+
+
+# the bot modules read their settings at import; point them at the stubs
+def import_bots(tmp):
+    for name, value in {
+        'ACCOUNT_NUMBER': '5WT00001',
+        'LOGIN': 'user',
+        'PASSWORD': 'pass',
+        'PORTFOLIO_CHANNEL': '1',
+        'NASSAU_GPT_CHANNEL': '2',
+        'OPENAI_API_KEY': 'stub',
+        'NEWS_STORE': os.path.join(tmp, 'news.sqlite3'),
+        'RESPONSE_CACHE': os.path.join(tmp, 'responses.sqlite3'),
+    }.items():
+        os.environ[name] = value
+    import nassau_gpt
+    import portfolio
+
+    return portfolio, nassau_gpt
+
+
+def holiday_cases(portfolio):
+    days = [date(1900, 1, 1) + timedelta(days=i) for i in range(200 * 365)]
+    thanksgiving = date(2023, 11, 23)
+
+    def sweep():
+        for day in days:
+            portfolio.stock_market_holiday(day)
+
+    return [
+        Case(
+            'holidays.stock_market_holiday.single',
+            lambda: portfolio.stock_market_holiday(thanksgiving),
+        ),
+        Case(
+            'holidays.get_holiday_name.single',
+            lambda: portfolio.get_holiday_name(thanksgiving),
+        ),
+        Case('holidays.stock_market_holiday.200_years', sweep, len(days)),
+    ]
+
+
+async def bot_cases(portfolio, nassau_gpt, base_url, reply_latency):
+    from stubs import STUB_BOT_ID, StubChannel, openai_client, openai_sync_client
+    from tasty_async import AsyncTastytrade
+
+    # report_balance: commentary from the OpenAI stub on the commentary
+    # thread pool, then the balance from the Tastytrade stub over HTTP
+    report_channel = StubChannel(portfolio.CHANNEL_ID)
+    portfolio.client = SimpleNamespace(get_channel=lambda _: report_channel)
+    portfolio.nassau_gpt, _ = openai_sync_client('Markets are open.', reply_latency)
+    portfolio.tasty = AsyncTastytrade('user', 'pass', base_url=base_url)
+    await portfolio.tasty.balances(portfolio.ACCOUNT_NUMBER)
+
+    # on_message: history, prompt, response cache and a streamed reply
+    client, _ = openai_client(
+        'Theta is the time decay of an option.', first_token_delay=reply_latency
+    )
+    nassau_gpt.bot = SimpleNamespace(user=SimpleNamespace(id=STUB_BOT_ID))
+    nassau_gpt.nassau_gpt = client
+    nassau_gpt.replies.client = client
+
+    # each case posts to a channel of its own; question() is the next message
+    def chat(question):
+        channel = StubChannel(nassau_gpt.CHANNEL_ID)
+
+        async def on_message():
+            await nassau_gpt.on_message(channel.post(question()))
+
+        return on_message
+
+    return [
+        Case('bot.report_balance', portfolio.report_balance),
+        # every question new, so every reply comes from the model
+        Case(
+            'bot.on_message',
+            chat(lambda: f'what is the outlook for {uuid.uuid4().hex}'),
+        ),
+        # the same question again, answered from the response cache
+        Case('bot.on_message.cached', chat(lambda: 'what is theta')),
+    ]
+
+
+async def run_cases(cases, args, results):
+    for case in cases:
+        results[case.name] = await case.run(args.repeat, args.min_time)
+        print(f'{case.name:<42}{format_time(results[case.name]["median"]):>12}')
+
+
+async def run(args):
+    results = {}
+    if 'pricing' in args.group:
+        await run_cases(pricing_cases(), args, results)
+    if 'holidays' in args.group or 'bot' in args.group:
+        from aiohttp.test_utils import TestServer
+        from stubs import tastytrade_app
+
+        with tempfile.TemporaryDirectory() as tmp:
+            portfolio, nassau_gpt = import_bots(tmp)
+            if 'holidays' in args.group:
+                await run_cases(holiday_cases(portfolio), args, results)
+            if 'bot' in args.group:
+                app, _ = tastytrade_app(latency=args.latency)
+                server = TestServer(app)
+                await server.start_server()
+                try:
+                    cases = await bot_cases(
+                        portfolio,
+                        nassau_gpt,
+                        str(server.make_url('')),
+                        args.latency,
+                    )
+                    for case in cases:
+                        # a fresh channel history for every case
+                        nassau_gpt.history.invalidate()
+                        await run_cases([case], args, results)
+                    await nassau_gpt.context.drain()
+                finally:
+                    await portfolio.tasty.close()
+                    await server.close()
+                    portfolio.commentary.close()
+                    nassau_gpt.response_cache.close()
+    return results
+
+
+def format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e3), ('us', 1e6), ('ns', 1e9)):
+        if seconds * scale >= 1:
+            return f'{seconds * scale:,.1f} {unit}'
+    return f'{seconds * 1e9:,.2f} ns'
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=HERE,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpus': os.cpu_count(),
+    }
+
+
+# metadata that has to match for timings to be comparable
+MACHINE_KEYS = ('python', 'numpy', 'platform', 'machine', 'processor', 'cpus')
+
+
+def same_machine(meta, baseline_meta):
+    return all(meta.get(key) == baseline_meta.get(key) for key in MACHINE_KEYS)
+
+
+# ratios of median to baseline median, and the cases slower than threshold
+def compare(results, baseline, threshold):
+    changes = {}
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        ratio = result['median'] / reference['median']
+        changes[name] = ratio
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return changes, regressions
+
+
+def print_comparison(results, baseline, changes, regressions):
+    print(f'\n{"case":<42}{"median":>12}{"baseline":>12}{"change":>10}')
+    for name, result in results.items():
+        if name not in changes:
+            print(f'{name:<42}{format_time(result["median"]):>12}{"new":>12}')
+            continue
+        flag = '  SLOWER' if name in regressions else ''
+        print(
+            f'{name:<42}{format_time(result["median"]):>12}'
+            f'{format_time(baseline[name]["median"]):>12}'
+            f'{changes[name] - 1:>+10.0%}{flag}'
+        )
+
+
+def write_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    print(f'\nwrote {len(report["results"])} results to {path}')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Pricing, holiday and bot-latency benchmarks with a baseline.'
+    )
+    parser.add_argument(
+        '--group',
+        nargs='+',
+        choices=GROUPS,
+        default=list(GROUPS),
+        help='benchmark groups to run',
+    )
+    parser.add_argument('--repeat', type=int, default=7, help='samples per case')
+    parser.add_argument(
+        '--min-time', type=float, default=0.05, help='seconds per sample, at least'
+    )
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=0.0,
+        help='seconds every Tastytrade and OpenAI stub response takes',
+    )
+    parser.add_argument('--output', default=RESULTS, help='results JSON to write')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline JSON')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.25,
+        help='flag cases this much slower than the baseline (0.25 = 25%%)',
+    )
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='write the results to the baseline instead of comparing with it',
+    )
+    args = parser.parse_args()
+
+    # before the bot modules set up INFO logging for every message
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run(args))
+    report = {'meta': metadata(), 'results': results}
+    if args.save_baseline:
+        write_report(report, args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        write_report(report, args.output)
+        print(f'no baseline at {args.baseline}; record one with --save-baseline')
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if not same_machine(report['meta'], baseline['meta']):
+        write_report(report, args.output)
+        print(
+            f'baseline at {args.baseline} was recorded on another machine or '
+            'environment; record one here with --save-baseline'
+        )
+        return 0
+    changes, regressions = compare(results, baseline['results'], args.threshold)
+    report['baseline'] = {'meta': baseline['meta'], 'changes': changes}
+    report['regressions'] = regressions
+    write_report(report, args.output)
+    print_comparison(results, baseline['results'], changes, regressions)
+    if regressions:
+        print(
+            f'\n{len(regressions)} case(s) over {args.threshold:.0%} slower than '
+            f'the baseline from {baseline["meta"]["created"]}: {", ".join(regressions)}'
+        )
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+# LLM commentary for the scheduled reports, kept off the event loop.
+#
+# generators maps a slot name ('prelude', 'midday', ...) to a blocking
+# function that returns the text for that slot (e.g. one that calls the
+# synchronous OpenAI client). Generation always runs on a small bounded
+# thread pool. prefetch(slot) is scheduled a few minutes before the slot and
+# leaves the text in a cache; get(slot) at send time takes the cached text if
+# it is younger than ttl, joins a prefetch that is still running, or
+# generates on the spot, and gives up with the fallback after timeout seconds
+# so a slow model never holds up the report.
+class Commentary:
+    def __init__(self, generators, ttl=15 * 60, timeout=20.0, max_workers=2):
+        self.generators = generators
+        self.ttl = ttl
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='commentary'
+        )
+        self._cache = {}
+        self._pending = {}
+
+    def _start(self, slot):
+        task = self._pending.get(slot)
+        if task is None:
+            task = asyncio.ensure_future(self._generate(slot))
+            self._pending[slot] = task
+        return task
+
+    async def _generate(self, slot):
+        loop = asyncio.get_running_loop()
+        try:
+            text = await loop.run_in_executor(self._executor, self.generators[slot])
+            self._cache[slot] = (text, time.monotonic())
+            return text
+        finally:
+            self._pending.pop(slot, None)
+
+    async def prefetch(self, slot):
+        try:
+            await self._start(slot)
+        except Exception as ex:
+            logger.error('Error pre-generating %s commentary: %s', slot, ex)
+
+    def _take_cached(self, slot):
+        entry = self._cache.pop(slot, None)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            return entry
+        return None
+
+    async def get(self, slot, fallback=None):
+        entry = self._take_cached(slot)
+        if entry is not None:
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        try:
+            # shield, so a timed-out generation still lands in the cache
+            await asyncio.wait_for(asyncio.shield(self._start(slot)), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning('%s commentary took over %.0fs', slot, self.timeout)
+            return fallback
+        except Exception as ex:
+            logger.error('Error generating %s commentary: %s', slot, ex)
+            return fallback
+        entry = self._take_cached(slot)
+        return entry[0] if entry is not None else fallback
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from llm_replies import Samples
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PREFIX = 'Summary of the earlier conversation: '
+
+
+# tiktoken when it is installed, otherwise about four characters a token
+def _token_counter(model):
+    try:
+        import tiktoken
+    except ImportError:
+        return lambda text: len(text) // 4 + 1
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding('cl100k_base')
+    return lambda text: len(encoding.encode(text))
+
+
+# Prompt for a NassauGPT reply under a token budget.
+#
+# build() takes the channel's cached history (history_cache.Entry objects,
+# oldest first) and fills the prompt newest-first until the next message
+# would go over budget, counting the system prompt and a per-message overhead.
+# The newest message is always kept, cut down if it alone is over budget.
+# Token counts are cached per message ID and recounted only when the message
+# is edited.
+#
+# With a summarizer (an async function of the previous summary and the newly
+# evicted turns that returns the new summary), evicted turns are folded into a
+# rolling summary per channel. The summary is updated in the background and
+# the prompt uses the latest finished one, so summarizing never delays a
+# reply; summary_budget tokens of the budget are set aside for it.
+#
+# prompt_tokens and build_time keep per-request metrics.
+class ContextBuilder:
+    def __init__(
+        self,
+        budget=3000,
+        model='gpt-4',
+        summarizer=None,
+        summary_budget=300,
+        message_overhead=4,
+        cache_size=10_000,
+    ):
+        self.budget = budget
+        self.summarizer = summarizer
+        self.summary_budget = summary_budget if summarizer else 0
+        self.message_overhead = message_overhead
+        self.cache_size = cache_size
+        self.prompt_tokens = Samples()
+        self.build_time = Samples()
+        self.count_hits = 0
+        self.count_misses = 0
+        self._count = _token_counter(model)
+        self._counts = OrderedDict()
+        self._summaries = {}
+        self._summarizing = {}
+
+    def tokens(self, text):
+        return self._count(text) + self.message_overhead
+
+    def message_tokens(self, entry):
+        cached = self._counts.get(entry.id)
+        if cached is not None and cached[0] == entry.content:
+            self.count_hits += 1
+            self._counts.move_to_end(entry.id)
+            return cached[1]
+        self.count_misses += 1
+        tokens = self.tokens(entry.content)
+        self._counts[entry.id] = (entry.content, tokens)
+        if len(self._counts) > self.cache_size:
+            self._counts.popitem(last=False)
+        return tokens
+
+    def summary(self, channel_id):
+        return self._summaries.get(channel_id, ('', 0))[0]
+
+    def build(self, channel_id, system_prompt, entries, role):
+        start = time.perf_counter()
+        summary = self.summary(channel_id)
+        system_tokens = self.tokens(str(system_prompt))
+        summary_tokens = self.tokens(SUMMARY_PREFIX + summary) if summary else 0
+        available = (
+            self.budget - system_tokens - max(summary_tokens, self.summary_budget)
+        )
+
+        kept = []
+        for entry in reversed(entries):
+            tokens = self.message_tokens(entry)
+            if tokens > available and kept:
+                break
+            kept.append((entry, tokens))
+            available -= tokens
+        kept.reverse()
+        evicted = entries[: len(entries) - len(kept)]
+
+        messages = [{'role': 'system', 'content': system_prompt}]
+        if summary:
+            messages.append({'role': 'system', 'content': SUMMARY_PREFIX + summary})
+        prompt_tokens = system_tokens + summary_tokens
+        for entry, tokens in kept:
+            content = entry.content
+            if available < 0:
+                # only the newest message is left and it is too long on its own
+                allowed = max(tokens + available, 0)
+                content = content[: len(content) * allowed // tokens]
+                tokens = allowed
+            messages.append({'role': role(entry), 'content': content})
+            prompt_tokens += tokens
+
+        self.prompt_tokens.record(prompt_tokens)
+        self.build_time.record(time.perf_counter() - start)
+        logger.info(
+            'Prompt of ~%d tokens: %d messages kept, %d evicted',
+            prompt_tokens,
+            len(kept),
+            len(evicted),
+        )
+        if evicted and self.summarizer is not None:
+            self._summarize_later(channel_id, evicted, role)
+        return messages
+
+    def _summarize_later(self, channel_id, evicted, role):
+        summarized_up_to = self._summaries.get(channel_id, ('', 0))[1]
+        turns = [entry for entry in evicted if entry.id > summarized_up_to]
+        task = self._summarizing.get(channel_id)
+        if turns and (task is None or task.done()):
+            self._summarizing[channel_id] = asyncio.ensure_future(
+                self._summarize(channel_id, turns, role)
+            )
+
+    async def _summarize(self, channel_id, turns, role):
+        previous = self.summary(channel_id)
+        try:
+            summary = await self.summarizer(
+                previous,
+                [{'role': role(entry), 'content': entry.content} for entry in turns],
+            )
+        except Exception as ex:
+            logger.error('Error summarizing the conversation: %s', ex)
+            return
+        self._summaries[channel_id] = (summary.strip(), turns[-1].id)
+
+    # wait for background summaries, e.g. in tests or before shutting down
+    async def drain(self):
+        pending = [task for task in self._summarizing.values() if not task.done()]
+        if pending:
+            await asyncio.gather(*pending)
@@ -0,0 +1,102 @@
+from collections import deque
+from dataclasses import dataclass
+
+
+@dataclass
+class Entry:
+    __slots__ = ('id', 'author_id', 'author_bot', 'content')
+    id: int
+    author_id: int
+    author_bot: bool
+    content: str
+
+    @classmethod
+    def from_message(cls, message):
+        return cls(message.id, message.author.id, message.author.bot, message.content)
+
+
+class _Buffer:
+    __slots__ = ('entries', 'warm')
+
+    def __init__(self, limit):
+        self.entries = deque(maxlen=limit)
+        self.warm = False
+
+
+# Recent messages per channel, kept from the gateway events the bot already
+# receives, so a reply does not need a channel.history() round trip first.
+#
+# add() on every message (the bot's own replies included), edit() and
+# delete() on the raw edit / delete events. A channel's buffer is filled from
+# the API the first time it is read and again after invalidate(), which the
+# bot calls when it loses the gateway and may have missed events. Deleting
+# from a full buffer also forces a refill, since the message that slides back
+# into the window is not cached.
+class ChannelHistory:
+    def __init__(self, limit=15):
+        self.limit = limit
+        self.hits = 0
+        self.backfills = 0
+        self._channels = {}
+
+    def _buffer(self, channel_id):
+        buffer = self._channels.get(channel_id)
+        if buffer is None:
+            buffer = self._channels[channel_id] = _Buffer(self.limit)
+        return buffer
+
+    def add(self, message):
+        self._buffer(message.channel.id).entries.append(Entry.from_message(message))
+
+    def edit(self, channel_id, message_id, content):
+        buffer = self._channels.get(channel_id)
+        if buffer is None:
+            return
+        for entry in buffer.entries:
+            if entry.id == message_id:
+                entry.content = content
+                return
+
+    def delete(self, channel_id, message_ids):
+        buffer = self._channels.get(channel_id)
+        if buffer is None:
+            return
+        message_ids = set(message_ids)
+        kept = [entry for entry in buffer.entries if entry.id not in message_ids]
+        if len(kept) < len(buffer.entries):
+            if len(buffer.entries) == self.limit:
+                buffer.warm = False
+            buffer.entries = deque(kept, maxlen=self.limit)
+
+    # forget that a channel (or every channel) is up to date
+    def invalidate(self, channel_id=None):
+        buffers = (
+            self._channels.values()
+            if channel_id is None
+            else [self._channels.get(channel_id)]
+        )
+        for buffer in buffers:
+            if buffer is not None:
+                buffer.warm = False
+
+    async def _backfill(self, channel, buffer):
+        fetched = [
+            Entry.from_message(message)
+            async for message in channel.history(limit=self.limit)
+        ]
+        fetched.reverse()
+        newest = fetched[-1].id if fetched else 0
+        # keep anything the gateway delivered while the request was in flight
+        arrived = [entry for entry in buffer.entries if entry.id > newest]
+        buffer.entries = deque(fetched + arrived, maxlen=self.limit)
+        buffer.warm = True
+        self.backfills += 1
+
+    # the channel's recent messages, oldest first
+    async def messages(self, channel):
+        buffer = self._buffer(channel.id)
+        if buffer.warm:
+            self.hits += 1
+        else:
+            await self._backfill(channel, buffer)
+        return list(buffer.entries)
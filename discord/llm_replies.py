@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+DISCORD_LIMIT = 2000
+ERROR_REPLY = 'Sorry, I encountered a server-side issue while processing your message. Please give me a moment.'
+
+
+# split text into pieces of at most limit characters, preferring to break at
+# a newline, then after a sentence, then at a space
+def split_message(text, limit=DISCORD_LIMIT):
+    chunks = []
+    while len(text) > limit:
+        window = text[:limit]
+        cut = window.rfind('\n')
+        if cut <= 0:
+            cut = window.rfind('. ') + 1
+        if cut <= 0:
+            cut = window.rfind(' ')
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    chunks.append(text)
+    return chunks
+
+
+# the most recent measurements of something, e.g. a latency, and percentiles
+class Samples:
+    def __init__(self, size=1000):
+        self.samples = deque(maxlen=size)
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, q):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(q / 100 * len(ordered)), len(ordered) - 1)]
+
+    def summary(self):
+        return {
+            'count': len(self.samples),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+        }
+
+
+# Streamed chat completion replies for NassauGPT.
+#
+# client is an openai.AsyncOpenAI, so the event loop (and the gateway
+# heartbeat) never waits on the model. At most max_concurrent completions run
+# at once. Replies are coalesced per author in each channel: while a reply to
+# someone is being written, their newer messages there wait, and only the
+# latest of them is answered (its conversation already contains the others).
+# Different authors in one channel each get their own reply, concurrently. The reply is posted on the
+# first token and edited at most every edit_interval seconds as tokens
+# arrive; text past Discord's 2,000 characters continues in a new message.
+#
+# With a response_cache.ResponseCache, a repeated question is answered from
+# the cache without calling the model, and every completed answer is stored.
+#
+# first_token measures time from the user's message to the first visible
+# token of the reply, and completion the time to the final edit.
+class ReplyStreamer:
+    def __init__(
+        self,
+        client,
+        model,
+        max_concurrent=4,
+        edit_interval=1.0,
+        limit=DISCORD_LIMIT,
+        cache=None,
+        **params,
+    ):
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.edit_interval = edit_interval
+        self.limit = limit
+        self.params = params
+        self.first_token = Samples()
+        self.completion = Samples()
+        self.coalesced = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._pending = {}
+
+    # answer message with the completion of build_messages(message); returns
+    # once its author has no more replies queued in this channel
+    async def submit(self, message, build_messages):
+        key = (message.channel.id, message.author.id)
+        queued = (message, time.perf_counter())
+        if key in self._pending:
+            if self._pending[key] is not None:
+                self.coalesced += 1
+            self._pending[key] = queued
+            return
+        self._pending[key] = None
+        try:
+            while queued is not None:
+                message, received = queued
+                try:
+                    await self._reply(message, build_messages, received)
+                except Exception as ex:
+                    logger.error('An error occurred: %s', ex, exc_info=True)
+                    await message.channel.send(ERROR_REPLY)
+                queued = self._pending[key]
+                self._pending[key] = None
+        finally:
+            del self._pending[key]
+
+    async def _reply(self, message, build_messages, received):
+        messages = await build_messages(message)
+        writer = _ReplyWriter(message, self.limit)
+        if self.cache is not None:
+            writer.text = await self.cache.lookup(messages) or ''
+            if writer.text:
+                await writer.flush(final=True)
+                latency = time.perf_counter() - received
+                self.first_token.record(latency)
+                self.completion.record(latency)
+                logger.info('Cached reply after %.2fs', latency)
+                return
+        async with self._semaphore:
+            async with message.channel.typing():
+                requested = time.perf_counter()
+                stream = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    stream=True,
+                    **self.params,
+                )
+                reply = []
+                async for chunk in stream:
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    reply.append(chunk.choices[0].delta.content)
+                    writer.text += reply[-1]
+                    if not writer.shown_any:
+                        await writer.flush()
+                        if writer.shown_any:
+                            latency = time.perf_counter() - received
+                            self.first_token.record(latency)
+                            logger.info('First reply token after %.2fs', latency)
+                    elif time.perf_counter() - writer.flushed >= self.edit_interval:
+                        await writer.flush()
+            await writer.flush(final=True)
+        self.completion.record(time.perf_counter() - received)
+        if self.cache is not None:
+            await self.cache.store(
+                messages, ''.join(reply).strip(), time.perf_counter() - requested
+            )
+
+
+# the Discord messages making up one streamed reply
+class _ReplyWriter:
+    def __init__(self, message, limit):
+        self.message = message
+        self.limit = limit
+        self.text = ''
+        self.sent = None
+        self.shown = ''
+        self.shown_any = False
+        self.flushed = 0.0
+
+    async def flush(self, final=False):
+        text = self.text.strip() if final else self.text
+        if not text.strip() or text == self.shown:
+            return
+        chunks = split_message(text, self.limit)
+        # finish the current message and start new ones for the overflow
+        for chunk in chunks[:-1]:
+            await self._show(chunk)
+            self.sent, self.shown = None, ''
+        self.text = chunks[-1]
+        await self._show(chunks[-1])
+        self.flushed = time.perf_counter()
+
+    async def _show(self, text):
+        if self.sent is None:
+            self.sent = await self.message.reply(text)
+        elif text != self.shown:
+            await self.sent.edit(content=text)
+        self.shown = text
+        self.shown_any = True
@@ -1,10 +1,14 @@
 import os
 import discord
 from discord.ext import commands
-from openai import OpenAI
+from openai import AsyncOpenAI
 import logging
 
 from dotenv import load_dotenv
+from history_cache import ChannelHistory
+from llm_replies import ReplyStreamer
+from context_builder import ContextBuilder
+from response_cache import ResponseCache
 
 load_dotenv()
 
@@ -14,9 +18,39 @@ logger = logging.getLogger(__name__)
 intents = discord.Intents.default()
 intents.message_content = True
 bot = commands.Bot(command_prefix='!', intents=intents)
-nassau_gpt = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+nassau_gpt = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
 system_prompt = ()  # Enter your system prompt here
+CHANNEL_ID = int(os.getenv('NASSAU_GPT_CHANNEL'))
+MODEL = 'gpt-4-1106-preview'
+SUMMARY_MODEL = os.getenv('SUMMARY_MODEL', 'gpt-3.5-turbo-1106')
+# Recent messages kept from gateway events instead of refetched per reply;
+# how many of them make it into the prompt is decided by the token budget
+history = ChannelHistory(limit=int(os.getenv('HISTORY_LIMIT', '50')))
+summary_prompt = (
+    'Summarize this Discord conversation between users and NassauGPT in a few '
+    'sentences, keeping names, tickers, numbers and open questions. Fold in '
+    'the previous summary if there is one.'
+)
+# Answers to repeated questions, kept across restarts; RESPONSE_CACHE_FUZZY
+# (a difflib ratio such as 0.9) turns on near-duplicate matching
+response_cache = ResponseCache(
+    os.getenv('RESPONSE_CACHE', 'nassau_gpt_cache.sqlite3'),
+    ttl=float(os.getenv('RESPONSE_CACHE_TTL', str(7 * 24 * 60 * 60))),
+    max_entries=int(os.getenv('RESPONSE_CACHE_SIZE', '5000')),
+    fuzzy=float(os.getenv('RESPONSE_CACHE_FUZZY', '0')) or None,
+)
+# Streamed replies, at most MAX_CONCURRENT_REPLIES completions at a time
+replies = ReplyStreamer(
+    nassau_gpt,
+    MODEL,
+    max_concurrent=int(os.getenv('MAX_CONCURRENT_REPLIES', '4')),
+    cache=response_cache,
+    max_tokens=500,
+    temperature=0.75,
+    frequency_penalty=0.3,
+    presence_penalty=0.3,
+)
 
 
 @bot.event
@@ -24,68 +58,78 @@ async def on_ready():
     logger.info('NassauGPT is online!')
 
 
+@bot.event
+async def on_disconnect():
+    # events may be missed until the gateway is back, so refill on next read
+    history.invalidate()
+
+
+@bot.event
+async def on_raw_message_edit(payload):
+    if payload.channel_id == CHANNEL_ID and 'content' in payload.data:
+        history.edit(payload.channel_id, payload.message_id, payload.data['content'])
+
+
+@bot.event
+async def on_raw_message_delete(payload):
+    if payload.channel_id == CHANNEL_ID:
+        history.delete(payload.channel_id, [payload.message_id])
+
+
+@bot.event
+async def on_raw_bulk_message_delete(payload):
+    if payload.channel_id == CHANNEL_ID:
+        history.delete(payload.channel_id, payload.message_ids)
+
+
+async def summarize(previous_summary, turns):
+    messages = [{'role': 'system', 'content': summary_prompt}]
+    if previous_summary:
+        messages.append(
+            {'role': 'system', 'content': f'Previous summary: {previous_summary}'}
+        )
+    response = await nassau_gpt.chat.completions.create(
+        model=SUMMARY_MODEL, messages=messages + turns, max_tokens=250
+    )
+    return response.choices[0].message.content
+
+
+# Prompt is filled newest-first up to CONTEXT_TOKENS, with older turns
+# folded into a rolling summary
+context = ContextBuilder(
+    budget=int(os.getenv('CONTEXT_TOKENS', '3000')),
+    model=MODEL,
+    summarizer=summarize if os.getenv('CONTEXT_SUMMARY', '1') == '1' else None,
+)
+
+
+def role(msg):
+    return 'assistant' if msg.author_id == bot.user.id else 'user'
+
+
+async def conversation(message):
+    # Previous messages, from the cache
+    prev_messages = await history.messages(message.channel)
+    prev_messages = [
+        msg
+        for msg in prev_messages
+        if not msg.author_bot or msg.author_id == bot.user.id
+    ]
+    return context.build(message.channel.id, system_prompt, prev_messages, role)
+
+
 @bot.event
 async def on_message(message):
-    if message.author.bot:
+    if message.channel.id != CHANNEL_ID:
         return
-    if message.channel.id != int(os.getenv('NASSAU_GPT_CHANNEL')):
+    history.add(message)
+    if message.author.bot:
         return
     if message.content.startswith('!'):
         return
 
-    try:
-        async with message.channel.typing():
-            # Retrieve previous messages
-            prev_messages = [msg async for msg in message.channel.history(limit=15)]
-            prev_messages.reverse()
-
-            conversation_log = [
-                {
-                    'role': 'system',
-                    'content': system_prompt,
-                }
-            ]
-
-            for msg in prev_messages:
-                if msg.author.bot and msg.author.id != bot.user.id:
-                    continue
-                conversation_log.append(
-                    {
-                        'role': 'assistant' if msg.author.id == bot.user.id else 'user',
-                        'content': msg.content,
-                    }
-                )
-
-            response = nassau_gpt.chat.completions.create(
-                model='gpt-4-1106-preview',
-                messages=conversation_log,
-                max_tokens=500,
-                temperature=0.75,
-                frequency_penalty=0.3,
-                presence_penalty=0.3,
-            )
-
-            reply_content = response.choices[0].message.content.strip()
-
-            # Truncation logic to coalesce response with Discord's message limit
-            if len(reply_content) > 2000:
-                # Find a natural ending point (like a full stop) before the limit
-                end_index = reply_content.rfind('.', 0, 1997)
-                if end_index == -1:
-                    # If no natural ending, truncate normally
-                    truncated_reply_content = reply_content[:1997] + '...'
-                else:
-                    truncated_reply_content = reply_content[: end_index + 1]
-            else:
-                truncated_reply_content = reply_content
-
-        await message.reply(truncated_reply_content)
-
-    except Exception as ex:
-        logger.error(f'An error occurred: {ex}', exc_info=True)
-        await message.channel.send(
-            +'Sorry, I encountered a server-side issue while processing your message. Please give me a moment.'
-        )
+    await replies.submit(message, conversation)
 
 
-bot.run(os.getenv('NASSAU_GPT_TOKEN'))
+if __name__ == '__main__':
+    bot.run(os.getenv('NASSAU_GPT_TOKEN'))
@@ -1,31 +1,45 @@
 import os
+import argparse
+import time
 from dotenv import load_dotenv
 import tweepy
 import logging
+from news_digest import FINANCE_QUERY
+from news_ingest import NewsIngestor, NewsStore
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-load_dotenv()
 
-bearer_token = os.getenv('TWITTER_BEARER_TOKEN')
-client = tweepy.Client(bearer_token=bearer_token)
-query = 'nasa -is:retweet -is:reply'
-tweets = client.search_recent_tweets(
-    query=query, tweet_fields=['context_annotations', 'created_at'], max_results=10
-)
-attributes = [[tweet.text, tweet.created_at, tweet.id] for tweet in tweets.data]
 
-for attribute in attributes:
-    print(attribute)
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Fetch new tweets for a query into a local SQLite store.'
+    )
+    parser.add_argument('--query', default=FINANCE_QUERY)
+    parser.add_argument('--store', default=os.getenv('NEWS_STORE', 'news.sqlite3'))
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=None,
+        help='keep polling every this many seconds',
+    )
+    args = parser.parse_args(argv)
 
-# query = '"#FinanceNews OR #StockMarket OR #EarningsReport -filter:retweets AND -filter:replies AND -filter:links"'
-# num_tweets = 10
+    load_dotenv()
+    client = tweepy.Client(bearer_token=os.getenv('TWITTER_BEARER_TOKEN'))
+    store = NewsStore(args.store)
+    ingestor = NewsIngestor(client, store, args.query)
+    try:
+        while True:
+            stats = ingestor.poll()
+            for tweet_id, created_at, text in store.latest(args.query, stats.new):
+                print([text, created_at, tweet_id])
+            if args.interval is None:
+                break
+            time.sleep(args.interval)
+    finally:
+        store.close()
 
-# try:
-#     tweets = client.search_recent_tweets(query=query, tweet_fields=['context_annotations', 'created_at'], max_results=100)
-#     attributes = [[tweet.user.name, tweet.created_at, tweet.favorite_count, tweet.source, tweet.full_text] for tweet in tweets]
-#     columns = ['user', 'date', 'num_likes', 'source', 'tweet']
-#     tweets_df = pd.DataFrame(attributes, columns=columns)
-#     print(tweets_df)
-# except BaseException as ex:
-#     logger.error("Error on data: %s" % str(ex))
+
+if __name__ == '__main__':
+    main()
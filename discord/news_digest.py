@@ -0,0 +1,201 @@
+import logging
+import re
+import time
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+CASHTAG = re.compile(r'\$([A-Za-z]{1,6}(?:\.[A-Za-z]{1,2})?)\b')
+WORD = re.compile(r"[a-z']+")
+
+# Finance news for the portfolio channel's digest
+FINANCE_QUERY = (
+    '(#FinanceNews OR #StockMarket OR #EarningsReport) -is:retweet -is:reply '
+    '-has:links'
+)
+
+# headline words and their sentiment, for a quick lexicon score
+LEXICON = {
+    'beat': 1.0,
+    'beats': 1.0,
+    'bullish': 1.0,
+    'buyback': 0.5,
+    'gain': 0.5,
+    'gains': 0.5,
+    'growth': 0.5,
+    'high': 0.5,
+    'jump': 1.0,
+    'jumps': 1.0,
+    'rallies': 1.0,
+    'rally': 1.0,
+    'raise': 0.5,
+    'raises': 0.5,
+    'record': 0.5,
+    'soar': 1.0,
+    'soars': 1.0,
+    'strong': 0.5,
+    'surge': 1.0,
+    'surges': 1.0,
+    'upgrade': 1.0,
+    'bearish': -1.0,
+    'cut': -0.5,
+    'cuts': -0.5,
+    'downgrade': -1.0,
+    'drop': -0.5,
+    'drops': -0.5,
+    'fall': -0.5,
+    'falls': -0.5,
+    'lawsuit': -1.0,
+    'loss': -0.5,
+    'miss': -1.0,
+    'misses': -1.0,
+    'plunge': -1.0,
+    'plunges': -1.0,
+    'slide': -0.5,
+    'slides': -0.5,
+    'trims': -0.5,
+    'weak': -0.5,
+}
+
+DIGEST_PROMPT = (
+    'You write the news digest for the Nassau Street Capital portfolio channel. '
+    'Below are recent tweets grouped by the tickers we hold. For every ticker '
+    'write exactly one line "TICKER: <one-sentence summary of the news>", in '
+    'the order given, and nothing else.'
+)
+
+
+# cashtags ($AAPL, $BRK.B) of the symbols we hold, found with one regex pass
+# per tweet and a set lookup per tag
+class TickerTagger:
+    def __init__(self, symbols):
+        self.symbols = frozenset(symbol.upper() for symbol in symbols)
+
+    def tag(self, text):
+        found = []
+        for match in CASHTAG.finditer(text):
+            symbol = match.group(1).upper()
+            if symbol in self.symbols and symbol not in found:
+                found.append(symbol)
+        return found
+
+    def tag_batch(self, texts):
+        return [self.tag(text) for text in texts]
+
+
+# lexicon sentiment in [-1, 1] for a batch of texts
+def score_batch(texts, lexicon=LEXICON):
+    scores = []
+    for text in texts:
+        hits = [lexicon[word] for word in WORD.findall(text.lower()) if word in lexicon]
+        scores.append(max(-1.0, min(1.0, sum(hits) / len(hits))) if hits else 0.0)
+    return scores
+
+
+@dataclass
+class TickerNews:
+    __slots__ = ('symbol', 'count', 'sentiment', 'tweets', 'summary')
+    symbol: str
+    count: int
+    sentiment: float  # mean score
+    tweets: list  # (|score|, text) of the strongest ones, strongest first
+    summary: str
+
+
+# Per-ticker news digest for the portfolio channel.
+#
+# feed() takes batches of tweet texts (e.g. from NewsStore.iter_batches), tags each
+# tweet with the held tickers it mentions, scores the batch's sentiment and
+# adds it to running per-ticker counts, keeping only the max_tweets strongest
+# tweets per ticker. digest() then merges every ticker into a single
+# summarizer request (a blocking function of (prompt, text) returning the
+# model's reply) instead of one call per tweet, and resets for the next
+# digest. tweets_per_second and api_calls describe the last digest.
+class NewsDigest:
+    def __init__(self, tagger, summarizer=None, max_tweets=5):
+        self.tagger = tagger
+        self.summarizer = summarizer
+        self.max_tweets = max_tweets
+        self.tweets_per_second = 0.0
+        self.api_calls = 0
+        self._reset()
+
+    def _reset(self):
+        self.processed = 0
+        self.tagged = 0
+        self._elapsed = 0.0
+        self._tickers = {}
+
+    def feed(self, texts):
+        start = time.perf_counter()
+        texts = list(texts)
+        for text, symbols, score in zip(
+            texts, self.tagger.tag_batch(texts), score_batch(texts)
+        ):
+            if symbols:
+                self.tagged += 1
+            for symbol in symbols:
+                news = self._tickers.get(symbol)
+                if news is None:
+                    news = self._tickers[symbol] = TickerNews(symbol, 0, 0.0, [], '')
+                news.count += 1
+                news.sentiment += (score - news.sentiment) / news.count
+                news.tweets.append((abs(score), text))
+                if len(news.tweets) > 2 * self.max_tweets:
+                    news.tweets.sort(key=lambda tweet: -tweet[0])
+                    del news.tweets[self.max_tweets :]
+        self.processed += len(texts)
+        self._elapsed += time.perf_counter() - start
+
+    def _request(self, tickers):
+        lines = []
+        for news in tickers:
+            lines.append(f'{news.symbol}:')
+            lines.extend(f'- {text}' for _, text in news.tweets)
+        return '\n'.join(lines)
+
+    # the per-ticker news since the last digest, busiest tickers first
+    def digest(self):
+        tickers = sorted(self._tickers.values(), key=lambda news: -news.count)
+        for news in tickers:
+            news.tweets.sort(key=lambda tweet: -tweet[0])
+            del news.tweets[self.max_tweets :]
+        self.api_calls = 0
+        if tickers and self.summarizer is not None:
+            start = time.perf_counter()
+            reply = self.summarizer(DIGEST_PROMPT, self._request(tickers))
+            self.api_calls = 1
+            self._elapsed += time.perf_counter() - start
+            summaries = {}
+            for line in reply.splitlines():
+                symbol, _, summary = line.partition(':')
+                summaries[symbol.strip(' *-').upper()] = summary.strip()
+            for news in tickers:
+                news.summary = summaries.get(news.symbol, '')
+        self.tweets_per_second = (
+            self.processed / self._elapsed if self._elapsed > 0 else 0.0
+        )
+        logger.info(
+            'News digest: %d tweets, %d tagged, %d tickers, %d API calls, %.0f tweets/s',
+            self.processed,
+            self.tagged,
+            len(tickers),
+            self.api_calls,
+            self.tweets_per_second,
+        )
+        self._reset()
+        return tickers
+
+
+def format_digest(tickers):
+    if not tickers:
+        return None
+    lines = ['**News Digest:**']
+    for news in tickers:
+        line = (
+            f'**{news.symbol}** ({news.count} tweets, sentiment {news.sentiment:+.2f})'
+        )
+        if news.summary:
+            line += f': {news.summary}'
+        lines.append(line)
+    return '\n'.join(lines)
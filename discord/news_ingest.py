@@ -0,0 +1,251 @@
+import json
+import logging
+import math
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+TWEET_FIELDS = ['context_annotations', 'created_at']
+# search_recent_tweets only reaches back this far
+SEARCH_WINDOW = timedelta(days=7)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweets (
+    id INTEGER PRIMARY KEY,
+    query TEXT NOT NULL,
+    created_at TEXT,
+    text TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tweets_query ON tweets (query, created_at);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    query TEXT PRIMARY KEY,
+    since_id INTEGER NOT NULL
+);
+"""
+
+
+@dataclass
+class PollStats:
+    __slots__ = (
+        'fetched',
+        'new',
+        'duplicates',
+        'api_calls',
+        'calls_saved',
+        'elapsed',
+        'tweets_per_second',
+    )
+    fetched: int
+    new: int
+    duplicates: int
+    api_calls: int
+    calls_saved: int
+    elapsed: float
+    tweets_per_second: float
+
+
+def _created_at(tweet):
+    created_at = getattr(tweet, 'created_at', None)
+    return created_at.isoformat() if created_at is not None else None
+
+
+# Tweets and per-query since_id checkpoints in one SQLite file. The tweet ID
+# is the primary key, so that index is also the dedup index: inserting a
+# tweet already stored is a no-op. Consumers of the store can keep their own
+# checkpoints under their own names, e.g. 'digest:' + query.
+class NewsStore:
+    def __init__(self, path):
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def since_id(self, query):
+        row = self._db.execute(
+            'SELECT since_id FROM checkpoints WHERE query = ?', (query,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_since_id(self, query, since_id):
+        self._db.execute(
+            'INSERT OR REPLACE INTO checkpoints (query, since_id) VALUES (?, ?)',
+            (query, since_id),
+        )
+        self._db.commit()
+
+    def clear_since_id(self, query):
+        self._db.execute('DELETE FROM checkpoints WHERE query = ?', (query,))
+        self._db.commit()
+
+    # store tweets not seen before; returns how many were new
+    def add(self, query, tweets):
+        before = self._db.total_changes
+        self._db.executemany(
+            'INSERT OR IGNORE INTO tweets (id, query, created_at, text, data) '
+            'VALUES (?, ?, ?, ?, ?)',
+            [
+                (
+                    int(tweet.id),
+                    query,
+                    _created_at(tweet),
+                    tweet.text,
+                    json.dumps(tweet.data, separators=(',', ':'), default=str),
+                )
+                for tweet in tweets
+            ],
+        )
+        self._db.commit()
+        return self._db.total_changes - before
+
+    def count(self, query, since=None):
+        if since is None:
+            sql, args = 'SELECT COUNT(*) FROM tweets WHERE query = ?', (query,)
+        else:
+            sql = 'SELECT COUNT(*) FROM tweets WHERE query = ? AND created_at >= ?'
+            args = (query, since.isoformat())
+        return self._db.execute(sql, args).fetchone()[0]
+
+    # stored tweets with IDs above after_id, oldest first, in batches of
+    # (id, text) rows
+    def iter_batches(self, query, after_id=0, batch_size=500):
+        while True:
+            rows = self._db.execute(
+                'SELECT id, text FROM tweets WHERE query = ? AND id > ? '
+                'ORDER BY id LIMIT ?',
+                (query, after_id, batch_size),
+            ).fetchall()
+            if not rows:
+                return
+            yield rows
+            after_id = rows[-1][0]
+
+    # newest first, as (id, created_at, text)
+    def latest(self, query, limit=10):
+        return self._db.execute(
+            'SELECT id, created_at, text FROM tweets WHERE query = ? '
+            'ORDER BY id DESC LIMIT ?',
+            (query, limit),
+        ).fetchall()
+
+
+# pages of search_recent_tweets results newer than since_id (and older than
+# until_id), following next_token until the results run out or max_pages is
+# reached
+def iter_pages(
+    client, query, since_id=None, max_results=100, max_pages=None, until_id=None
+):
+    next_token = None
+    pages = 0
+    while True:
+        response = client.search_recent_tweets(
+            query=query,
+            since_id=since_id,
+            until_id=until_id,
+            next_token=next_token,
+            max_results=max_results,
+            tweet_fields=TWEET_FIELDS,
+        )
+        pages += 1
+        yield response
+        next_token = (response.meta or {}).get('next_token')
+        if not next_token or (max_pages is not None and pages >= max_pages):
+            return
+
+
+# Incremental news ingestion for one search query.
+#
+# Each poll() asks only for tweets newer than the stored since_id, walks the
+# pages with iter_pages and appends the new tweets to the store, then moves
+# the checkpoint to the newest ID seen. The checkpoint only moves once every
+# page is in, so a poll that fails half-way is retried from the old one and
+# the dedup index drops what was already stored. A poll reads at most
+# max_pages pages, newest first; when more has been posted since the last
+# one, the poll stops with the checkpoint where it was and records the oldest
+# ID it reached ('until:' + query) and the newest ('pending:' + query). The
+# next polls fill that gap below the oldest ID, and the checkpoint moves to
+# the pending newest ID once the gap is closed. calls_saved compares the calls made with the calls a
+# from-scratch fetch of the search window would need.
+class NewsIngestor:
+    def __init__(self, client, store, query, max_results=100, max_pages=10):
+        self.client = client
+        self.store = store
+        self.query = query
+        self.max_results = max_results
+        self.max_pages = max_pages
+        self.api_calls = 0
+        self.calls_saved = 0
+
+    def poll(self):
+        start = time.perf_counter()
+        since_id = self.store.since_id(self.query)
+        # a gap left by a truncated poll is filled first
+        until_id = self.store.since_id('until:' + self.query)
+        newest = self.store.since_id('pending:' + self.query) or since_id
+        oldest = until_id
+        truncated = False
+        fetched = new = calls = 0
+        for page in iter_pages(
+            self.client,
+            self.query,
+            since_id,
+            self.max_results,
+            self.max_pages,
+            until_id,
+        ):
+            calls += 1
+            tweets = page.data or []
+            fetched += len(tweets)
+            new += self.store.add(self.query, tweets)
+            meta = page.meta or {}
+            if meta.get('newest_id') is not None:
+                newest = max(int(meta['newest_id']), newest or 0)
+            if meta.get('oldest_id') is not None:
+                oldest = int(meta['oldest_id'])
+            truncated = bool(meta.get('next_token'))
+        if truncated:
+            self.store.set_since_id('until:' + self.query, oldest)
+            self.store.set_since_id('pending:' + self.query, newest)
+            logger.warning(
+                'Stopped after %d pages with older tweets left; the next poll '
+                'resumes below ID %d',
+                calls,
+                oldest,
+            )
+        else:
+            if newest is not None and newest != since_id:
+                self.store.set_since_id(self.query, newest)
+            if until_id is not None:
+                self.store.clear_since_id('until:' + self.query)
+                self.store.clear_since_id('pending:' + self.query)
+
+        window = self.store.count(
+            self.query, since=datetime.now(timezone.utc) - SEARCH_WINDOW
+        )
+        saved = max(math.ceil(window / self.max_results), 1) - calls
+        self.api_calls += calls
+        self.calls_saved += max(saved, 0)
+        elapsed = time.perf_counter() - start
+        stats = PollStats(
+            fetched=fetched,
+            new=new,
+            duplicates=fetched - new,
+            api_calls=calls,
+            calls_saved=max(saved, 0),
+            elapsed=elapsed,
+            tweets_per_second=fetched / elapsed if elapsed > 0 else 0.0,
+        )
+        logger.info(
+            'Ingested %d new tweets (%d duplicates) in %d calls, %.0f tweets/s, '
+            '%d calls saved',
+            stats.new,
+            stats.duplicates,
+            stats.api_calls,
+            stats.tweets_per_second,
+            stats.calls_saved,
+        )
+        return stats
@@ -1,16 +1,32 @@
+import asyncio
 import discord
 import os
 from dotenv import load_dotenv
-from tastytrade_sdk import Tastytrade
+from tasty_async import AsyncTastytrade
+from commentary import Commentary
+from position_risk import (
+    GreeksCache,
+    aggregate,
+    format_report,
+    position_greeks,
+    spots_from_quotes,
+    vols_from_metrics,
+)
+from quote_stream import DXLinkFeed, PortfolioMarks, Throttle, stream_marks
+from contextlib import closing
+from news_ingest import NewsIngestor, NewsStore
+from news_digest import FINANCE_QUERY, NewsDigest, TickerTagger, format_digest
+from llm_replies import split_message
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 import math
-import pandas as pd
 from openai import OpenAI
 from datetime import datetime, timedelta
 import pytz
 import logging
-from dateutil.easter import easter
-from dateutil.relativedelta import MO, TH, relativedelta
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+from market_calendar import calendar  # noqa: E402
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,16 +35,33 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 scheduler = AsyncIOScheduler()
 
-# Initialize the Tastytrade client
-tasty = Tastytrade()
 ACCOUNT_NUMBER = os.getenv('ACCOUNT_NUMBER')
 LOGIN = os.getenv('LOGIN')
 PASSWORD = os.getenv('PASSWORD')
+# Initialize the Tastytrade client (logs in lazily and reuses its session)
+tasty = AsyncTastytrade(LOGIN, PASSWORD)
 TOKEN = os.getenv('NASSAU_GPT_TOKEN')
 CHANNEL_ID = int(os.getenv('PORTFOLIO_CHANNEL'))
 nassau_gpt = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 model = 'gpt-4-1106-preview'
 
+# Canned commentary for when the model errors out or is too slow
+PRELUDE_FALLBACK = "Forgot to draft up a dank statement for today. Anyway... here's our club portfolio value:"
+MIDDAY_FALLBACK = "Seems like the market took a lunch break, and so did my messaging skills. But here's where we stand at midday:"
+POWER_HOUR_FALLBACK = "As the market's final bell looms, my ability to craft messages seems to be fading. But, here's the crunch-time update:"
+# Risk-free rate for the positions report, in percent
+RISK_FREE_RATE = float(os.getenv('RISK_FREE_RATE', '5'))
+# Option greeks are priced once per (contract, spot, vol) per report cycle
+greeks_cache = GreeksCache()
+# Commentary is pre-generated this long before each scheduled report
+PREFETCH_LEAD = timedelta(minutes=5)
+# Finance tweets for the news digest, which is skipped without a token
+TWITTER_BEARER_TOKEN = os.getenv('TWITTER_BEARER_TOKEN')
+NEWS_STORE = os.getenv('NEWS_STORE', 'news.sqlite3')
+# Intraday marks are posted at most this often (seconds)
+MARKS_INTERVAL = float(os.getenv('MARKS_INTERVAL', '300'))
+marks_task = None
+
 # Define intents
 intents = discord.Intents.default()
 intents.messages = True
@@ -39,59 +72,13 @@ intents.message_content = True
 client = discord.Client(intents=intents)
 
 
-def get_good_friday(year):
-    return easter(year) - timedelta(days=2)
-
-
-def adjust_for_weekend(holiday):
-    if holiday.weekday() == 5:  # Saturday
-        return holiday - timedelta(days=1)
-    elif holiday.weekday() == 6:  # Sunday
-        return holiday + timedelta(days=1)
-    return holiday
-
-
-def get_holidays(year):
-    return {
-        datetime(year, 1, 1).date(): "New Year's Day",
-        datetime(year - 1, 12, 31).date(): "New Year's Day Observed",
-        datetime(year, 7, 4).date(): 'Independence Day',
-        datetime(year, 12, 25).date(): 'Christmas Day',
-        (
-            datetime(year, 1, 1) + relativedelta(weekday=MO(3))
-        ).date(): 'Martin Luther King Jr. Day',
-        (
-            datetime(year, 2, 1) + relativedelta(weekday=MO(3))
-        ).date(): "Washington's Birthday",
-        (datetime(year, 5, 31) - relativedelta(weekday=MO(-1))).date(): 'Memorial Day',
-        (datetime(year, 9, 1) + relativedelta(weekday=MO(1))).date(): 'Labor Day',
-        (datetime(year, 11, 1) + relativedelta(weekday=TH(4))).date(): 'Thanksgiving',
-        get_good_friday(year): 'Good Friday',
-    }
-
-
+# holidays are memoized per year in the shared exchange calendar
 def stock_market_holiday(date):
-    year = date.year
-    holidays = get_holidays(year)
-
-    # Adjust for observed holidays on weekends
-    adjusted_holidays = {
-        adjust_for_weekend(holiday_date): name
-        for holiday_date, name in holidays.items()
-    }
-    return date in adjusted_holidays
+    return calendar.is_holiday(date)
 
 
 def get_holiday_name(date):
-    year = date.year
-    holidays = get_holidays(year)
-
-    # Adjust for observed holidays on weekends
-    adjusted_holidays = {
-        adjust_for_weekend(holiday_date): name
-        for holiday_date, name in holidays.items()
-    }
-    return adjusted_holidays.get(date)
+    return calendar.holiday_name(date)
 
 
 def generate_prelude():
@@ -151,7 +138,7 @@ def generate_prelude():
 
     except Exception as ex:
         logger.error('Error generating prelude statement: %s', ex)
-        return "Forgot to draft up a dank statement for today. Anyway... here's our club portfolio value:"
+        return PRELUDE_FALLBACK
 
 
 def midday_update():
@@ -182,7 +169,7 @@ def midday_update():
 
     except Exception as ex:
         logger.error('Error generating midday statement: %s', ex)
-        return "Seems like the market took a lunch break, and so did my messaging skills. But here's where we stand at midday:"
+        return MIDDAY_FALLBACK
 
 
 def power_hour_update():
@@ -213,46 +200,192 @@ def power_hour_update():
 
     except Exception as ex:
         logger.error('Error generating power hour statement: %s', ex)
-        return "As the market's final bell looms, my ability to craft messages seems to be fading. But, here's the crunch-time update:"
+        return POWER_HOUR_FALLBACK
 
 
-async def report_balance():
-    prelude = generate_prelude()
+# Generate the report commentary off the event loop, ahead of time
+commentary = Commentary(
+    {
+        'prelude': generate_prelude,
+        'midday': midday_update,
+        'power_hour': power_hour_update,
+    }
+)
+COMMENTARY_FALLBACKS = {
+    'prelude': PRELUDE_FALLBACK,
+    'midday': MIDDAY_FALLBACK,
+    'power_hour': POWER_HOUR_FALLBACK,
+}
+
+
+async def report_balance(account=None, slot='prelude'):
+    prelude = await commentary.get(slot, COMMENTARY_FALLBACKS[slot])
+    if prelude is None:
+        # midday and power hour updates are skipped on market holidays
+        return False
     channel = client.get_channel(CHANNEL_ID)
-    tasty.login(login=LOGIN, password=PASSWORD)
-    account = tasty.api.get(f'/accounts/{ACCOUNT_NUMBER}/balances')
+    if account is None:
+        account = await tasty.balances(ACCOUNT_NUMBER)
     balance = account['data']['cash-balance']
     formatted_balance = math.ceil(float(balance) * 100) / 100
     formatted_balance_with_currency = '${:,.2f}'.format(formatted_balance)
     await channel.send(
         f'{prelude}\n**Portfolio Balance:** `{formatted_balance_with_currency}`\n'
     )
+    return True
 
 
-async def report_positions():
-    positions = tasty.api.get(f'/accounts/{ACCOUNT_NUMBER}/positions')
-    positions_df = pd.DataFrame(positions['data'])
-    print(positions_df)
+async def report_positions(positions=None):
+    if positions is None:
+        positions = await tasty.positions(ACCOUNT_NUMBER)
+    items = positions['data']['items']
+    if not items:
+        return
+    underlyings = sorted({item['underlying-symbol'] for item in items})
+    quotes, metrics = await asyncio.gather(
+        tasty.quotes(underlyings), tasty.market_metrics(underlyings)
+    )
+    greeks = position_greeks(
+        items,
+        spots_from_quotes(quotes),
+        vols_from_metrics(metrics),
+        RISK_FREE_RATE / 100,
+        greeks_cache,
+    )
+    channel = client.get_channel(CHANNEL_ID)
+    await channel.send(format_report(aggregate(greeks)))
+
+
+def add_report(slot, hour, minute, timezone):
+    report_time = datetime(2000, 1, 1, hour, minute)
+    prefetch_time = report_time - PREFETCH_LEAD
+    scheduler.add_job(
+        commentary.prefetch,
+        'cron',
+        hour=prefetch_time.hour,
+        minute=prefetch_time.minute,
+        timezone=timezone,
+        args=[slot],
+    )
+    scheduler.add_job(
+        scheduled_report,
+        'cron',
+        hour=hour,
+        minute=minute,
+        timezone=timezone,
+        args=[slot],
+    )
 
 
 @client.event
 async def on_ready():
     est = pytz.timezone('US/Eastern')
     # Morning report
-    scheduler.add_job(scheduled_report, 'cron', hour=9, minute=25, timezone=est)
+    add_report('prelude', 9, 25, est)
     # Midday update
-    scheduler.add_job(midday_update, 'cron', hour=12, minute=30, timezone=est)
+    add_report('midday', 12, 30, est)
     # Power hour update
-    scheduler.add_job(power_hour_update, 'cron', hour=15, minute=0, timezone=est)
+    add_report('power_hour', 15, 0, est)
     # End of day report
-    scheduler.add_job(scheduled_report, 'cron', hour=15, minute=59, timezone=est)
+    add_report('prelude', 15, 59, est)
+    # Intraday marks while the market is open
+    scheduler.add_job(start_marks, 'cron', hour=9, minute=30, timezone=est)
+    scheduler.add_job(stop_marks, 'cron', hour=16, minute=0, timezone=est)
+    # News digests for the tickers we hold
+    scheduler.add_job(post_news_digest, 'cron', hour='10,14', minute=30, timezone=est)
 
     scheduler.start()
 
 
-async def scheduled_report():
-    await report_balance()
-    # await report_positions()
+async def scheduled_report(slot='prelude'):
+    greeks_cache.new_cycle()
+    account, positions = await tasty.snapshot(ACCOUNT_NUMBER)
+    # no positions post either when the report is skipped for a holiday
+    if await report_balance(account, slot):
+        await report_positions(positions)
+
+
+async def stream_intraday_marks():
+    positions = (await tasty.positions(ACCOUNT_NUMBER))['data']['items']
+    underlyings = sorted({item['underlying-symbol'] for item in positions})
+    if not underlyings:
+        return
+    metrics = await tasty.market_metrics(underlyings)
+    marks = PortfolioMarks(positions, vols_from_metrics(metrics), RISK_FREE_RATE / 100)
+    channel = client.get_channel(CHANNEL_ID)
+    poster = Throttle(channel.send, marks.render_fresh, MARKS_INTERVAL)
+    try:
+        await stream_marks(DXLinkFeed(tasty, marks.underlyings), marks, poster)
+    except Exception as ex:
+        logger.error('Error streaming intraday marks: %s', ex)
+    finally:
+        poster.cancel()
+
+
+async def start_marks():
+    global marks_task
+    if stock_market_holiday(datetime.now(pytz.timezone('US/Eastern')).date()):
+        return
+    if marks_task is None or marks_task.done():
+        marks_task = asyncio.ensure_future(stream_intraday_marks())
+
+
+async def stop_marks():
+    if marks_task is not None:
+        marks_task.cancel()
+
+
+def summarize_news(prompt, text):
+    response = nassau_gpt.chat.completions.create(
+        model=model,
+        messages=[
+            {'role': 'system', 'content': prompt},
+            {'role': 'user', 'content': text},
+        ],
+        temperature=0.3,
+    )
+    return response.choices[0].message.content
+
+
+# poll for new finance tweets, then digest everything stored since the last
+# digest; blocking, so it runs on an executor thread
+def build_news_digest(symbols):
+    # tweepy is only needed here, so the rest of the bot runs without it
+    import tweepy
+
+    twitter = tweepy.Client(bearer_token=TWITTER_BEARER_TOKEN)
+    with closing(NewsStore(NEWS_STORE)) as store:
+        NewsIngestor(twitter, store, FINANCE_QUERY).poll()
+        digest = NewsDigest(TickerTagger(symbols), summarize_news)
+        checkpoint = 'digest:' + FINANCE_QUERY
+        after = store.since_id(checkpoint) or 0
+        for rows in store.iter_batches(FINANCE_QUERY, after):
+            digest.feed(text for _, text in rows)
+            after = rows[-1][0]
+        tickers = digest.digest()
+        store.set_since_id(checkpoint, after)
+    return format_digest(tickers)
+
+
+async def post_news_digest():
+    if not TWITTER_BEARER_TOKEN:
+        logger.warning('TWITTER_BEARER_TOKEN is not set; skipping the news digest')
+        return
+    if stock_market_holiday(datetime.now(pytz.timezone('US/Eastern')).date()):
+        return
+    try:
+        positions = await tasty.positions(ACCOUNT_NUMBER)
+        symbols = {item['underlying-symbol'] for item in positions['data']['items']}
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(None, build_news_digest, symbols)
+    except Exception as ex:
+        logger.error('Error building the news digest: %s', ex)
+        return
+    if text:
+        channel = client.get_channel(CHANNEL_ID)
+        for chunk in split_message(text):
+            await channel.send(chunk)
 
 
-client.run(TOKEN)
+if __name__ == '__main__':
+    client.run(TOKEN)
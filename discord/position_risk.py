@@ -0,0 +1,158 @@
+import logging
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+from maturity import TRADING_DAYS_PER_YEAR, time_to_maturity  # noqa: E402
+from vectorized import price_chain  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# Greeks of the account's positions, aggregated per underlying and for the
+# whole book.
+#
+# Option positions are parsed from their OCC symbols and priced together in a
+# single vectorized Black-Scholes call, with the underlying's spot and implied
+# volatility and T in trading minutes (so same-week expiries decay through
+# the session). Equity positions are delta one. Greeks are position totals:
+# delta in shares, gamma in shares per $1 move, vega in $ per vol point and
+# theta in $ per trading session (T is in 252-session trading years).
+#
+# Pricing results are kept in a GreeksCache keyed by (contract, spot, vol);
+# call new_cycle() at the start of each report cycle so T is fresh, and every
+# repeat of a contract within the cycle is a dict hit.
+
+GREEKS = ('delta', 'gamma', 'vega', 'theta')
+OPTION_TYPES = {'C': 'call', 'P': 'put'}
+
+
+# 'AAPL  240621C00190000' -> ('AAPL', date(2024, 6, 21), 'call', 190.0)
+def parse_occ_symbol(symbol):
+    root, contract = symbol[:6].strip(), symbol[6:].strip()
+    expiry = datetime.strptime(contract[:6], '%y%m%d').date()
+    return root, expiry, OPTION_TYPES[contract[6]], int(contract[7:]) / 1000
+
+
+def signed_quantity(position):
+    quantity = float(position['quantity'])
+    return -quantity if position.get('quantity-direction') == 'Short' else quantity
+
+
+class GreeksCache:
+    def __init__(self):
+        self._greeks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def new_cycle(self):
+        self._greeks.clear()
+
+    def __len__(self):
+        return len(self._greeks)
+
+    # per-contract (delta, gamma, vega, theta) for every key, pricing only the
+    # keys not seen this cycle, all in one vectorized call
+    def lookup(self, keys, contracts, r, now=None):
+        missing = {}
+        for key, contract in zip(keys, contracts):
+            if key not in self._greeks and key not in missing:
+                missing[key] = contract
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+        if missing:
+            self._price(missing, r, now)
+        return [self._greeks[key] for key in keys]
+
+    def _price(self, missing, r, now):
+        keys = list(missing)
+        _, spot, vol = zip(*keys)
+        _, expiry, option_type, strike = zip(*missing.values())
+        T = np.maximum(time_to_maturity(list(expiry), 'minutes', now), 1e-8)
+        result = price_chain(np.array(spot), np.array(strike), T, r, np.array(vol))
+        is_call = np.array(option_type) == 'call'
+        delta = np.where(is_call, result.call_delta, result.put_delta)
+        # theta is 0.01 * per year in the pricing core, and T is in trading years
+        theta = np.where(is_call, result.call_theta, result.put_theta)
+        theta = theta * 100 / TRADING_DAYS_PER_YEAR
+        for i, key in enumerate(keys):
+            self._greeks[key] = (delta[i], result.gamma[i], result.vega[i], theta[i])
+
+
+# {symbol: mark} from a /market-data/by-type response
+def spots_from_quotes(quotes):
+    return {
+        item['symbol']: float(item.get('mark') or item['last'])
+        for item in quotes['data']['items']
+    }
+
+
+# {symbol: implied volatility} from a /market-metrics response
+def vols_from_metrics(metrics):
+    return {
+        item['symbol']: float(item['implied-volatility-index'])
+        for item in metrics['data']['items']
+        if item.get('implied-volatility-index')
+    }
+
+
+# one row per position with its underlying and position greeks; spots and vols
+# map underlying symbols to prices and decimal implied volatilities
+def position_greeks(positions, spots, vols, r, cache=None, now=None):
+    if cache is None:
+        cache = GreeksCache()
+    rows, keys, contracts, sizes = [], [], [], []
+    for position in positions:
+        instrument = position.get('instrument-type')
+        quantity = signed_quantity(position)
+        if instrument == 'Equity':
+            rows.append(
+                {
+                    'symbol': position['symbol'],
+                    'underlying': position['underlying-symbol'],
+                    'delta': quantity,
+                    'gamma': 0.0,
+                    'vega': 0.0,
+                    'theta': 0.0,
+                }
+            )
+        elif instrument == 'Equity Option':
+            contract = parse_occ_symbol(position['symbol'])
+            underlying = position.get('underlying-symbol') or contract[0]
+            if underlying not in spots or underlying not in vols:
+                logger.warning('No spot or volatility for %s', position['symbol'])
+                continue
+            keys.append((position['symbol'], spots[underlying], vols[underlying]))
+            contracts.append(contract)
+            sizes.append(
+                (position['symbol'], underlying, quantity * position['multiplier'])
+            )
+
+    for (symbol, underlying, size), greeks in zip(
+        sizes, cache.lookup(keys, contracts, r, now)
+    ):
+        row = {'symbol': symbol, 'underlying': underlying}
+        row.update({name: size * value for name, value in zip(GREEKS, greeks)})
+        rows.append(row)
+    return pd.DataFrame(rows, columns=['symbol', 'underlying', *GREEKS])
+
+
+# greeks summed per underlying, with a 'Total' row for the book
+def aggregate(greeks):
+    by_underlying = greeks.groupby('underlying')[list(GREEKS)].sum()
+    by_underlying.loc['Total'] = by_underlying.sum()
+    return by_underlying
+
+
+def format_report(summary):
+    table = summary.to_string(
+        float_format=lambda value: f'{value:,.2f}', index_names=False
+    )
+    return (
+        f'**Portfolio Greeks:**\n```\n{table}\n```\n'
+        'delta in shares, gamma in shares per $1, vega in $ per vol point, '
+        'theta in $ per trading session'
+    )
@@ -0,0 +1,366 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+import aiohttp
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+from maturity import time_to_maturity  # noqa: E402
+from position_risk import parse_occ_symbol, signed_quantity  # noqa: E402
+from scenarios import unit_value  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# Intraday marks for the portfolio bot.
+#
+# A feed is an async iterable of (symbol, price) ticks for the underlyings we
+# hold: DXLinkFeed streams trades from Tastytrade's DXLink websocket and
+# ReplayFeed plays back a JSON-lines file of {"time", "symbol", "price"}
+# records, so tests and benchmarks never need the live feed. PortfolioMarks
+# keeps the last price of every underlying and revalues only the positions on
+# the underlying that ticked, adjusting the book total by the difference.
+# Throttle turns a burst of ticks into at most one channel post per interval,
+# always rendered from the latest marks; render_fresh() first moves T to the
+# time of the post, so open options keep decaying through the session.
+#
+#   marks = PortfolioMarks(positions, vols, r)
+#   poster = Throttle(channel.send, marks.render_fresh, interval=300)
+#   await stream_marks(DXLinkFeed(tasty, marks.underlyings), marks, poster)
+
+DXLINK_VERSION = '0.1-py/1.0.0'
+
+
+class ReplayFeed:
+    # speed scales the recorded gaps between ticks (2.0 plays twice as fast);
+    # None replays as fast as possible
+    def __init__(self, path, speed=None):
+        self.path = path
+        self.speed = speed
+
+    def __aiter__(self):
+        return self._ticks()
+
+    async def _ticks(self):
+        previous = None
+        with open(self.path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                tick = json.loads(line)
+                if self.speed and previous is not None:
+                    await asyncio.sleep(max(tick['time'] - previous, 0) / self.speed)
+                previous = tick['time']
+                yield tick['symbol'], float(tick['price'])
+
+
+# Trade events from Tastytrade's DXLink streamer: SETUP / AUTH on channel 0,
+# then one FEED channel subscribed to the symbols' trades, with a keepalive
+# task running for as long as the connection is up. Subscribing waits for
+# AUTH_STATE AUTHORIZED, and a connection that stays silent for timeout
+# seconds (by default the keepalive timeout it asked the server for) counts as
+# failed. When the websocket closes or fails, the feed logs it and reconnects with a fresh quote token and
+# subscription, backing off exponentially (from backoff up to max_backoff
+# seconds) while connections keep failing without delivering a trade. After
+# max_reconnects reconnects (None: no limit) the feed ends.
+class DXLinkFeed:
+    def __init__(
+        self,
+        tasty,
+        symbols,
+        keepalive=30.0,
+        aggregation=0.1,
+        max_reconnects=None,
+        backoff=1.0,
+        max_backoff=60.0,
+        timeout=None,
+    ):
+        self.tasty = tasty
+        self.symbols = list(symbols)
+        self.keepalive = keepalive
+        self.aggregation = aggregation
+        self.max_reconnects = max_reconnects
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = 2 * keepalive if timeout is None else timeout
+        self.reconnects = 0
+
+    def __aiter__(self):
+        return self._ticks()
+
+    async def _keepalive(self, ws):
+        while True:
+            await asyncio.sleep(self.keepalive)
+            await ws.send_json({'type': 'KEEPALIVE', 'channel': 0})
+
+    async def _receive(self, ws):
+        try:
+            return await ws.receive(timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise ConnectionError(
+                'no message from DXLink in %.0fs' % self.timeout
+            ) from None
+
+    async def _expect(self, ws, message_type):
+        while True:
+            message = await self._receive(ws)
+            if message.type != aiohttp.WSMsgType.TEXT:
+                raise ConnectionError('DXLink closed during setup')
+            message = message.json()
+            if message.get('type') == message_type:
+                return message
+            if message.get('type') == 'ERROR':
+                raise ConnectionError('DXLink error: %s' % message.get('message'))
+
+    async def _ticks(self):
+        failures = 0
+        while True:
+            received = False
+            try:
+                async for tick in self._connection():
+                    received = True
+                    yield tick
+                reason = 'closed by the server'
+            except Exception as ex:
+                reason = f'failed: {ex}'
+            failures = 0 if received else failures + 1
+            if (
+                self.max_reconnects is not None
+                and self.reconnects >= self.max_reconnects
+            ):
+                logger.error('DXLink stream %s; giving up', reason)
+                return
+            delay = min(self.backoff * 2 ** max(failures - 1, 0), self.max_backoff)
+            logger.warning('DXLink stream %s; reconnecting in %.1fs', reason, delay)
+            await asyncio.sleep(delay)
+            self.reconnects += 1
+
+    async def _connection(self):
+        token = (await self.tasty.quote_token())['data']
+        async with aiohttp.ClientSession() as http:
+            async with http.ws_connect(token['dxlink-url']) as ws:
+                await ws.send_json(
+                    {
+                        'type': 'SETUP',
+                        'channel': 0,
+                        'version': DXLINK_VERSION,
+                        'keepaliveTimeout': 2 * self.keepalive,
+                        'acceptKeepaliveTimeout': 2 * self.keepalive,
+                    }
+                )
+                # UNAUTHORIZED until the token is accepted
+                auth = await self._expect(ws, 'AUTH_STATE')
+                if auth.get('state') != 'AUTHORIZED':
+                    await ws.send_json(
+                        {'type': 'AUTH', 'channel': 0, 'token': token['token']}
+                    )
+                    auth = await self._expect(ws, 'AUTH_STATE')
+                if auth.get('state') != 'AUTHORIZED':
+                    raise ConnectionError('DXLink rejected the quote token')
+                await ws.send_json(
+                    {
+                        'type': 'CHANNEL_REQUEST',
+                        'channel': 1,
+                        'service': 'FEED',
+                        'parameters': {'contract': 'AUTO'},
+                    }
+                )
+                await self._expect(ws, 'CHANNEL_OPENED')
+                await ws.send_json(
+                    {
+                        'type': 'FEED_SETUP',
+                        'channel': 1,
+                        'acceptAggregationPeriod': self.aggregation,
+                        'acceptDataFormat': 'FULL',
+                        'acceptEventFields': {
+                            'Trade': ['eventType', 'eventSymbol', 'price']
+                        },
+                    }
+                )
+                await ws.send_json(
+                    {
+                        'type': 'FEED_SUBSCRIPTION',
+                        'channel': 1,
+                        'add': [
+                            {'type': 'Trade', 'symbol': symbol}
+                            for symbol in self.symbols
+                        ],
+                    }
+                )
+                keepalive = asyncio.ensure_future(self._keepalive(ws))
+                try:
+                    while True:
+                        message = await self._receive(ws)
+                        if message.type != aiohttp.WSMsgType.TEXT:
+                            break
+                        data = message.json()
+                        if data.get('type') != 'FEED_DATA':
+                            continue
+                        for event in data['data']:
+                            price = event.get('price')
+                            if price is not None and price == price:  # not NaN
+                                yield event['eventSymbol'], float(price)
+                finally:
+                    keepalive.cancel()
+
+
+# Positions grouped by underlying with the arrays unit_value needs, so one
+# tick revalues its whole group in a single vectorized call
+class _Group:
+    __slots__ = ('K', 'expiry', 'T', 'sigma', 'option_type', 'size', 'value')
+
+    def __init__(self, K, expiry, sigma, option_type, size):
+        self.K = np.array(K)
+        self.expiry = expiry
+        self.T = None
+        self.sigma = np.array(sigma)
+        self.option_type = np.array(option_type)
+        self.size = np.array(size)
+        self.value = None
+
+
+class PortfolioMarks:
+    def __init__(self, positions, vols, r, now=None):
+        self.r = r
+        self.prices = {}
+        self.total = 0.0
+        self.ticks = 0
+        self.revaluations = 0
+        self._baseline = {}
+        columns = {}
+        for position in positions:
+            quantity = signed_quantity(position)
+            instrument = position.get('instrument-type')
+            if instrument == 'Equity':
+                row = (0.0, None, 0.0, 'stock', quantity)
+            elif instrument == 'Equity Option':
+                _, expiry, option_type, strike = parse_occ_symbol(position['symbol'])
+                sigma = vols.get(position['underlying-symbol'])
+                if sigma is None:
+                    logger.warning('No volatility for %s', position['symbol'])
+                    continue
+                size = quantity * position['multiplier']
+                row = (strike, expiry, sigma, option_type, size)
+            else:
+                continue
+            columns.setdefault(position['underlying-symbol'], []).append(row)
+        self._groups = {
+            underlying: _Group(*zip(*rows)) for underlying, rows in columns.items()
+        }
+        self.set_maturities(now)
+
+    @property
+    def underlyings(self):
+        return sorted(self._groups)
+
+    # T in trading minutes as of now
+    def set_maturities(self, now=None):
+        for group in self._groups.values():
+            expiries = [expiry or '1970-01-01' for expiry in group.expiry]
+            T = np.asarray(time_to_maturity(expiries, 'minutes', now), dtype=float)
+            group.T = np.where(group.option_type == 'stock', 0.0, T)
+
+    # move T to now and revalue every marked underlying at its last price
+    def refresh(self, now=None):
+        self.set_maturities(now)
+        for symbol, price in self.prices.items():
+            self._revalue(symbol, self._groups[symbol], price)
+
+    # record a tick; returns True when the book was revalued
+    def on_tick(self, symbol, price):
+        self.ticks += 1
+        group = self._groups.get(symbol)
+        if group is None or self.prices.get(symbol) == price:
+            return False
+        self.prices[symbol] = price
+        self._revalue(symbol, group, price)
+        self.revaluations += 1
+        return True
+
+    def _revalue(self, symbol, group, price):
+        value = float(
+            (
+                group.size
+                * unit_value(
+                    price, group.K, group.T, self.r, group.sigma, group.option_type
+                )
+            ).sum()
+        )
+        self.total += value - (group.value or 0.0)
+        group.value = value
+        self._baseline.setdefault(symbol, value)
+
+    # marked value and change since the first mark of each underlying
+    def values(self):
+        return {
+            symbol: (group.value, group.value - self._baseline[symbol])
+            for symbol, group in sorted(self._groups.items())
+            if group.value is not None
+        }
+
+    def render(self):
+        lines = [
+            f'{symbol:<6} {value:>14,.2f} {change:>+12,.2f}'
+            for symbol, (value, change) in self.values().items()
+        ]
+        change = sum(change for _, change in self.values().values())
+        lines.append(f'{"Total":<6} {self.total:>14,.2f} {change:>+12,.2f}')
+        return '**Intraday Marks:**\n```\n' + '\n'.join(lines) + '\n```'
+
+    # the marks as of now, for the throttled posts
+    def render_fresh(self, now=None):
+        self.refresh(now)
+        return self.render()
+
+
+# Coalescing, rate-limited poster: notify() after every change, and send()
+# gets render()'s latest text at most once per interval.
+class Throttle:
+    def __init__(self, send, render, interval=60.0):
+        self.send = send
+        self.render = render
+        self.interval = interval
+        self.posts = 0
+        self.coalesced = 0
+        self._dirty = False
+        self._last = None
+        self._task = None
+
+    def notify(self):
+        if self._dirty:
+            self.coalesced += 1
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._flush())
+
+    async def _flush(self):
+        while self._dirty:
+            if self._last is not None:
+                delay = self._last + self.interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self._dirty = False
+            self._last = time.monotonic()
+            try:
+                await self.send(self.render())
+                self.posts += 1
+            except Exception as ex:
+                logger.error('Error posting marks: %s', ex)
+
+    # wait for a pending post, e.g. before shutting down
+    async def drain(self):
+        if self._task is not None:
+            await self._task
+
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+async def stream_marks(feed, marks, poster):
+    async for symbol, price in feed:
+        if marks.on_tick(symbol, price):
+            poster.notify()
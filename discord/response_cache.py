@@ -0,0 +1,209 @@
+import asyncio
+import difflib
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    context TEXT NOT NULL,
+    question TEXT NOT NULL,
+    response TEXT NOT NULL,
+    latency REAL NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+CREATE INDEX IF NOT EXISTS responses_context ON responses (context, accessed);
+"""
+
+
+# words that do not change what a question asks, for the fuzzy match check
+STOPWORDS = frozenset(
+    'a about an and are as at be can could do does for from how i in is it me '
+    'my of on or please s so tell that the this to us was we what whats when '
+    'where which who why will with would you your'.split()
+)
+
+
+# lowercase words only: "What is DELTA?!" -> "what is delta"
+def normalize(text):
+    return ' '.join(re.findall(r'[a-z0-9]+', str(text).lower()))
+
+
+# the numbers and content words of a normalized question
+def content_tokens(question):
+    return frozenset(word for word in question.split() if word not in STOPWORDS)
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+# Cached NassauGPT answers to repeated questions, in a local SQLite file.
+#
+# get() and put() take the chat messages sent to the model. The key is the
+# normalized last user message plus the normalized context_turns messages
+# before it (system messages, which carry the prompt and rolling summary, are
+# left out), so "explain theta" only matches where the recent conversation
+# does too. Entries expire after ttl seconds and the least recently used
+# ones are evicted past max_entries; expired rows are deleted when an answer
+# is stored. Fuzzy matching is off by default. With fuzzy set, a question that
+# misses exactly is compared (difflib, on normalized text) with the recent
+# questions asked in the same context, and a ratio of at least fuzzy counts as
+# a hit, but only if both questions have the same numbers and content words:
+# "delta of a 100 strike call" never answers "delta of a 105 strike call".
+#
+# get() and put() block on SQLite; from the event loop use lookup() and
+# store(), which run them on a single background thread.
+#
+# hits, misses, fuzzy_hits and saved_seconds (the generation time of every
+# answer served from the cache) survive only as long as the process; the
+# entries themselves survive restarts.
+class ResponseCache:
+    def __init__(
+        self,
+        path,
+        ttl=7 * 24 * 60 * 60,
+        max_entries=5000,
+        context_turns=2,
+        fuzzy=None,
+        fuzzy_candidates=200,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.context_turns = context_turns
+        self.fuzzy = fuzzy
+        self.fuzzy_candidates = fuzzy_candidates
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='response-cache'
+        )
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    async def lookup(self, messages):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.get, messages)
+
+    async def store(self, messages, response, latency):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self._executor, self.put, messages, response, latency
+        )
+
+    def _keys(self, messages):
+        turns = [m for m in messages if m['role'] != 'system']
+        if not turns or turns[-1]['role'] != 'user':
+            return None
+        question = normalize(turns[-1]['content'])
+        context = [
+            f"{m['role']}: {normalize(m['content'])}"
+            for m in turns[-1 - self.context_turns : -1]
+        ]
+        context = _digest('\n'.join(context))
+        return _digest(f'{context}\n{question}'), context, question
+
+    def get(self, messages):
+        keys = self._keys(messages)
+        if keys is None:
+            return None
+        key, context, question = keys
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                'SELECT key, response, latency FROM responses '
+                'WHERE key = ? AND created >= ?',
+                (key, now - self.ttl),
+            ).fetchone()
+            if row is None and self.fuzzy:
+                row = self._closest(context, question, now - self.ttl)
+                if row is not None:
+                    self.fuzzy_hits += 1
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute(
+                'UPDATE responses SET accessed = ?, hits = hits + 1 WHERE key = ?',
+                (now, row[0]),
+            )
+            self._db.commit()
+        self.hits += 1
+        self.saved_seconds += row[2]
+        return row[1]
+
+    def _closest(self, context, question, oldest):
+        rows = self._db.execute(
+            'SELECT key, response, latency, question FROM responses '
+            'WHERE context = ? AND created >= ? ORDER BY accessed DESC LIMIT ?',
+            (context, oldest, self.fuzzy_candidates),
+        ).fetchall()
+        tokens = content_tokens(question)
+        matcher = difflib.SequenceMatcher(b=question, autojunk=False)
+        best, best_ratio = None, self.fuzzy
+        for row in rows:
+            matcher.set_seq1(row[3])
+            if matcher.real_quick_ratio() < best_ratio:
+                continue
+            if matcher.quick_ratio() < best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= best_ratio and content_tokens(row[3]) == tokens:
+                best, best_ratio = row[:3], ratio
+        return best
+
+    # store the answer to messages and how long it took to generate
+    def put(self, messages, response, latency):
+        keys = self._keys(messages)
+        if keys is None or not response:
+            return
+        key, context, question = keys
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'DELETE FROM responses WHERE created < ?', (now - self.ttl,)
+            )
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(key, context, question, response, latency, created, accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, context, question, response, latency, now, now),
+            )
+            self._db.execute(
+                'DELETE FROM responses WHERE key IN ('
+                'SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self),
+            'hits': self.hits,
+            'fuzzy_hits': self.fuzzy_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'saved_seconds': self.saved_seconds,
+        }
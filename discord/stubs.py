@@ -0,0 +1,339 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from aiohttp import web
+
+# Local stand-ins for the external services the bots talk to, for tests and
+# benchmarks. HTTP services are aiohttp Applications returned with a state
+# namespace; serve the app with aiohttp.test_utils.TestServer (or
+# web.AppRunner) and point the client's base URL at it. The OpenAI stub is an
+# in-process client, returned with its state the same way, and the Discord
+# stubs are plain channel / message objects. Every stub records what it was
+# asked for: state.calls, or the channel's messages and their edits.
+
+SESSION_TOKEN = 'stub-session-token'
+
+POSITIONS = [
+    {
+        'symbol': 'AAPL  240621C00190000',
+        'underlying-symbol': 'AAPL',
+        'instrument-type': 'Equity Option',
+        'quantity': '2',
+        'quantity-direction': 'Long',
+        'multiplier': 100,
+        'close-price': '5.25',
+    },
+    {
+        'symbol': 'MSFT',
+        'underlying-symbol': 'MSFT',
+        'instrument-type': 'Equity',
+        'quantity': '10',
+        'quantity-direction': 'Long',
+        'multiplier': 1,
+        'close-price': '410.5',
+    },
+]
+
+
+QUOTES = {'AAPL': '190.5', 'MSFT': '410.5'}
+IMPLIED_VOLATILITIES = {'AAPL': '0.25', 'MSFT': '0.22'}
+QUOTE_TOKEN = 'stub-quote-token'
+
+
+# Tastytrade REST API: /sessions, /accounts/{n}/balances and /positions,
+# /market-data/by-type, /market-metrics and /api-quote-tokens, plus a DXLink
+# websocket at /dxlink that streams ticks ((symbol, price) pairs) as Trade
+# events once a feed subscribes, then closes (or, with stall, goes quiet).
+# Like DXLink, it reports UNAUTHORIZED after SETUP and the token's state after
+# AUTH; the quote token endpoint hands out quote_token. latency delays every
+# response; the first fail_first requests to an account endpoint answer 503.
+def tastytrade_app(
+    latency=0.0,
+    balance='123456.78',
+    positions=None,
+    fail_first=0,
+    ticks=(),
+    quote_token=QUOTE_TOKEN,
+    stall=False,
+):
+    app = web.Application()
+    state = SimpleNamespace(calls=[], failures=fail_first, subscriptions=[])
+
+    async def respond(request, payload):
+        state.calls.append(request.path)
+        if latency:
+            await asyncio.sleep(latency)
+        return web.json_response(payload)
+
+    async def sessions(request):
+        body = await request.json()
+        if not body.get('login') or not body.get('password'):
+            return web.json_response({'error': 'invalid credentials'}, status=401)
+        return await respond(request, {'data': {'session-token': SESSION_TOKEN}})
+
+    def authorized(handler):
+        async def wrapper(request):
+            if request.headers.get('Authorization') != SESSION_TOKEN:
+                state.calls.append(request.path)
+                return web.json_response({'error': 'unauthorized'}, status=401)
+            if state.failures > 0:
+                state.failures -= 1
+                state.calls.append(request.path)
+                return web.json_response({'error': 'unavailable'}, status=503)
+            return await handler(request)
+
+        return wrapper
+
+    @authorized
+    async def balances(request):
+        account = request.match_info['account']
+        return await respond(
+            request, {'data': {'account-number': account, 'cash-balance': balance}}
+        )
+
+    @authorized
+    async def account_positions(request):
+        return await respond(
+            request, {'data': {'items': POSITIONS if positions is None else positions}}
+        )
+
+    @authorized
+    async def market_data(request):
+        symbols = request.query.getall('equity', [])
+        items = [
+            {'symbol': symbol, 'mark': QUOTES[symbol]}
+            for symbol in symbols
+            if symbol in QUOTES
+        ]
+        return await respond(request, {'data': {'items': items}})
+
+    @authorized
+    async def market_metrics(request):
+        symbols = request.query.get('symbols', '').split(',')
+        items = [
+            {'symbol': symbol, 'implied-volatility-index': IMPLIED_VOLATILITIES[symbol]}
+            for symbol in symbols
+            if symbol in IMPLIED_VOLATILITIES
+        ]
+        return await respond(request, {'data': {'items': items}})
+
+    @authorized
+    async def quote_tokens(request):
+        url = request.url.with_scheme('ws').with_path('/dxlink').with_query(None)
+        return await respond(
+            request,
+            {'data': {'token': quote_token, 'dxlink-url': str(url), 'level': 'api'}},
+        )
+
+    async def dxlink(request):
+        state.calls.append(request.path)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for message in ws:
+            data = message.json()
+            if data['type'] == 'SETUP':
+                await ws.send_json({**data, 'version': '0.1-stub'})
+                await ws.send_json(
+                    {'type': 'AUTH_STATE', 'channel': 0, 'state': 'UNAUTHORIZED'}
+                )
+            elif data['type'] == 'AUTH':
+                authorized = data['token'] == QUOTE_TOKEN
+                await ws.send_json(
+                    {
+                        'type': 'AUTH_STATE',
+                        'channel': 0,
+                        'state': 'AUTHORIZED' if authorized else 'UNAUTHORIZED',
+                    }
+                )
+            elif data['type'] == 'CHANNEL_REQUEST':
+                await ws.send_json(
+                    {'type': 'CHANNEL_OPENED', 'channel': data['channel']}
+                )
+            elif data['type'] == 'FEED_SUBSCRIPTION':
+                state.subscriptions.extend(item['symbol'] for item in data['add'])
+                for symbol, price in ticks:
+                    event = {'eventType': 'Trade', 'eventSymbol': symbol}
+                    event['price'] = price
+                    await ws.send_json(
+                        {'type': 'FEED_DATA', 'channel': 1, 'data': [event]}
+                    )
+                if not stall:
+                    await ws.close()
+        return ws
+
+    app.router.add_post('/sessions', sessions)
+    app.router.add_get('/accounts/{account}/balances', balances)
+    app.router.add_get('/accounts/{account}/positions', account_positions)
+    app.router.add_get('/market-data/by-type', market_data)
+    app.router.add_get('/market-metrics', market_metrics)
+    app.router.add_get('/api-quote-tokens', quote_tokens)
+    app.router.add_get('/dxlink', dxlink)
+    return app, state
+
+
+# OpenAI chat completions: an AsyncOpenAI stand-in whose streamed completion
+# yields reply in pieces of chunk_size characters, after first_token_delay and
+# then token_delay between pieces. state.active tracks completions in flight
+# and state.max_active the most seen at once.
+def openai_client(reply, chunk_size=4, first_token_delay=0.0, token_delay=0.0):
+    state = SimpleNamespace(calls=[], active=0, max_active=0)
+
+    def chunk(content):
+        delta = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    async def stream():
+        try:
+            await asyncio.sleep(first_token_delay)
+            for start in range(0, len(reply), chunk_size):
+                if start:
+                    await asyncio.sleep(token_delay)
+                yield chunk(reply[start : start + chunk_size])
+        finally:
+            state.active -= 1
+
+    async def create(**request):
+        state.calls.append(request)
+        state.active += 1
+        state.max_active = max(state.max_active, state.active)
+        if request.get('stream'):
+            return stream()
+        content = SimpleNamespace(content=reply)
+        state.active -= 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=content)])
+
+    completions = SimpleNamespace(create=create)
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions)), state
+
+
+# The synchronous client (openai.OpenAI) used for the report commentary:
+# create() blocks for latency seconds and returns reply.
+def openai_sync_client(reply, latency=0.0):
+    state = SimpleNamespace(calls=[])
+
+    def create(**request):
+        state.calls.append(request)
+        if latency:
+            time.sleep(latency)
+        content = SimpleNamespace(content=reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=content)])
+
+    completions = SimpleNamespace(create=create)
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions)), state
+
+
+STUB_BOT_ID = 99
+
+
+# Discord: a channel whose messages record their replies and edits
+class StubMessage:
+    def __init__(self, channel, content, author_id=7, bot=False, reference=None):
+        channel._next_id += 1
+        self.id = channel._next_id
+        self.channel = channel
+        self.author = SimpleNamespace(id=author_id, bot=bot)
+        self.content = content
+        self.reference = reference
+        self.edits = []
+        channel.messages.append(self)
+
+    async def reply(self, content):
+        return StubMessage(self.channel, content, STUB_BOT_ID, True, self)
+
+    async def edit(self, content):
+        self.edits.append(content)
+        self.content = content
+        return self
+
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class StubChannel:
+    def __init__(self, channel_id=1):
+        self.id = channel_id
+        self.messages = []
+        self._next_id = 0
+
+    def post(self, content, author_id=7, bot=False):
+        return StubMessage(self, content, author_id, bot)
+
+    async def send(self, content):
+        return StubMessage(self, content, STUB_BOT_ID, True)
+
+    def typing(self):
+        return _Typing()
+
+    # newest first, like discord.abc.Messageable.history
+    async def history(self, limit):
+        for message in reversed(self.messages[-limit:]):
+            yield message
+
+
+# Twitter API v2 recent search: a tweepy.Client stand-in replaying recorded
+# tweets (a JSON list, oldest first) with since_id, until_id, max_results and
+# next_token handled like the API. Timestamps are shifted so the newest
+# recorded tweet is from now. Only the first visible tweets have been
+# "posted"; reveal() posts more. state.calls records every search.
+class RecordedTwitter:
+    def __init__(self, path, visible=None):
+        import tweepy
+
+        self._tweepy = tweepy
+        with open(path) as f:
+            recorded = json.load(f)
+        newest = datetime.fromisoformat(recorded[-1]['created_at'][:19])
+        shift = datetime.utcnow() - newest
+        self.tweets = []
+        for tweet in recorded:
+            created_at = datetime.fromisoformat(tweet['created_at'][:19]) + shift
+            tweet = dict(
+                tweet, created_at=created_at.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+            )
+            self.tweets.append(tweepy.Tweet(tweet))
+        self.visible = len(self.tweets) if visible is None else visible
+        self.state = SimpleNamespace(calls=[])
+
+    def reveal(self, count):
+        self.visible = min(self.visible + count, len(self.tweets))
+
+    def search_recent_tweets(
+        self,
+        query,
+        since_id=None,
+        until_id=None,
+        next_token=None,
+        max_results=10,
+        **params,
+    ):
+        self.state.calls.append(
+            {
+                'query': query,
+                'since_id': since_id,
+                'until_id': until_id,
+                'next_token': next_token,
+            }
+        )
+        newest_first = [
+            tweet
+            for tweet in reversed(self.tweets[: self.visible])
+            if (since_id is None or tweet.id > int(since_id))
+            and (until_id is None or tweet.id < int(until_id))
+        ]
+        offset = int(next_token) if next_token else 0
+        page = newest_first[offset : offset + max_results]
+        meta = {'result_count': len(page)}
+        if page:
+            meta['newest_id'] = str(page[0].id)
+            meta['oldest_id'] = str(page[-1].id)
+        if offset + max_results < len(newest_first):
+            meta['next_token'] = str(offset + max_results)
+        return self._tweepy.Response(page or None, {}, [], meta)
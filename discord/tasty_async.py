@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+API_BASE_URL = 'https://api.tastytrade.com'
+USER_AGENT = 'nsc-portfolio-bot'
+
+
+class TastytradeError(Exception):
+    def __init__(self, status, message):
+        super().__init__(f'{status}: {message}')
+        self.status = status
+
+
+# Non-blocking Tastytrade client for the bot. One aiohttp session (and its
+# connection pool) is kept for the life of the client, the session token from
+# /sessions is reused until it is about to expire, and every request has a
+# timeout and is retried with exponential backoff on connection errors,
+# timeouts, 429 and 5xx. A 401 drops the cached token and logs in again once.
+class AsyncTastytrade:
+    def __init__(
+        self,
+        login,
+        password,
+        base_url=API_BASE_URL,
+        timeout=10.0,
+        retries=3,
+        backoff=0.5,
+        token_ttl=23 * 60 * 60,
+        token_margin=5 * 60,
+    ):
+        self.login = login
+        self.password = password
+        self.base_url = base_url.rstrip('/')
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.token_ttl = token_ttl
+        self.token_margin = token_margin
+        self.logins = 0
+        self._http = None
+        self._token = None
+        self._token_expiry = 0.0
+        self._login_lock = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    def _session(self):
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                timeout=self.timeout, headers={'User-Agent': USER_AGENT}
+            )
+        return self._http
+
+    def _token_valid(self):
+        return self._token is not None and time.time() < self._token_expiry
+
+    async def _authorization(self):
+        if self._token_valid():
+            return self._token
+        if self._login_lock is None:
+            self._login_lock = asyncio.Lock()
+        async with self._login_lock:
+            # another coroutine may have logged in while we waited
+            if not self._token_valid():
+                data = await self._request(
+                    'POST',
+                    '/sessions',
+                    json={'login': self.login, 'password': self.password},
+                    authorized=False,
+                )
+                self._token = data['data']['session-token']
+                self._token_expiry = self._expiry(data['data']) - self.token_margin
+                self.logins += 1
+        return self._token
+
+    def _expiry(self, session):
+        expiration = session.get('session-expiration')
+        if expiration:
+            try:
+                parsed = datetime.fromisoformat(expiration.replace('Z', '+00:00'))
+                return parsed.astimezone(timezone.utc).timestamp()
+            except ValueError:
+                logger.warning('Unparseable session expiration: %s', expiration)
+        return time.time() + self.token_ttl
+
+    async def _request(self, method, path, params=None, json=None, authorized=True):
+        retried_login = False
+        attempt = 0
+        while True:
+            headers = {}
+            if authorized:
+                headers['Authorization'] = await self._authorization()
+            try:
+                async with self._session().request(
+                    method,
+                    self.base_url + path,
+                    params=params,
+                    json=json,
+                    headers=headers,
+                ) as response:
+                    if response.status == 401 and authorized and not retried_login:
+                        self._token = None
+                        retried_login = True
+                        continue
+                    if response.status < 400:
+                        return await response.json()
+                    message = await response.text()
+                    if response.status != 429 and response.status < 500:
+                        raise TastytradeError(response.status, message)
+                    error = TastytradeError(response.status, message)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+                error = ex
+            if attempt >= self.retries:
+                raise error
+            delay = self.backoff * 2**attempt
+            logger.warning(
+                'Tastytrade %s %s failed (%s), retrying in %.1fs',
+                method,
+                path,
+                error,
+                delay,
+            )
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, path, params=None):
+        return await self._request('GET', path, params=params)
+
+    async def balances(self, account_number):
+        return await self.get(f'/accounts/{account_number}/balances')
+
+    async def positions(self, account_number):
+        return await self.get(f'/accounts/{account_number}/positions')
+
+    async def quotes(self, symbols):
+        return await self.get(
+            '/market-data/by-type', params=[('equity', symbol) for symbol in symbols]
+        )
+
+    async def market_metrics(self, symbols):
+        return await self.get('/market-metrics', params={'symbols': ','.join(symbols)})
+
+    # token and websocket URL for the DXLink quote streamer
+    async def quote_token(self):
+        return await self.get('/api-quote-tokens')
+
+    # balances and positions fetched concurrently over the pooled session
+    async def snapshot(self, account_number):
+        return await asyncio.gather(
+            self.balances(account_number), self.positions(account_number)
+        )
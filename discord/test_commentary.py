@@ -0,0 +1,64 @@
+import asyncio
+import time
+import unittest
+from commentary import Commentary
+
+
+def slow(text, delay=0.2):
+    def generate():
+        time.sleep(delay)  # a blocking model call
+        return text
+
+    return generate
+
+
+# TEST SUITE
+class TestCommentary(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.commentary = Commentary(
+            {'prelude': slow('gm'), 'midday': slow(None), 'stuck': slow('late', 1.0)},
+            timeout=0.5,
+        )
+        self.addCleanup(self.commentary.close)
+
+    async def test_prefetched_text_is_served_immediately(self):
+        await self.commentary.prefetch('prelude')
+        start = time.perf_counter()
+        self.assertEqual(await self.commentary.get('prelude', 'fallback'), 'gm')
+        self.assertLess(time.perf_counter() - start, 0.05)
+        self.assertEqual(self.commentary.hits, 1)
+
+    async def test_generation_does_not_block_the_loop(self):
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(heartbeat())
+        self.assertEqual(await self.commentary.get('prelude'), 'gm')
+        ticker.cancel()
+        self.assertGreater(ticks, 10)
+        self.assertEqual(self.commentary.misses, 1)
+
+    async def test_joins_prefetch_in_flight(self):
+        prefetch = asyncio.create_task(self.commentary.prefetch('prelude'))
+        await asyncio.sleep(0)
+        self.assertEqual(await self.commentary.get('prelude'), 'gm')
+        await prefetch
+
+    async def test_stale_text_is_regenerated(self):
+        await self.commentary.prefetch('prelude')
+        self.commentary.ttl = 0.0
+        await self.commentary.get('prelude')
+        self.assertEqual(self.commentary.misses, 1)
+
+    async def test_timeout_and_holiday(self):
+        self.assertEqual(await self.commentary.get('stuck', 'fallback'), 'fallback')
+        self.assertIsNone(await self.commentary.get('midday', 'fallback'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from context_builder import SUMMARY_PREFIX, ContextBuilder
+from history_cache import Entry
+
+
+def entries(*contents):
+    return [Entry(i + 1, 7, False, content) for i, content in enumerate(contents)]
+
+
+def role(entry):
+    return 'user'
+
+
+def contents(messages):
+    return [message['content'] for message in messages]
+
+
+# TEST SUITE
+class TestContextBuilder(unittest.IsolatedAsyncioTestCase):
+    async def test_fills_newest_first_up_to_the_budget(self):
+        builder = ContextBuilder(budget=100, message_overhead=0)
+        history = entries('a' * 200, 'b' * 100, 'c' * 40, 'd' * 40)
+        messages = builder.build(1, 'system', history, role)
+        # 2 tokens for the system prompt, then 11 + 11 + 26 fit but 51 does not
+        self.assertEqual(contents(messages), ['system', 'b' * 100, 'c' * 40, 'd' * 40])
+        self.assertEqual(builder.prompt_tokens.samples[-1], 2 + 26 + 11 + 11)
+
+    def test_small_chats_use_every_message(self):
+        builder = ContextBuilder(budget=3000)
+        history = entries(*(f'message {i}' for i in range(40)))
+        messages = builder.build(1, 'system', history, role)
+        self.assertEqual(len(messages), 41)
+
+    def test_oversized_newest_message_is_cut(self):
+        builder = ContextBuilder(budget=100, message_overhead=0)
+        messages = builder.build(1, 'system', entries('x' * 4000), role)
+        self.assertEqual(len(messages), 2)
+        self.assertLessEqual(builder.prompt_tokens.samples[-1], 100)
+        self.assertLess(len(messages[1]['content']), 400)
+
+    def test_token_counts_are_cached_per_message(self):
+        builder = ContextBuilder(budget=3000)
+        history = entries('hello', 'world')
+        builder.build(1, 'system', history, role)
+        builder.build(1, 'system', history, role)
+        self.assertEqual((builder.count_misses, builder.count_hits), (2, 2))
+        history[0].content = 'hello, edited'
+        builder.build(1, 'system', history, role)
+        self.assertEqual(builder.count_misses, 3)
+
+    async def test_evicted_turns_roll_into_a_summary(self):
+        calls = []
+
+        async def summarizer(previous, turns):
+            calls.append((previous, contents(turns)))
+            return f'{previous} {len(turns)} turns'.strip()
+
+        builder = ContextBuilder(
+            budget=60, summarizer=summarizer, summary_budget=10, message_overhead=0
+        )
+        history = entries(*(c * 80 for c in 'abcdef'))
+        messages = builder.build(1, 'system', history, role)
+        await builder.drain()
+        self.assertEqual(len(messages), 3)  # system prompt and the newest two
+        self.assertEqual(calls, [('', ['a' * 80, 'b' * 80, 'c' * 80, 'd' * 80])])
+
+        history.append(Entry(7, 7, False, 'g' * 80))
+        messages = builder.build(1, 'system', history, role)
+        await builder.drain()
+        self.assertEqual(messages[1]['content'], SUMMARY_PREFIX + '4 turns')
+        # only the turn evicted since the last summary is summarized
+        self.assertEqual(calls[-1], ('4 turns', ['e' * 80]))
+        self.assertEqual(builder.summary(1), '4 turns 1 turns')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from types import SimpleNamespace
+from history_cache import ChannelHistory
+
+BOT_ID = 99
+
+
+class FakeChannel:
+    def __init__(self, channel_id=1):
+        self.id = channel_id
+        self.messages = []
+        self.fetches = 0
+
+    def post(self, content, author_id=7, bot=False):
+        message = SimpleNamespace(
+            id=len(self.messages) + 1,
+            channel=self,
+            author=SimpleNamespace(id=author_id, bot=bot),
+            content=content,
+        )
+        self.messages.append(message)
+        return message
+
+    # newest first, like discord.abc.Messageable.history
+    async def history(self, limit):
+        self.fetches += 1
+        for message in reversed(self.messages[-limit:]):
+            yield message
+
+
+async def api_view(channel, limit):
+    return [(m.id, m.content) async for m in channel.history(limit=limit)][::-1]
+
+
+def cached_view(entries):
+    return [(entry.id, entry.content) for entry in entries]
+
+
+# TEST SUITE
+class TestChannelHistory(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.channel = FakeChannel()
+        self.history = ChannelHistory(limit=5)
+
+    def post(self, content, **author):
+        message = self.channel.post(content, **author)
+        self.history.add(message)
+        return message
+
+    async def test_backfills_once_then_serves_from_gateway_events(self):
+        for i in range(8):
+            self.channel.post(f'before {i}')  # sent while the bot was offline
+        self.post('hello')
+        entries = await self.history.messages(self.channel)
+        self.assertEqual(self.channel.fetches, 1)
+        self.assertEqual(cached_view(entries), await api_view(self.channel, 5))
+        for i in range(20):
+            self.post(f'message {i}')
+            self.post(f'reply {i}', author_id=BOT_ID, bot=True)
+            entries = await self.history.messages(self.channel)
+        self.assertEqual(self.channel.fetches, 1 + 1)  # + the api_view call
+        self.assertEqual(cached_view(entries), await api_view(self.channel, 5))
+        self.assertEqual(self.history.backfills, 1)
+        self.assertEqual(self.history.hits, 20)
+        self.assertTrue(entries[-1].author_bot)
+
+    async def test_edits_and_deletes_stay_consistent(self):
+        messages = [self.post(f'message {i}') for i in range(3)]
+        await self.history.messages(self.channel)
+        messages[1].content = 'edited'
+        self.history.edit(self.channel.id, messages[1].id, 'edited')
+        self.channel.messages.remove(messages[0])
+        self.history.delete(self.channel.id, [messages[0].id])
+        entries = await self.history.messages(self.channel)
+        self.assertEqual(cached_view(entries), [(2, 'edited'), (3, 'message 2')])
+        self.assertEqual(self.history.backfills, 1)
+
+    async def test_delete_from_full_buffer_refills(self):
+        for i in range(7):
+            self.post(f'message {i}')
+        await self.history.messages(self.channel)
+        deleted = self.channel.messages.pop()
+        self.history.delete(self.channel.id, [deleted.id])
+        entries = await self.history.messages(self.channel)
+        self.assertEqual(self.history.backfills, 2)
+        self.assertEqual(cached_view(entries), await api_view(self.channel, 5))
+
+    async def test_invalidate_after_a_gap(self):
+        self.post('hello')
+        await self.history.messages(self.channel)
+        self.history.invalidate()
+        self.channel.post('missed while disconnected')
+        entries = await self.history.messages(self.channel)
+        self.assertEqual(entries[-1].content, 'missed while disconnected')
+        self.assertEqual(self.history.backfills, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
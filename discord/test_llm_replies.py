@@ -0,0 +1,110 @@
+import asyncio
+import unittest
+from llm_replies import ERROR_REPLY, ReplyStreamer, split_message
+from stubs import StubChannel, openai_client
+
+LONG_REPLY = ' '.join(f'Sentence number {i} of a long answer.' for i in range(150))
+
+
+async def conversation(message):
+    return [{'role': 'user', 'content': message.content}]
+
+
+def bot_messages(channel):
+    return [message for message in channel.messages if message.author.bot]
+
+
+# TEST SUITE
+class TestSplitMessage(unittest.TestCase):
+    def test_chunks_fit_and_keep_the_text(self):
+        chunks = split_message(LONG_REPLY, 2000)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 2000 for chunk in chunks))
+        self.assertEqual(' '.join(chunks), LONG_REPLY)
+        self.assertTrue(all(chunk.endswith('.') for chunk in chunks))
+
+    def test_prefers_newlines_and_hard_cuts_unbroken_text(self):
+        self.assertEqual(split_message('abc\ndef ghi', 8), ['abc', 'def ghi'])
+        self.assertEqual(split_message('x' * 5, 2), ['xx', 'xx', 'x'])
+
+
+class TestReplyStreamer(unittest.IsolatedAsyncioTestCase):
+    async def test_streams_edits_into_one_reply(self):
+        client, _ = openai_client('Hello there, how can I help?', token_delay=0.01)
+        streamer = ReplyStreamer(client, 'model', edit_interval=0.02)
+        channel = StubChannel()
+        await streamer.submit(channel.post('hi'), conversation)
+        [reply] = bot_messages(channel)
+        self.assertEqual(reply.content, 'Hello there, how can I help?')
+        self.assertEqual(reply.reference.content, 'hi')
+        self.assertGreater(len(reply.edits), 1)
+        self.assertEqual(streamer.first_token.summary()['count'], 1)
+        self.assertLess(streamer.first_token.percentile(50), 0.05)
+
+    async def test_long_replies_continue_in_new_messages(self):
+        client, _ = openai_client(LONG_REPLY, chunk_size=50)
+        streamer = ReplyStreamer(client, 'model', edit_interval=0.0)
+        channel = StubChannel()
+        await streamer.submit(channel.post('tell me everything'), conversation)
+        replies = bot_messages(channel)
+        self.assertGreater(len(replies), 1)
+        self.assertTrue(all(len(reply.content) <= 2000 for reply in replies))
+        self.assertEqual(' '.join(reply.content for reply in replies), LONG_REPLY)
+
+    async def test_concurrency_is_bounded(self):
+        client, state = openai_client('ok', first_token_delay=0.05)
+        streamer = ReplyStreamer(client, 'model', max_concurrent=2)
+        channels = [StubChannel(i) for i in range(6)]
+        await asyncio.gather(
+            *(streamer.submit(c.post('hi'), conversation) for c in channels)
+        )
+        self.assertEqual(state.max_active, 2)
+        self.assertTrue(all(len(bot_messages(c)) == 1 for c in channels))
+
+    async def test_bursts_in_a_channel_are_coalesced(self):
+        client, state = openai_client('ok', first_token_delay=0.05)
+        streamer = ReplyStreamer(client, 'model')
+        channel = StubChannel()
+        messages = [channel.post(f'message {i}') for i in range(5)]
+        await asyncio.gather(*(streamer.submit(m, conversation) for m in messages))
+        # the first message and the latest of the ones that arrived meanwhile
+        self.assertEqual(
+            [call['messages'][-1]['content'] for call in state.calls],
+            ['message 0', 'message 4'],
+        )
+        self.assertEqual(streamer.coalesced, 3)
+
+    async def test_every_author_in_a_channel_gets_a_reply(self):
+        client, state = openai_client('ok', first_token_delay=0.05)
+        streamer = ReplyStreamer(client, 'model')
+        channel = StubChannel()
+        messages = [
+            channel.post('first from 1', author_id=1),
+            channel.post('from 2', author_id=2),
+            channel.post('second from 1', author_id=1),
+            channel.post('third from 1', author_id=1),
+        ]
+        await asyncio.gather(*(streamer.submit(m, conversation) for m in messages))
+        self.assertEqual(
+            sorted(call['messages'][-1]['content'] for call in state.calls),
+            ['first from 1', 'from 2', 'third from 1'],
+        )
+        self.assertEqual(state.max_active, 2)
+        replied = {reply.reference.author.id for reply in bot_messages(channel)}
+        self.assertEqual(replied, {1, 2})
+        self.assertEqual(streamer.coalesced, 1)
+
+    async def test_errors_are_reported_in_the_channel(self):
+        async def failing(message):
+            raise RuntimeError('model unavailable')
+
+        client, _ = openai_client('ok')
+        streamer = ReplyStreamer(client, 'model')
+        channel = StubChannel()
+        with self.assertLogs('llm_replies', 'ERROR'):
+            await streamer.submit(channel.post('hi'), failing)
+        self.assertEqual(bot_messages(channel)[0].content, ERROR_REPLY)
+
+
+if __name__ == '__main__':
+    unittest.main()
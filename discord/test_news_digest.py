@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from news_digest import NewsDigest, TickerTagger, format_digest, score_batch
+from news_ingest import NewsIngestor, NewsStore
+from stubs import RecordedTwitter
+
+RECORDED = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'recorded_tweets.json'
+)
+QUERY = '#StockMarket'
+HELD = ['AAPL', 'MSFT', 'NVDA']
+
+
+class Summarizer:
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, prompt, text):
+        self.requests.append(text)
+        symbols = [line[:-1] for line in text.splitlines() if line.endswith(':')]
+        return '\n'.join(f'{symbol}: news about {symbol}.' for symbol in symbols)
+
+
+# TEST SUITE
+class TestNewsDigest(unittest.TestCase):
+    def test_tags_held_cashtags_only(self):
+        tagger = TickerTagger(['aapl', 'BRK.B'])
+        self.assertEqual(
+            tagger.tag_batch(['$AAPL and $aapl beat, $TSLA too', 'buy $BRK.B', 'AAPL']),
+            [['AAPL'], ['BRK.B'], []],
+        )
+
+    def test_sentiment_scores(self):
+        scores = score_batch(['$X beats estimates', '$X misses and slides', 'flat day'])
+        self.assertEqual(scores, [1.0, -0.75, 0.0])
+
+    def test_one_request_per_digest(self):
+        summarizer = Summarizer()
+        digest = NewsDigest(TickerTagger(HELD), summarizer, max_tweets=3)
+        digest.feed(['$AAPL beats', '$AAPL slides', '$MSFT jumps', '$TSLA soars'])
+        digest.feed(['$AAPL and $MSFT rally', '$AAPL record high', '$AAPL flat'])
+        tickers = digest.digest()
+        self.assertEqual([news.symbol for news in tickers], ['AAPL', 'MSFT'])
+        self.assertEqual([news.count for news in tickers], [5, 2])
+        self.assertEqual(len(tickers[0].tweets), 3)
+        self.assertEqual(tickers[0].summary, 'news about AAPL.')
+        self.assertEqual((len(summarizer.requests), digest.api_calls), (1, 1))
+        self.assertGreater(digest.tweets_per_second, 0)
+        self.assertIn('**MSFT** (2 tweets, sentiment +1.00)', format_digest(tickers))
+        self.assertEqual(digest.digest(), [])
+        self.assertEqual(digest.api_calls, 0)
+
+    def test_digest_of_ingested_tweets(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = NewsStore(os.path.join(tmp, 'news.sqlite3'))
+            NewsIngestor(RecordedTwitter(RECORDED), store, QUERY).poll()
+            summarizer = Summarizer()
+            digest = NewsDigest(TickerTagger(HELD), summarizer)
+            for rows in store.iter_batches(QUERY, batch_size=64):
+                digest.feed(text for _, text in rows)
+            processed = digest.processed
+            tickers = digest.digest()
+            store.close()
+        self.assertEqual(processed, 250)
+        self.assertEqual({news.symbol for news in tickers}, set(HELD))
+        self.assertEqual(len(summarizer.requests), 1)
+        self.assertTrue(all(news.summary for news in tickers))
+
+
+if __name__ == '__main__':
+    unittest.main()
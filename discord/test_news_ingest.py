@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+from news_ingest import NewsIngestor, NewsStore, iter_pages
+from stubs import RecordedTwitter
+
+RECORDED = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'recorded_tweets.json'
+)
+QUERY = '#StockMarket -is:retweet'
+
+
+# TEST SUITE
+class TestNewsIngestor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'news.sqlite3')
+        self.store = NewsStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_iter_pages_follows_next_token(self):
+        twitter = RecordedTwitter(RECORDED)
+        pages = list(iter_pages(twitter, QUERY, max_results=100))
+        self.assertEqual([len(page.data) for page in pages], [100, 100, 50])
+        ids = [tweet.id for page in pages for tweet in page.data]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertEqual(len(list(iter_pages(twitter, QUERY, max_pages=2))), 2)
+
+    def test_polls_fetch_only_what_is_new(self):
+        twitter = RecordedTwitter(RECORDED, visible=200)
+        ingestor = NewsIngestor(twitter, self.store, QUERY, max_results=100)
+        first = ingestor.poll()
+        self.assertEqual((first.new, first.api_calls), (200, 2))
+
+        twitter.reveal(30)
+        second = ingestor.poll()
+        self.assertEqual((second.fetched, second.new, second.api_calls), (30, 30, 1))
+        # a from-scratch fetch of the 230 stored tweets takes 3 calls
+        self.assertEqual(second.calls_saved, 2)
+        self.assertEqual(twitter.state.calls[-1]['since_id'], twitter.tweets[199].id)
+
+        third = ingestor.poll()
+        self.assertEqual((third.fetched, third.new), (0, 0))
+        self.assertEqual(self.store.count(QUERY), 230)
+        self.assertGreater(second.tweets_per_second, 0)
+
+    def test_checkpoint_and_dedup_survive_restarts(self):
+        twitter = RecordedTwitter(RECORDED, visible=120)
+        NewsIngestor(twitter, self.store, QUERY).poll()
+        self.store.close()
+        self.store = NewsStore(self.path)
+        # an interrupted poll is replayed: stored tweets are dropped as dupes
+        self.assertEqual(self.store.add(QUERY, twitter.tweets[100:130]), 10)
+        twitter.reveal(130)
+        stats = NewsIngestor(twitter, self.store, QUERY).poll()
+        self.assertEqual((stats.fetched, stats.new, stats.duplicates), (130, 120, 10))
+        self.assertEqual(self.store.count(QUERY), 250)
+        latest = self.store.latest(QUERY, 1)[0]
+        self.assertEqual(latest[0], twitter.tweets[-1].id)
+
+    def test_truncated_polls_fill_the_gap_before_moving_the_checkpoint(self):
+        twitter = RecordedTwitter(RECORDED, visible=200)
+        ingestor = NewsIngestor(twitter, self.store, QUERY, max_pages=1)
+        with self.assertLogs('news_ingest', 'WARNING'):
+            ingestor.poll()
+        self.assertIsNone(self.store.since_id(QUERY))
+        # the newest tweets are posted while the gap is still being filled
+        twitter.reveal(50)
+        gap = ingestor.poll()
+        self.assertEqual((gap.fetched, gap.new), (100, 100))
+        self.assertEqual(twitter.state.calls[-1]['until_id'], twitter.tweets[100].id)
+        self.assertEqual(self.store.since_id(QUERY), twitter.tweets[199].id)
+        self.assertEqual(self.store.count(QUERY), 200)
+        latest = ingestor.poll()
+        self.assertEqual((latest.fetched, latest.new), (50, 50))
+        self.assertEqual(self.store.count(QUERY), 250)
+        self.assertIsNone(self.store.since_id('until:' + QUERY))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+from datetime import date, datetime
+from aiohttp.test_utils import TestServer
+from position_risk import (
+    GreeksCache,
+    aggregate,
+    format_report,
+    parse_occ_symbol,
+    position_greeks,
+    spots_from_quotes,
+    vols_from_metrics,
+)
+from stubs import POSITIONS, tastytrade_app
+from tasty_async import AsyncTastytrade
+import black_scholes as bs
+from maturity import time_to_maturity
+
+NOW = datetime(2024, 6, 3, 15, 0)  # 11:00 US/Eastern
+SPOTS = {'AAPL': 190.5, 'MSFT': 410.5}
+VOLS = {'AAPL': 0.25, 'MSFT': 0.22}
+
+
+def option(symbol, quantity, direction='Long'):
+    return {
+        'symbol': symbol,
+        'underlying-symbol': symbol[:6].strip(),
+        'instrument-type': 'Equity Option',
+        'quantity': str(quantity),
+        'quantity-direction': direction,
+        'multiplier': 100,
+    }
+
+
+# TEST SUITE
+class TestPositionRisk(unittest.TestCase):
+    def test_parse_occ_symbol(self):
+        self.assertEqual(
+            parse_occ_symbol('AAPL  240621C00190000'),
+            ('AAPL', date(2024, 6, 21), 'call', 190.0),
+        )
+        self.assertEqual(
+            parse_occ_symbol('SPY   240607P00512500'),
+            ('SPY', date(2024, 6, 7), 'put', 512.5),
+        )
+
+    def test_greeks_match_the_pricing_core(self):
+        greeks = position_greeks(POSITIONS, SPOTS, VOLS, 0.05, now=NOW)
+        T = time_to_maturity(date(2024, 6, 21), 'minutes', NOW)
+        args = (190.5, 190.0, T, 0.05, 0.25)
+        aapl = greeks.set_index('symbol').loc['AAPL  240621C00190000']
+        self.assertAlmostEqual(aapl['delta'], 200 * bs.call_delta(*args))
+        self.assertAlmostEqual(aapl['gamma'], 200 * bs.call_gamma(*args))
+        self.assertAlmostEqual(aapl['vega'], 200 * bs.call_vega(*args))
+        self.assertAlmostEqual(aapl['theta'], 200 * bs.call_theta(*args) * 100 / 252)
+        msft = greeks.set_index('symbol').loc['MSFT']
+        self.assertEqual(list(msft[['delta', 'gamma', 'vega', 'theta']]), [10, 0, 0, 0])
+
+    def test_aggregate_per_underlying_and_book(self):
+        positions = [
+            option('SPY   240607P00512500', 3),
+            option('SPY   240607C00530000', 3, 'Short'),
+            option('AAPL  240621C00190000', 1),
+        ]
+        spots = dict(SPOTS, SPY=520.0)
+        vols = dict(VOLS, SPY=0.12)
+        greeks = position_greeks(positions, spots, vols, 0.05, now=NOW)
+        summary = aggregate(greeks)
+        self.assertEqual(list(summary.index), ['AAPL', 'SPY', 'Total'])
+        self.assertLess(summary.loc['SPY', 'delta'], 0)
+        for name in ('delta', 'gamma', 'vega', 'theta'):
+            self.assertAlmostEqual(summary.loc['Total', name], greeks[name].sum())
+        self.assertIn('Total', format_report(summary))
+        self.assertIn('theta in $ per trading session', format_report(summary))
+
+    def test_cache_prices_each_contract_once_per_cycle(self):
+        cache = GreeksCache()
+        positions = [option('AAPL  240621C00190000', 1)] * 3
+        first = position_greeks(positions, SPOTS, VOLS, 0.05, cache, NOW)
+        self.assertEqual((cache.misses, cache.hits), (1, 2))
+        position_greeks(positions, SPOTS, VOLS, 0.05, cache, NOW)
+        self.assertEqual((cache.misses, cache.hits), (1, 5))
+        moved = position_greeks(
+            positions, dict(SPOTS, AAPL=195.0), VOLS, 0.05, cache, NOW
+        )
+        self.assertEqual(cache.misses, 2)
+        self.assertGreater(moved['delta'][0], first['delta'][0])
+        cache.new_cycle()
+        self.assertEqual(len(cache), 0)
+
+    def test_missing_market_data_skips_the_option(self):
+        with self.assertLogs('position_risk', 'WARNING'):
+            greeks = position_greeks(POSITIONS, {'MSFT': 410.5}, VOLS, 0.05, now=NOW)
+        self.assertEqual(list(greeks['symbol']), ['MSFT'])
+
+
+class TestMarketInputs(unittest.IsolatedAsyncioTestCase):
+    async def test_spots_and_vols_from_tastytrade(self):
+        app, state = tastytrade_app()
+        server = TestServer(app)
+        await server.start_server()
+        self.addAsyncCleanup(server.close)
+        client = AsyncTastytrade('user', 'pass', base_url=str(server.make_url('')))
+        self.addAsyncCleanup(client.close)
+        symbols = ['AAPL', 'MSFT']
+        self.assertEqual(spots_from_quotes(await client.quotes(symbols)), SPOTS)
+        self.assertEqual(vols_from_metrics(await client.market_metrics(symbols)), VOLS)
+
+
+if __name__ == '__main__':
+    unittest.main()
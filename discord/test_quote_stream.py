@@ -0,0 +1,143 @@
+import asyncio
+import os
+import unittest
+from datetime import datetime
+import numpy as np
+from aiohttp.test_utils import TestServer
+from quote_stream import DXLinkFeed, PortfolioMarks, ReplayFeed, Throttle, stream_marks
+from stubs import POSITIONS, tastytrade_app
+from tasty_async import AsyncTastytrade
+from maturity import time_to_maturity
+from scenarios import unit_value
+
+REPLAY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'replay_quotes.jsonl')
+NOW = datetime(2024, 6, 3, 15, 0)
+VOLS = {'AAPL': 0.25, 'MSFT': 0.22}
+
+
+def full_revaluation(prices):
+    aapl_T = time_to_maturity('2024-06-21', 'minutes', NOW)
+    aapl = 200 * unit_value(prices['AAPL'], 190.0, aapl_T, 0.05, 0.25, 'call')
+    return float(aapl) + 10 * prices['MSFT']
+
+
+async def replay():
+    return [tick async for tick in ReplayFeed(REPLAY)]
+
+
+# TEST SUITE
+class TestPortfolioMarks(unittest.IsolatedAsyncioTestCase):
+    async def test_replay_feed(self):
+        ticks = await replay()
+        self.assertEqual(len(ticks), 200)
+        self.assertEqual(ticks[0], ('AAPL', 190.48))
+
+    async def test_incremental_marks_match_full_revaluation(self):
+        marks = PortfolioMarks(POSITIONS, VOLS, 0.05, NOW)
+        self.assertEqual(marks.underlyings, ['AAPL', 'MSFT'])
+        last = {}
+        for symbol, price in await replay():
+            revalued = marks.on_tick(symbol, price)
+            if symbol == 'SPY':
+                self.assertFalse(revalued)
+            else:
+                self.assertEqual(revalued, last.get(symbol) != price)
+                last[symbol] = price
+            if len(last) == 2:
+                self.assertAlmostEqual(marks.total, full_revaluation(last), places=6)
+        self.assertLess(marks.revaluations, marks.ticks)
+        self.assertIn('Total', marks.render())
+
+    async def test_refresh_lets_options_decay(self):
+        marks = PortfolioMarks(POSITIONS, VOLS, 0.05, NOW)
+        marks.on_tick('AAPL', 190.0)
+        marks.on_tick('MSFT', 411.0)
+        before = marks.total
+        later = datetime(2024, 6, 4, 15, 0)
+        self.assertIn('Total', marks.render_fresh(later))
+        aapl_T = time_to_maturity('2024-06-21', 'minutes', later)
+        aapl = 200 * unit_value(190.0, 190.0, aapl_T, 0.05, 0.25, 'call')
+        self.assertAlmostEqual(marks.total, float(aapl) + 4110.0, places=6)
+        self.assertLess(marks.total, before)
+
+    async def test_throttle_coalesces_bursts(self):
+        sent = []
+
+        async def send(text):
+            sent.append(text)
+
+        state = {'n': 0}
+        poster = Throttle(send, lambda: str(state['n']), interval=0.2)
+        for n in range(1, 101):
+            state['n'] = n
+            poster.notify()
+            await asyncio.sleep(0)
+        await poster.drain()
+        # the first tick posts at once, the other 99 go out as one post
+        self.assertEqual(sent, ['1', '100'])
+        self.assertEqual(poster.posts, 2)
+        self.assertEqual(poster.coalesced, 98)
+
+    async def test_stream_marks_from_replay(self):
+        sent = []
+
+        async def send(text):
+            sent.append(text)
+
+        marks = PortfolioMarks(POSITIONS, VOLS, 0.05, NOW)
+        poster = Throttle(send, marks.render, interval=0.05)
+        await stream_marks(ReplayFeed(REPLAY), marks, poster)
+        await poster.drain()
+        self.assertLessEqual(len(sent), 2)
+        self.assertEqual(sent[-1], marks.render())
+
+
+class TestDXLinkFeed(unittest.IsolatedAsyncioTestCase):
+    async def feed(self, stub=None, **kwargs):
+        ticks = [('AAPL', 190.75), ('MSFT', float('nan')), ('MSFT', 411.0)]
+        app, state = tastytrade_app(ticks=ticks, **(stub or {}))
+        server = TestServer(app)
+        await server.start_server()
+        self.addAsyncCleanup(server.close)
+        client = AsyncTastytrade('user', 'pass', base_url=str(server.make_url('')))
+        self.addAsyncCleanup(client.close)
+        return DXLinkFeed(client, ['AAPL', 'MSFT'], **kwargs), state
+
+    async def test_streams_trades_for_the_subscribed_symbols(self):
+        feed, state = await self.feed(max_reconnects=0)
+        with self.assertLogs('quote_stream', 'ERROR'):
+            received = [tick async for tick in feed]
+        self.assertEqual(state.subscriptions, ['AAPL', 'MSFT'])
+        self.assertEqual(received, [('AAPL', 190.75), ('MSFT', 411.0)])
+        self.assertTrue(np.isfinite([price for _, price in received]).all())
+
+    async def test_reconnects_and_resubscribes_when_the_stream_closes(self):
+        feed, state = await self.feed(max_reconnects=1, backoff=0.0)
+        with self.assertLogs('quote_stream', 'WARNING') as logs:
+            received = [tick async for tick in feed]
+        self.assertIn('reconnecting', logs.output[0])
+        self.assertEqual(feed.reconnects, 1)
+        self.assertEqual(state.subscriptions, ['AAPL', 'MSFT'] * 2)
+        self.assertEqual(received, [('AAPL', 190.75), ('MSFT', 411.0)] * 2)
+
+    async def test_rejected_token_does_not_subscribe(self):
+        feed, state = await self.feed({'quote_token': 'expired'}, max_reconnects=0)
+        with self.assertLogs('quote_stream', 'ERROR') as logs:
+            received = [tick async for tick in feed]
+        self.assertIn('rejected the quote token', logs.output[0])
+        self.assertEqual(received, [])
+        self.assertEqual(state.subscriptions, [])
+
+    async def test_silent_stream_times_out_and_reconnects(self):
+        feed, state = await self.feed(
+            {'stall': True}, max_reconnects=1, backoff=0.0, timeout=0.2
+        )
+        with self.assertLogs('quote_stream', 'WARNING') as logs:
+            received = [tick async for tick in feed]
+        self.assertIn('no message from DXLink', logs.output[0])
+        self.assertEqual(len(received), 4)
+        self.assertEqual(state.subscriptions, ['AAPL', 'MSFT'] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
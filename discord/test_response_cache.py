@@ -0,0 +1,141 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from llm_replies import ReplyStreamer
+from response_cache import ResponseCache, normalize
+from stubs import StubChannel, openai_client
+
+
+def chat(*turns, system='You are NassauGPT.'):
+    roles = ['user', 'assistant']
+    messages = [{'role': 'system', 'content': system}]
+    for i, content in enumerate(turns[::-1]):
+        messages.insert(1, {'role': roles[i % 2], 'content': content})
+    return messages
+
+
+# TEST SUITE
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'cache.sqlite3')
+        self.cache = ResponseCache(self.path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_normalize(self):
+        self.assertEqual(normalize('  What is DELTA?!\n'), 'what is delta')
+
+    def test_hits_on_normalized_question_and_context(self):
+        self.cache.put(chat('what is delta'), 'Delta is...', 3.0)
+        self.assertEqual(self.cache.get(chat('What is delta?')), 'Delta is...')
+        # the system prompt and rolling summary are not part of the key
+        self.assertEqual(
+            self.cache.get(chat('what is delta', system='other')), 'Delta is...'
+        )
+        self.assertIsNone(self.cache.get(chat('hi', 'hello!', 'what is delta')))
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 2 / 3)
+        self.assertEqual(stats['saved_seconds'], 6.0)
+
+    def test_fuzzy_match_is_opt_in(self):
+        self.cache.put(chat('explain theta decay to me'), 'Theta is...', 2.0)
+        self.assertIsNone(self.cache.get(chat('explain theta decay for me')))
+        cache = ResponseCache(self.path, fuzzy=0.9)
+        self.assertEqual(cache.get(chat('explain theta decay for me')), 'Theta is...')
+        self.assertIsNone(cache.get(chat('explain vega to me')))
+        self.assertEqual(cache.fuzzy_hits, 1)
+        cache.close()
+
+    def test_fuzzy_match_needs_the_same_numbers_and_content_words(self):
+        cache = ResponseCache(':memory:', fuzzy=0.9)
+        for asked, other in [
+            (
+                'what is the delta of a 100 strike call',
+                'what is the delta of a 105 strike call',
+            ),
+            (
+                'price of a spy 450 call expiring friday',
+                'price of a spy 455 call expiring friday',
+            ),
+            (
+                'difference between delta and gamma',
+                'difference between delta and theta',
+            ),
+        ]:
+            cache.put(chat(asked), f'answer to {asked}', 1.0)
+            self.assertIsNone(cache.get(chat(other)), other)
+        self.assertEqual(cache.fuzzy_hits, 0)
+        cache.close()
+
+    def test_ttl(self):
+        self.cache.put(chat('what is delta'), 'Delta is...', 1.0)
+        later = time.time() + self.cache.ttl + 1
+        with mock.patch('response_cache.time.time', return_value=later):
+            self.assertIsNone(self.cache.get(chat('what is delta')))
+            # expired rows are pruned when the next answer is stored
+            self.assertEqual(len(self.cache), 1)
+            self.cache.put(chat('what is gamma'), 'Gamma is...', 1.0)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(':memory:', max_entries=3, fuzzy=None)
+        for i in range(3):
+            cache.put(chat(f'question {i}'), f'answer {i}', 1.0)
+            time.sleep(0.001)
+        cache.get(chat('question 0'))
+        time.sleep(0.001)
+        cache.put(chat('question 3'), 'answer 3', 1.0)
+        self.assertEqual(len(cache), 3)
+        self.assertIsNone(cache.get(chat('question 1')))
+        self.assertEqual(cache.get(chat('question 0')), 'answer 0')
+
+    def test_survives_restarts(self):
+        self.cache.put(chat('what is delta'), 'Delta is...', 1.0)
+        self.cache.close()
+        self.cache = ResponseCache(self.path)
+        self.assertEqual(self.cache.get(chat('what is delta')), 'Delta is...')
+
+
+class TestCachedReplies(unittest.IsolatedAsyncioTestCase):
+    async def test_repeat_questions_skip_the_model(self):
+        async def conversation(message):
+            return chat(message.content)
+
+        client, state = openai_client('Delta is the sensitivity to spot.')
+        cache = ResponseCache(':memory:')
+        streamer = ReplyStreamer(client, 'model', cache=cache)
+        channel = StubChannel()
+        await streamer.submit(channel.post('what is delta'), conversation)
+        await streamer.submit(channel.post('What is delta?'), conversation)
+        replies = [m.content for m in channel.messages if m.author.bot]
+        self.assertEqual(replies, ['Delta is the sensitivity to spot.'] * 2)
+        self.assertEqual(len(state.calls), 1)
+        self.assertEqual(cache.hits, 1)
+        cache.close()
+
+    async def test_lookups_run_off_the_event_loop(self):
+        cache = ResponseCache(':memory:')
+        await cache.store(chat('what is delta'), 'Delta is...', 1.0)
+        loop_thread = threading.get_ident()
+        threads = []
+        real_get = cache.get
+
+        def get(messages):
+            threads.append(threading.get_ident())
+            return real_get(messages)
+
+        cache.get = get
+        self.assertEqual(await cache.lookup(chat('what is delta')), 'Delta is...')
+        self.assertNotIn(loop_thread, threads)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
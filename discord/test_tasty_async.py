@@ -0,0 +1,86 @@
+import asyncio
+import time
+import unittest
+from aiohttp.test_utils import TestServer
+from stubs import tastytrade_app
+from tasty_async import AsyncTastytrade, TastytradeError
+
+
+# TEST SUITE
+class TestAsyncTastytrade(unittest.IsolatedAsyncioTestCase):
+    async def serve(self, **stub):
+        app, state = tastytrade_app(**stub)
+        server = TestServer(app)
+        await server.start_server()
+        self.addAsyncCleanup(server.close)
+        client = AsyncTastytrade('user', 'pass', base_url=str(server.make_url('')))
+        self.addAsyncCleanup(client.close)
+        return state, client
+
+    async def test_token_is_reused_across_reports(self):
+        state, client = await self.serve()
+        for _ in range(3):
+            account, positions = await client.snapshot('5WT00001')
+        self.assertEqual(account['data']['cash-balance'], '123456.78')
+        self.assertEqual(len(positions['data']['items']), 2)
+        self.assertEqual(client.logins, 1)
+        self.assertEqual(state.calls.count('/sessions'), 1)
+
+    async def test_balances_and_positions_are_concurrent(self):
+        _, client = await self.serve(latency=0.2)
+        await client.balances('5WT00001')  # log in first
+        start = time.perf_counter()
+        await client.snapshot('5WT00001')
+        self.assertLess(time.perf_counter() - start, 0.35)
+
+    async def test_event_loop_keeps_ticking(self):
+        _, client = await self.serve(latency=0.2)
+        gaps = []
+
+        async def heartbeat():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        ticker = asyncio.create_task(heartbeat())
+        await client.snapshot('5WT00001')
+        ticker.cancel()
+        self.assertGreater(len(gaps), 10)
+        self.assertLess(max(gaps), 0.1)
+
+    async def test_retries_server_errors(self):
+        state, client = await self.serve(fail_first=2)
+        client.backoff = 0.01
+        account = await client.balances('5WT00001')
+        self.assertEqual(account['data']['cash-balance'], '123456.78')
+        self.assertEqual(state.calls.count('/accounts/5WT00001/balances'), 3)
+
+    async def test_gives_up_after_retries(self):
+        _, client = await self.serve(fail_first=10)
+        client.backoff = 0.01
+        client.retries = 2
+        with self.assertRaises(TastytradeError):
+            await client.balances('5WT00001')
+
+    async def test_relogin_on_expired_token(self):
+        state, client = await self.serve()
+        await client.balances('5WT00001')
+        client._token = 'expired-token'
+        await client.balances('5WT00001')
+        self.assertEqual(client.logins, 2)
+
+    async def test_timeout(self):
+        _, client = await self.serve(latency=1.0)
+        client = AsyncTastytrade(
+            'user', 'pass', base_url=client.base_url, timeout=0.1, retries=0
+        )
+        self.addAsyncCleanup(client.close)
+        with self.assertRaises(asyncio.TimeoutError):
+            await client.balances('5WT00001')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+# Bulk pricing of option chains stored as CSV or Parquet.
+#
+#   python lib/batch_pricing.py chain.csv priced.csv
+#   python lib/batch_pricing.py chain.parquet priced.parquet --chunksize 500000
+#   python lib/batch_pricing.py chain.parquet priced.parquet --workers 0
+#
+# The input is read in fixed-size chunks, each chunk is priced with
+# vectorized.price_chain and appended to the output before the next one is
+# read, so memory use is bounded by the chunk size rather than the file size.
+# With --workers the chunks are priced in a process pool (0 means one worker
+# per core), with at most two chunks per worker in flight at any time.
+#
+# Columns follow black_scholes_cli.py: S, K, r and sigma (rate and volatility
+# in percent) and either T (years) or expiry (mm-dd-yyyy), with --maturity
+# choosing calendar days, trading days or trading minutes for expiries. Every
+# input column is passed through and the prices and greeks are added after
+# them. The numeric columns are always read as floats, so every chunk has the
+# same schema, and an empty input still gets every input and output column.
+# Parquet needs pyarrow.
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+
+import pandas as pd
+
+from black_scholes import PriceAndGreeks
+from black_scholes_cli import DATE_FORMAT
+from maturity import MODES, time_to_maturity
+from vectorized import price_chain
+
+OUTPUT_FIELDS = list(PriceAndGreeks.__slots__)
+NUMERIC_COLUMNS = ('S', 'K', 'T', 'r', 'sigma')
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+
+
+def _pyarrow_parquet():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as ex:
+        raise ImportError('Reading or writing Parquet requires pyarrow') from ex
+    return pyarrow, pyarrow.parquet
+
+
+def _floats(frame):
+    return frame.astype({name: float for name in NUMERIC_COLUMNS if name in frame})
+
+
+# chunks of the input with float numeric columns; an empty input yields one
+# empty chunk, so the output still gets its columns
+def iter_chunks(path, chunksize):
+    if _is_parquet(path):
+        _, pq = _pyarrow_parquet()
+        parquet = pq.ParquetFile(path)
+        batches = parquet.iter_batches(batch_size=chunksize)
+        chunks = (_floats(batch.to_pandas()) for batch in batches)
+        empty = _floats(parquet.schema_arrow.empty_table().to_pandas())
+    else:
+        dtype = dict.fromkeys(NUMERIC_COLUMNS, float)
+        chunks = pd.read_csv(path, chunksize=chunksize, dtype=dtype)
+        empty = pd.read_csv(path, nrows=0, dtype=dtype)
+    chunk = None
+    for chunk in chunks:
+        yield chunk
+    if chunk is None:
+        yield empty
+
+
+def price_frame(chunk, maturity='calendar'):
+    if 'T' in chunk:
+        T = chunk['T'].to_numpy(dtype=float)
+    else:
+        expiry = pd.to_datetime(chunk['expiry'], format=DATE_FORMAT)
+        T = time_to_maturity(expiry, maturity)
+    result = price_chain(
+        chunk['S'].to_numpy(dtype=float),
+        chunk['K'].to_numpy(dtype=float),
+        T,
+        chunk['r'].to_numpy(dtype=float) / 100,
+        chunk['sigma'].to_numpy(dtype=float) / 100,
+    )
+    priced = chunk.copy()
+    for name in OUTPUT_FIELDS:
+        priced[name] = getattr(result, name)
+    return priced
+
+
+# price chunks in a process pool, keeping at most max_pending of them in
+# flight and yielding results in input order
+def _pool_map(price, chunks, workers, max_pending):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(price, chunk))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class _ChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self.parquet = _is_parquet(path)
+        self._writer = None
+        self._header = True
+
+    def write(self, frame):
+        if self.parquet:
+            pa, pq = _pyarrow_parquet()
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                # pass-through columns can still be inferred differently
+                table = table.cast(self._writer.schema)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(
+                self.path,
+                mode='w' if self._header else 'a',
+                header=self._header,
+                index=False,
+            )
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# price every contract in input_path and write the results to output_path;
+# returns the number of contracts priced
+def price_file(
+    input_path, output_path, chunksize=100_000, workers=None, maturity='calendar'
+):
+    chunks = iter_chunks(input_path, chunksize)
+    price = partial(price_frame, maturity=maturity)
+    if workers is None:
+        priced = map(price, chunks)
+    else:
+        workers = workers or os.cpu_count()
+        priced = _pool_map(price, chunks, workers, 2 * workers)
+
+    writer = _ChunkWriter(output_path)
+    count = 0
+    try:
+        for frame in priced:
+            writer.write(frame)
+            count += len(frame)
+    finally:
+        writer.close()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Price a CSV or Parquet file of option contracts in chunks.'
+    )
+    parser.add_argument('input', help='CSV or Parquet file of contracts')
+    parser.add_argument('output', help='CSV or Parquet file to write')
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='price chunks in this many processes (0 for one per core)',
+    )
+    parser.add_argument(
+        '--maturity',
+        choices=MODES,
+        default='calendar',
+        help='time to maturity in calendar days, trading days or trading minutes',
+    )
+    args = parser.parse_args(argv)
+    start = datetime.now()
+    count = price_file(
+        args.input, args.output, args.chunksize, args.workers, args.maturity
+    )
+    elapsed = (datetime.now() - start).total_seconds()
+    print(f'priced {count:,} contracts in {elapsed:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,30 @@
 # import packages
+from __future__ import annotations
+
 from math import log, sqrt, exp
-from scipy.stats import norm
-from datetime import datetime
-from pandas import DataFrame
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import normal
+
+if TYPE_CHECKING:
+    import numpy as np
 
 # Underlying price (per share): S;
 # Strike price of the option (per share): K;
 # Time to maturity (years): T;
 # Continuously compounding risk-free interest rate: r;
 # Volatility: sigma;
+#
+# This module is the importable pricing core. The interactive and bulk
+# command line lives in black_scholes_cli.py. The normal CDF / PDF come from
+# the backend selected in normal.py.
 
 
 # factor by which present value of contingent receipt
 # of stock exceeds current stock price
 def d1(S, K, T, r, sigma):
-    return (log(S / K) + (r + sigma**2 / 2.0) * T) / sigma * sqrt(T)
+    return (log(S / K) + (r + sigma**2 / 2.0) * T) / (sigma * sqrt(T))
 
 
 # the risk-adjusted probability that the option will be exercised
@@ -24,7 +34,7 @@ def d2(S, K, T, r, sigma):
 
 # define the call options price function
 def call(S, K, T, r, sigma):
-    return S * norm.cdf(d1(S, K, T, r, sigma)) - K * exp(-r * T) * norm.cdf(
+    return S * normal.cdf(d1(S, K, T, r, sigma)) - K * exp(-r * T) * normal.cdf(
         d2(S, K, T, r, sigma)
     )
 
@@ -36,148 +46,109 @@ def bs_put(S, K, T, r, sigma):
 
 # define the Call_Greeks of an option
 def call_delta(S, K, T, r, sigma):
-    return norm.cdf(d1(S, K, T, r, sigma))
+    return normal.cdf(d1(S, K, T, r, sigma))
 
 
 def call_gamma(S, K, T, r, sigma):
-    return norm.pdf(d1(S, K, T, r, sigma)) / (S * sigma * sqrt(T))
+    return normal.pdf(d1(S, K, T, r, sigma)) / (S * sigma * sqrt(T))
 
 
 def call_vega(S, K, T, r, sigma):
-    return 0.01 * (S * norm.pdf(d1(S, K, T, r, sigma)) * sqrt(T))
+    return 0.01 * (S * normal.pdf(d1(S, K, T, r, sigma)) * sqrt(T))
 
 
 def call_theta(S, K, T, r, sigma):
     return 0.01 * (
-        -(S * norm.pdf(d1(S, K, T, r, sigma)) * sigma) / (2 * sqrt(T))
-        - r * K * exp(-r * T) * norm.cdf(d2(S, K, T, r, sigma))
+        -(S * normal.pdf(d1(S, K, T, r, sigma)) * sigma) / (2 * sqrt(T))
+        - r * K * exp(-r * T) * normal.cdf(d2(S, K, T, r, sigma))
     )
 
 
 def call_rho(S, K, T, r, sigma):
-    return 0.01 * (K * T * exp(-r * T) * norm.cdf(d2(S, K, T, r, sigma)))
+    return 0.01 * (K * T * exp(-r * T) * normal.cdf(d2(S, K, T, r, sigma)))
 
 
 # define the Put_Greeks of an option
 def put_delta(S, K, T, r, sigma):
-    return -norm.cdf(-d1(S, K, T, r, sigma))
+    return -normal.cdf(-d1(S, K, T, r, sigma))
 
 
 def put_gamma(S, K, T, r, sigma):
-    return norm.pdf(d1(S, K, T, r, sigma)) / (S * sigma * sqrt(T))
+    return normal.pdf(d1(S, K, T, r, sigma)) / (S * sigma * sqrt(T))
 
 
 def put_vega(S, K, T, r, sigma):
-    return 0.01 * (S * norm.pdf(d1(S, K, T, r, sigma)) * sqrt(T))
+    return 0.01 * (S * normal.pdf(d1(S, K, T, r, sigma)) * sqrt(T))
 
 
 def put_theta(S, K, T, r, sigma):
     return 0.01 * (
-        -(S * norm.pdf(d1(S, K, T, r, sigma)) * sigma) / (2 * sqrt(T))
-        + r * K * exp(-r * T) * norm.cdf(-d2(S, K, T, r, sigma))
+        -(S * normal.pdf(d1(S, K, T, r, sigma)) * sigma) / (2 * sqrt(T))
+        + r * K * exp(-r * T) * normal.cdf(-d2(S, K, T, r, sigma))
     )
 
 
 def put_rho(S, K, T, r, sigma):
-    return 0.01 * (-K * T * exp(-r * T) * norm.cdf(-d2(S, K, T, r, sigma)))
-
-
-# input the current stock price and check if it is a number.
-S = input('What is the current stock price?: ')
-while True:
-    try:
-        S = float(S)
-        break
-    except Exception as ex:
-        print('The current stock price has to be a NUMBER. Exception: %s' % (ex,))
-        S = input('What is the current stock price?: ')
-
-# input the strike price and check if it is a number.
-K = input('What is the strike price?: ')
-while True:
-    try:
-        K = float(K)
-        break
-    except Exception as ex:
-        print('The the strike price has to be a NUMBER. Exception: %s' % (ex,))
-        K = input('What is the strike price?: ')
-
-# input the expiration_date and calculate the days between today and the expiration date.
-while True:
-    expiration_date = input(
-        'What is the expiration date of the options (mm-dd-yyyy)?: '
+    return 0.01 * (-K * T * exp(-r * T) * normal.cdf(-d2(S, K, T, r, sigma)))
+
+
+# every price and greek of one contract, for both the call and the put
+# (gamma and vega are the same for both); vectorized.price_chain fills the
+# same fields with arrays
+@dataclass
+class PriceAndGreeks:
+    __slots__ = (
+        'call',
+        'put',
+        'call_delta',
+        'put_delta',
+        'gamma',
+        'vega',
+        'call_theta',
+        'put_theta',
+        'call_rho',
+        'put_rho',
+    )
+    call: float | np.ndarray
+    put: float | np.ndarray
+    call_delta: float | np.ndarray
+    put_delta: float | np.ndarray
+    gamma: float | np.ndarray
+    vega: float | np.ndarray
+    call_theta: float | np.ndarray
+    put_theta: float | np.ndarray
+    call_rho: float | np.ndarray
+    put_rho: float | np.ndarray
+
+
+# compute d1, d2, N(+-d1), N(+-d2), n(d1) and exp(-rT) once and derive
+# every price and greek from them, instead of calling the functions above
+# one by one (each of which recomputes d1 and its own normal terms)
+def price_and_greeks(S, K, T, r, sigma):
+    sqrt_T = sqrt(T)
+    sigma_sqrt_T = sigma * sqrt_T
+    d_1 = (log(S / K) + (r + sigma**2 / 2.0) * T) / sigma_sqrt_T
+    d_2 = d_1 - sigma_sqrt_T
+    cdf_d1, cdf_d2, cdf_neg_d1, cdf_neg_d2 = normal.cdfs((d_1, d_2, -d_1, -d_2))
+    pdf_d1 = normal.pdf(d_1)
+    pv_strike = K * exp(-r * T)
+    decay = -(S * pdf_d1 * sigma) / (2 * sqrt_T)
+    call_price = S * cdf_d1 - pv_strike * cdf_d2
+    return PriceAndGreeks(
+        call=call_price,
+        put=pv_strike - S + call_price,
+        call_delta=cdf_d1,
+        put_delta=-cdf_neg_d1,
+        gamma=pdf_d1 / (S * sigma_sqrt_T),
+        vega=0.01 * (S * pdf_d1 * sqrt_T),
+        call_theta=0.01 * (decay - r * pv_strike * cdf_d2),
+        put_theta=0.01 * (decay + r * pv_strike * cdf_neg_d2),
+        call_rho=0.01 * (T * pv_strike * cdf_d2),
+        put_rho=0.01 * (-T * pv_strike * cdf_neg_d2),
     )
-    try:
-        expiration_date = datetime.strptime(expiration_date, '%m-%d-%Y')
-    except ValueError as e:
-        print('error: %s\nTry again.' % (e,))
-    else:
-        break
-T = (expiration_date - datetime.utcnow()).days / 365
-
-# input the continuously compounding risk-free interest rate and check if it is a number.
-r = input('What is the continuously compounding risk-free interest rate?: ')
-while True:
-    try:
-        r = float(r)
-        break
-    except Exception:
-        print(
-            'The continuously compounding risk-free interest rate has to be a NUMBER. Exception: %s'
-        )
-        r = input('What is the continuously compounding risk-free interest rate?: ')
-
-# input the volatility and check if it is a number.
-sigma = input('What is the historical volatility of the stock?: ')
-while True:
-    try:
-        sigma = float(sigma)
-        if sigma < 0:
-            print('The range of sigma has to be greater than 0.')
-            sigma = input('What is the historical volatility of the stock?: ')
-        break
-    except Exception as ex:
-        print('The volatility has to be a NUMBER. Exception: %s' % (ex,))
-        sigma = input('What is the historical volatility of the stock?: ')
-
-# make a DataFrame of these inputs
-data = {'Symbol': ['S', 'K', 'T', 'r', 'sigma'], 'Input': [S, K, T, r, sigma]}
-input_frame = DataFrame(
-    data,
-    columns=['Symbol', 'Input'],
-    index=[
-        'Underlying price',
-        'Strike price',
-        'Time to maturity',
-        'Risk-free interest rate',
-        'Volatility',
-    ],
-)
-
-# calculate the call / put option price and the greeks of the call / put option
-r = r / 100
-sigma = sigma / 100
-price_and_greeks = {
-    'Call': [
-        call(S, K, T, r, sigma),
-        call_delta(S, K, T, r, sigma),
-        call_gamma(S, K, T, r, sigma),
-        call_vega(S, K, T, r, sigma),
-        call_rho(S, K, T, r, sigma),
-        call_theta(S, K, T, r, sigma),
-    ],
-    'Put': [
-        bs_put(S, K, T, r, sigma),
-        put_delta(S, K, T, r, sigma),
-        put_gamma(S, K, T, r, sigma),
-        put_vega(S, K, T, r, sigma),
-        put_rho(S, K, T, r, sigma),
-        put_theta(S, K, T, r, sigma),
-    ],
-}
-price_and_greeks_frame = DataFrame(
-    price_and_greeks,
-    columns=['Call', 'Put'],
-    index=['Price', 'delta', 'gamma', 'vega', 'rho', 'theta'],
-)
-print(price_and_greeks_frame)
+
+
+if __name__ == '__main__':
+    from black_scholes_cli import main
+
+    main()
@@ -0,0 +1,227 @@
+# Command line front end for the Black-Scholes pricer.
+#
+#   python lib/black_scholes_cli.py                      # interactive prompts
+#   python lib/black_scholes_cli.py --spot 100 --strike 105 --expiry 06-21-2024 \
+#       --rate 5 --vol 25                                # one contract from flags
+#   python lib/black_scholes_cli.py --file chain.csv     # many contracts
+#   cat chain.csv | python lib/black_scholes_cli.py --file -
+#   python lib/black_scholes_cli.py --history spy.csv   # volatility from bars
+#
+# As with the interactive prompts, the rate and volatility are in percent. A
+# contract file is a CSV with the columns S, K, r and sigma and either an
+# expiry column (mm-dd-yyyy) or a T column (years); prices and greeks are
+# written as CSV to stdout. --maturity picks how an expiry becomes T: calendar
+# days (the default), trading days or trading minutes (see maturity.py).
+# --history replaces the volatility prompt or --vol with an estimate from a
+# CSV of daily bars (open, high, low and close columns, oldest first), using
+# --estimator over the last --window bars (see volatility.py). Heavy packages
+# are only imported once they are needed: pandas for the single-contract
+# table, NumPy and SciPy for pricing.
+import argparse
+import csv
+import sys
+from datetime import datetime
+
+from black_scholes import PriceAndGreeks, price_and_greeks
+
+DATE_FORMAT = '%m-%d-%Y'
+OUTPUT_FIELDS = list(PriceAndGreeks.__slots__)
+
+
+def time_to_maturity(expiration_date, mode='calendar'):
+    from maturity import time_to_maturity
+
+    return time_to_maturity(expiration_date, mode)
+
+
+# keep asking until the answer parses as a float
+def prompt_number(question, error):
+    value = input(question)
+    while True:
+        try:
+            return float(value)
+        except Exception as ex:
+            print('%s Exception: %s' % (error, ex))
+            value = input(question)
+
+
+# annualized volatility, in percent, of a CSV of daily bars
+def historical_volatility(stream, estimator='yang_zhang', window=20):
+    import numpy as np
+    from volatility import ESTIMATOR_INPUTS, estimate
+
+    rows = list(csv.DictReader(stream))
+    bars = {
+        name: np.array([float(row[name]) for row in rows])
+        for name in ESTIMATOR_INPUTS[estimator]
+    }
+    return 100 * float(estimate(bars, estimator, window))
+
+
+def prompt_contract(maturity='calendar', sigma=None):
+    S = prompt_number(
+        'What is the current stock price?: ',
+        'The current stock price has to be a NUMBER.',
+    )
+    K = prompt_number(
+        'What is the strike price?: ', 'The the strike price has to be a NUMBER.'
+    )
+    # input the expiration_date and calculate the days between today and the expiration date.
+    while True:
+        expiration_date = input(
+            'What is the expiration date of the options (mm-dd-yyyy)?: '
+        )
+        try:
+            expiration_date = datetime.strptime(expiration_date, DATE_FORMAT)
+        except ValueError as e:
+            print('error: %s\nTry again.' % (e,))
+        else:
+            break
+    T = time_to_maturity(expiration_date, maturity)
+    r = prompt_number(
+        'What is the continuously compounding risk-free interest rate?: ',
+        'The continuously compounding risk-free interest rate has to be a NUMBER.',
+    )
+    while sigma is None:
+        sigma = prompt_number(
+            'What is the historical volatility of the stock?: ',
+            'The volatility has to be a NUMBER.',
+        )
+        if sigma < 0:
+            print('The range of sigma has to be greater than 0.')
+            sigma = None
+    return S, K, T, r, sigma
+
+
+def print_contract(S, K, T, r, sigma):
+    from pandas import DataFrame
+
+    # calculate the call / put option price and the greeks of the call / put option
+    result = price_and_greeks(S, K, T, r / 100, sigma / 100)
+    table = {
+        'Call': [
+            result.call,
+            result.call_delta,
+            result.gamma,
+            result.vega,
+            result.call_rho,
+            result.call_theta,
+        ],
+        'Put': [
+            result.put,
+            result.put_delta,
+            result.gamma,
+            result.vega,
+            result.put_rho,
+            result.put_theta,
+        ],
+    }
+    price_and_greeks_frame = DataFrame(
+        table,
+        columns=['Call', 'Put'],
+        index=['Price', 'delta', 'gamma', 'vega', 'rho', 'theta'],
+    )
+    print(price_and_greeks_frame)
+
+
+# read a contract CSV and return its rows plus S, K, T, r, sigma arrays
+def read_contracts(stream, maturity='calendar'):
+    import numpy as np
+
+    rows = list(csv.DictReader(stream))
+    columns = {}
+    for name in ('S', 'K', 'r', 'sigma'):
+        columns[name] = np.array([float(row[name]) for row in rows])
+    if rows and 'T' in rows[0]:
+        columns['T'] = np.array([float(row['T']) for row in rows])
+    else:
+        expiry = [datetime.strptime(row['expiry'], DATE_FORMAT) for row in rows]
+        columns['T'] = np.asarray(time_to_maturity(expiry, maturity), dtype=float)
+    return rows, columns
+
+
+def price_contracts(stream, out, maturity='calendar'):
+    from vectorized import price_chain
+
+    rows, c = read_contracts(stream, maturity)
+    result = price_chain(c['S'], c['K'], c['T'], c['r'] / 100, c['sigma'] / 100)
+    fieldnames = list(rows[0].keys()) if rows else []
+    writer = csv.DictWriter(out, fieldnames=fieldnames + OUTPUT_FIELDS)
+    writer.writeheader()
+    for i, row in enumerate(rows):
+        row.update({name: getattr(result, name)[i] for name in OUTPUT_FIELDS})
+        writer.writerow(row)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Black-Scholes prices and greeks for European options.'
+    )
+    parser.add_argument('--spot', type=float, help='current stock price')
+    parser.add_argument('--strike', type=float, help='strike price')
+    parser.add_argument('--expiry', help='expiration date (mm-dd-yyyy)')
+    parser.add_argument('--rate', type=float, help='risk-free rate, in percent')
+    parser.add_argument('--vol', type=float, help='volatility, in percent')
+    parser.add_argument(
+        '--file',
+        type=argparse.FileType('r'),
+        help="CSV of contracts to price in bulk, or '-' for stdin",
+    )
+    parser.add_argument(
+        '--maturity',
+        choices=('calendar', 'trading', 'minutes'),
+        default='calendar',
+        help='time to maturity in calendar days, trading days or trading minutes',
+    )
+    parser.add_argument(
+        '--history',
+        type=argparse.FileType('r'),
+        help='CSV of daily bars to estimate the volatility from, instead of --vol',
+    )
+    parser.add_argument(
+        '--estimator',
+        choices=('close', 'parkinson', 'garman_klass', 'yang_zhang', 'ewma'),
+        default='yang_zhang',
+        help='historical volatility estimator for --history',
+    )
+    parser.add_argument(
+        '--window', type=int, default=20, help='bars in the --history estimate'
+    )
+    return parser, parser.parse_args(argv)
+
+
+def main(argv=None):
+    parser, args = parse_args(argv)
+    if args.history is not None:
+        if args.vol is not None or args.file is not None:
+            parser.error('--history does not go with --vol or --file')
+        if args.window < 2:
+            parser.error('--window: has to be at least 2 bars')
+        try:
+            args.vol = historical_volatility(args.history, args.estimator, args.window)
+        except (KeyError, ValueError) as e:
+            parser.error('--history: %s' % (e,))
+        if args.vol != args.vol:
+            parser.error('--history: fewer bars than --window needs')
+        print('Historical volatility (%s): %.2f%%' % (args.estimator, args.vol))
+    flags = (args.spot, args.strike, args.expiry, args.rate, args.vol)
+
+    if args.file is not None:
+        price_contracts(args.file, sys.stdout, args.maturity)
+    elif all(flag is not None for flag in flags):
+        try:
+            expiration_date = datetime.strptime(args.expiry, DATE_FORMAT)
+        except ValueError as e:
+            parser.error('--expiry: %s' % (e,))
+        if args.vol < 0:
+            parser.error('--vol: the range of sigma has to be greater than 0.')
+        T = time_to_maturity(expiration_date, args.maturity)
+        print_contract(args.spot, args.strike, T, args.rate, args.vol)
+    elif any(flag is not None for flag in flags[: 4 if args.history else 5]):
+        parser.error('--spot, --strike, --expiry, --rate and --vol go together')
+    else:
+        print_contract(*prompt_contract(args.maturity, args.vol))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# import packages
+from dataclasses import dataclass
+
+import numpy as np
+
+from vectorized import bs_put, call, call_vega
+
+# Implied volatility: the sigma that makes call / bs_put reproduce a market
+# price. Every quote of a chain is solved at once: each iteration prices all
+# still-unconverged quotes in one vectorized call and takes a Newton step,
+# falling back to bisecting the quote's bracket when vega is too small for
+# Newton to be trusted or the step would leave the bracket.
+
+# per-quote convergence status
+CONVERGED = 0
+MAX_ITERATIONS = 1  # ran out of iterations before reaching the tolerance
+OUT_OF_BOUNDS = 2  # price violates the no-arbitrage bounds, no sigma exists
+EXPIRED = 3  # T <= 0, the price no longer depends on sigma
+
+SIGMA_LOWER = 1e-6
+SIGMA_UPPER = 5.0
+
+
+@dataclass
+class ImpliedVolResult:
+    __slots__ = ('sigma', 'status', 'iterations')
+    sigma: np.ndarray
+    status: np.ndarray
+    iterations: np.ndarray
+
+
+# the no-arbitrage price range of a European option
+def price_bounds(S, K, T, r, is_call):
+    pv_strike = K * np.exp(-r * T)
+    lower = np.where(
+        is_call, np.maximum(S - pv_strike, 0.0), np.maximum(pv_strike - S, 0.0)
+    )
+    upper = np.where(is_call, S, pv_strike)
+    return lower, upper
+
+
+# Manaster-Koehler starting point: the sigma at which the option's vega is
+# largest, from which Newton converges monotonically
+def initial_guess(S, K, T, r):
+    return np.sqrt(2.0 * np.abs(np.log(S / K) + r * T) / T)
+
+
+def _price(S, K, T, r, sigma, is_call):
+    return np.where(is_call, call(S, K, T, r, sigma), bs_put(S, K, T, r, sigma))
+
+
+def implied_volatility(
+    price,
+    S,
+    K,
+    T,
+    r,
+    option_type='call',
+    tol=1e-8,
+    max_iter=100,
+    min_vega=1e-10,
+    sigma_lower=SIGMA_LOWER,
+    sigma_upper=SIGMA_UPPER,
+):
+    price, S, K, T, r, option_type = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (price, S, K, T, r)),
+        np.asarray(option_type),
+    )
+    is_call = option_type == 'call'
+    shape = price.shape
+    price, S, K, T, r, is_call = (x.ravel() for x in (price, S, K, T, r, is_call))
+    n = price.size
+
+    sigma = np.full(n, np.nan)
+    status = np.full(n, MAX_ITERATIONS, dtype=np.int8)
+    iterations = np.zeros(n, dtype=np.int32)
+
+    lower, upper = price_bounds(S, K, T, r, is_call)
+    valid = (price >= lower) & (price <= upper)
+    status[~valid] = OUT_OF_BOUNDS
+    expired = ~(T > 0)
+    status[expired] = EXPIRED
+    valid &= ~expired
+
+    idx = np.flatnonzero(valid)
+    lo = np.full(idx.size, sigma_lower)
+    hi = np.full(idx.size, sigma_upper)
+    guess = np.clip(
+        initial_guess(S[idx], K[idx], T[idx], r[idx]), sigma_lower, sigma_upper
+    )
+
+    for iteration in range(1, max_iter + 1):
+        if idx.size == 0:
+            break
+        s, k, t, rate, c = S[idx], K[idx], T[idx], r[idx], is_call[idx]
+        diff = _price(s, k, t, rate, guess, c) - price[idx]
+        # call_vega is per vol point; Newton needs the derivative per unit sigma
+        vega = 100.0 * call_vega(s, k, t, rate, guess)
+
+        # keep a bracket around the root: price is increasing in sigma
+        hi = np.where(diff > 0, guess, hi)
+        lo = np.where(diff <= 0, guess, lo)
+
+        done = (np.abs(diff) < tol) | (hi - lo < tol)
+        sigma[idx[done]] = guess[done]
+        status[idx[done]] = CONVERGED
+        iterations[idx] = iteration
+
+        keep = ~done
+        idx, guess, diff, vega, lo, hi = (
+            x[keep] for x in (idx, guess, diff, vega, lo, hi)
+        )
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = guess - diff / vega
+        bisect = (vega < min_vega) | ~(newton > lo) | ~(newton < hi)
+        guess = np.where(bisect, 0.5 * (lo + hi), newton)
+
+    # unconverged quotes report their best estimate
+    sigma[idx] = guess
+
+    return ImpliedVolResult(
+        sigma=sigma.reshape(shape),
+        status=status.reshape(shape),
+        iterations=iterations.reshape(shape),
+    )
@@ -0,0 +1,93 @@
+# import packages
+import numpy as np
+
+# Lattice pricers for American (and European) options: a Cox-Ross-Rubinstein
+# binomial tree and a Boyle trinomial tree.
+#
+# Both are batched: S, K, T, r, sigma and option_type broadcast to n
+# contracts and every contract is rolled back through the same number of
+# steps at once. Backward induction runs in preallocated (nodes, n) arrays of
+# option values, spot prices and scratch space that are overwritten in place
+# one level at a time, so no tree is ever built. Scalar inputs give a scalar
+# price.
+
+
+def _broadcast(S, K, T, r, sigma, option_type):
+    *numbers, option_type = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (S, K, T, r, sigma)),
+        np.asarray(option_type),
+    )
+    shape = numbers[0].shape
+    S, K, T, r, sigma = (x.reshape(1, -1) for x in numbers)
+    # payoff is max(sign * (spot - K), 0)
+    sign = np.where(option_type == 'call', 1.0, -1.0).reshape(1, -1)
+    return shape, S, K, T, r, sigma, sign
+
+
+# roll the lattice back one level: values[:n] becomes the discounted expected
+# value over its children, starting at offsets 0..len(probabilities) - 1
+def _roll_back(values, scratch, n, probabilities):
+    out = scratch[:n]
+    np.multiply(values[:n], probabilities[0], out=out)
+    for offset, p in enumerate(probabilities[1:], start=1):
+        out += p * values[offset : n + offset]
+    values[:n] = out
+
+
+def _exercise(values, spot, scratch, n, K, sign):
+    intrinsic = scratch[:n]
+    np.subtract(spot[:n], K, out=intrinsic)
+    intrinsic *= sign
+    np.maximum(values[:n], intrinsic, out=values[:n])
+
+
+def binomial(S, K, T, r, sigma, option_type='put', steps=500, american=True):
+    shape, S, K, T, r, sigma, sign = _broadcast(S, K, T, r, sigma, option_type)
+    dt = T / steps
+    u = np.exp(sigma * np.sqrt(dt))
+    d = 1.0 / u
+    disc = np.exp(-r * dt)
+    p_up = disc * (np.exp(r * dt) - d) / (u - d)
+    p_down = disc - p_up
+
+    # terminal level: node j has spot S * u^j * d^(steps - j)
+    j = np.arange(steps + 1).reshape(-1, 1)
+    spot = S * u**j * d ** (steps - j)
+    values = np.maximum(sign * (spot - K), 0.0)
+    scratch = np.empty_like(values)
+
+    for i in range(steps - 1, -1, -1):
+        n = i + 1
+        _roll_back(values, scratch, n, (p_down, p_up))
+        if american:
+            # node j of level i is node j + 1 of level i + 1, one down move back
+            np.multiply(spot[1 : n + 1], d, out=spot[:n])
+            _exercise(values, spot, scratch, n, K, sign)
+    return values[0].reshape(shape)[()]
+
+
+def trinomial(S, K, T, r, sigma, option_type='put', steps=500, american=True):
+    shape, S, K, T, r, sigma, sign = _broadcast(S, K, T, r, sigma, option_type)
+    dt = T / steps
+    u = np.exp(sigma * np.sqrt(2.0 * dt))
+    disc = np.exp(-r * dt)
+    a = np.exp(r * dt / 2.0)
+    b = np.exp(sigma * np.sqrt(dt / 2.0))
+    p_up = disc * ((a - 1.0 / b) / (b - 1.0 / b)) ** 2
+    p_down = disc * ((b - a) / (b - 1.0 / b)) ** 2
+    p_mid = disc - p_up - p_down
+
+    # terminal level: node j has spot S * u^(j - steps)
+    j = np.arange(2 * steps + 1).reshape(-1, 1)
+    spot = S * u ** (j - steps)
+    values = np.maximum(sign * (spot - K), 0.0)
+    scratch = np.empty_like(values)
+
+    for i in range(steps - 1, -1, -1):
+        n = 2 * i + 1
+        _roll_back(values, scratch, n, (p_down, p_mid, p_up))
+        if american:
+            # node j of level i has the same spot as node j + 1 of level i + 1
+            spot[:n] = spot[1 : n + 1]
+            _exercise(values, spot, scratch, n, K, sign)
+    return values[0].reshape(shape)[()]
@@ -0,0 +1,141 @@
+# import packages
+from datetime import datetime, timedelta
+
+import numpy as np
+from dateutil.easter import easter
+from dateutil.relativedelta import MO, TH, relativedelta
+
+# US stock exchange holiday calendar.
+#
+# The holiday rules are the ones the portfolio bot has always used. Each
+# year's weekend-adjusted holidays are computed once and memoized as a
+# {date: name} dict, so membership and name lookups are a dict hit. Array
+# queries (business-day masks, trading-day counts, next / previous trading
+# day) go through a NumPy busdaycalendar built from the memoized holidays and
+# grown as queries reach new years.
+
+
+def get_good_friday(year):
+    return easter(year) - timedelta(days=2)
+
+
+def adjust_for_weekend(holiday):
+    if holiday.weekday() == 5:  # Saturday
+        return holiday - timedelta(days=1)
+    elif holiday.weekday() == 6:  # Sunday
+        return holiday + timedelta(days=1)
+    return holiday
+
+
+def get_holidays(year):
+    return {
+        datetime(year, 1, 1).date(): "New Year's Day",
+        datetime(year - 1, 12, 31).date(): "New Year's Day Observed",
+        datetime(year, 7, 4).date(): 'Independence Day',
+        datetime(year, 12, 25).date(): 'Christmas Day',
+        (
+            datetime(year, 1, 1) + relativedelta(weekday=MO(3))
+        ).date(): 'Martin Luther King Jr. Day',
+        (
+            datetime(year, 2, 1) + relativedelta(weekday=MO(3))
+        ).date(): "Washington's Birthday",
+        (datetime(year, 5, 31) - relativedelta(weekday=MO(-1))).date(): 'Memorial Day',
+        (datetime(year, 9, 1) + relativedelta(weekday=MO(1))).date(): 'Labor Day',
+        (datetime(year, 11, 1) + relativedelta(weekday=TH(4))).date(): 'Thanksgiving',
+        get_good_friday(year): 'Good Friday',
+    }
+
+
+def _as_date(date):
+    return date.date() if isinstance(date, datetime) else date
+
+
+def _as_days(dates):
+    return np.asarray(dates, dtype='datetime64[D]')
+
+
+class ExchangeCalendar:
+    def __init__(self):
+        self._years = {}
+        self._span = None
+        self._busdaycal = None
+
+    # weekend-adjusted {date: name} for the holidays looked up in this year
+    def holidays(self, year):
+        holidays = self._years.get(year)
+        if holidays is None:
+            holidays = {
+                adjust_for_weekend(holiday_date): name
+                for holiday_date, name in get_holidays(year).items()
+            }
+            self._years[year] = holidays
+        return holidays
+
+    def is_holiday(self, date):
+        date = _as_date(date)
+        return date in self.holidays(date.year)
+
+    def holiday_name(self, date):
+        date = _as_date(date)
+        return self.holidays(date.year).get(date)
+
+    def is_trading_day(self, date):
+        date = _as_date(date)
+        return date.weekday() < 5 and not self.is_holiday(date)
+
+    # a busdaycalendar covering at least the years first..last
+    def _calendar(self, first, last):
+        if self._span is None or first < self._span[0] or last > self._span[1]:
+            if self._span is not None:
+                first, last = min(first, self._span[0]), max(last, self._span[1])
+            holidays = [
+                holiday_date
+                for year in range(first, last + 1)
+                for holiday_date in self.holidays(year)
+                if holiday_date.year == year
+            ]
+            self._busdaycal = np.busdaycalendar(holidays=holidays)
+            self._span = (first, last)
+        return self._busdaycal
+
+    def _calendar_for(self, *arrays):
+        dates = np.concatenate([a.ravel() for a in arrays])
+        if dates.size == 0:
+            return self._calendar(1970, 1970)
+        years = dates.astype('datetime64[Y]').astype(int) + 1970
+        # one year of slack on each side for rolls across New Year
+        return self._calendar(int(years.min()) - 1, int(years.max()) + 1)
+
+    # vectorized: True where the exchange is open
+    def trading_day_mask(self, dates):
+        dates = _as_days(dates)
+        return np.is_busday(dates, busdaycal=self._calendar_for(dates))
+
+    # vectorized: True where the date is an exchange holiday
+    def holiday_mask(self, dates):
+        dates = _as_days(dates)
+        weekday = np.is_busday(dates, weekmask='1111100', holidays=[])
+        return weekday & ~self.trading_day_mask(dates)
+
+    # vectorized: trading days in [start, end), like numpy.busday_count
+    def trading_days_between(self, start, end):
+        start, end = _as_days(start), _as_days(end)
+        return np.busday_count(start, end, busdaycal=self._calendar_for(start, end))
+
+    # vectorized: first trading day strictly after each date
+    def next_trading_day(self, dates):
+        dates = _as_days(dates)
+        return np.busday_offset(
+            dates, 1, roll='backward', busdaycal=self._calendar_for(dates)
+        )
+
+    # vectorized: last trading day strictly before each date
+    def previous_trading_day(self, dates):
+        dates = _as_days(dates)
+        return np.busday_offset(
+            dates, -1, roll='forward', busdaycal=self._calendar_for(dates)
+        )
+
+
+# shared instance, so every caller hits the same memoized years
+calendar = ExchangeCalendar()
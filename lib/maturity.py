@@ -0,0 +1,102 @@
+# import packages
+from datetime import datetime, time
+
+import numpy as np
+import pytz
+
+from market_calendar import calendar
+
+# Time to maturity in years for arrays of expiration dates.
+#
+# Options expire at the close (16:00 US/Eastern) of their expiration date.
+# Three conventions are available:
+#
+# - 'calendar': whole calendar days to midnight of the expiration date over
+#               365, the convention the pricer has always used;
+# - 'trading':  exchange sessions left until the expiration close over 252,
+#               today's session included until the market closes;
+# - 'minutes':  trading minutes left until the expiration close over
+#               252 * 390, so 0-5 DTE contracts decay through the session
+#               instead of jumping a whole day at midnight.
+#
+# Expired contracts have no trading time left: 'trading' and 'minutes' give 0
+# for them, where 'calendar' keeps the legacy negative day counts.
+#
+# Weekends and exchange holidays come from the shared market_calendar, whose
+# holidays are computed once per year. Early closes are not modelled.
+#
+#   T = time_to_maturity(expirations, mode='minutes')
+
+EXCHANGE_TIMEZONE = pytz.timezone('US/Eastern')
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+SESSION_MINUTES = 390
+TRADING_DAYS_PER_YEAR = 252
+CALENDAR_DAYS_PER_YEAR = 365
+MODES = ('calendar', 'trading', 'minutes')
+
+
+# now as naive UTC (like datetime.utcnow()) and as exchange local time
+def _clock(now):
+    if now is None:
+        now = datetime.utcnow()
+    if now.tzinfo is not None:
+        now = now.astimezone(pytz.utc).replace(tzinfo=None)
+    return now, pytz.utc.localize(now).astimezone(EXCHANGE_TIMEZONE)
+
+
+# minutes of today's session still to trade, 0 before a non-trading day
+def _session_minutes_left(local):
+    if not calendar.is_trading_day(local.date()):
+        return 0.0
+    opening = local.replace(
+        hour=MARKET_OPEN.hour, minute=MARKET_OPEN.minute, second=0, microsecond=0
+    )
+    close = opening.replace(hour=MARKET_CLOSE.hour, minute=MARKET_CLOSE.minute)
+    return max((close - max(local, opening)).total_seconds() / 60, 0.0)
+
+
+def calendar_days(expiration, now=None):
+    now, _ = _clock(now)
+    expiration = np.asarray(expiration, dtype='datetime64[D]')
+    # floor division, like timedelta.days
+    elapsed = expiration.astype('datetime64[s]') - np.datetime64(now, 's')
+    return elapsed // np.timedelta64(1, 'D')
+
+
+# sessions ending after now, up to and including the expiration date; 0 once
+# expired
+def trading_days(expiration, now=None):
+    _, local = _clock(now)
+    expiration = np.asarray(expiration, dtype='datetime64[D]')
+    today = np.datetime64(local.date(), 'D')
+    if _session_minutes_left(local) > 0:
+        first = today
+    else:
+        first = today + 1
+    return np.maximum(calendar.trading_days_between(first, expiration + 1), 0)
+
+
+def trading_minutes(expiration, now=None):
+    _, local = _clock(now)
+    expiration = np.asarray(expiration, dtype='datetime64[D]')
+    today = np.datetime64(local.date(), 'D')
+    later_sessions = np.maximum(
+        calendar.trading_days_between(today + 1, expiration + 1), 0
+    )
+    today_minutes = np.where(expiration >= today, _session_minutes_left(local), 0.0)
+    return SESSION_MINUTES * later_sessions + today_minutes
+
+
+def time_to_maturity(expiration, mode='calendar', now=None):
+    if mode == 'calendar':
+        T = calendar_days(expiration, now) / CALENDAR_DAYS_PER_YEAR
+    elif mode == 'trading':
+        T = trading_days(expiration, now) / TRADING_DAYS_PER_YEAR
+    elif mode == 'minutes':
+        T = trading_minutes(expiration, now) / (TRADING_DAYS_PER_YEAR * SESSION_MINUTES)
+    else:
+        raise ValueError(
+            'Unknown maturity mode %r, expected one of %s' % (mode, list(MODES))
+        )
+    return T if T.ndim else float(T)
@@ -0,0 +1,186 @@
+# import packages
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from vectorized import bs_put, call
+
+# Monte Carlo pricing of path-dependent options on the same geometric
+# Brownian motion that d1 / d2 assume.
+#
+# Paths are simulated in blocks of block_size x steps, and each block is
+# reduced to a handful of running sums before the next one is generated, so
+# memory is bounded by the block size however many paths are asked for.
+# Every block gets its own child of one SeedSequence, which makes the result
+# depend only on the seed and the block size, not on how many worker
+# processes share the blocks.
+#
+# Variance reduction:
+# - antithetic sampling pairs every normal draw Z with -Z and averages the
+#   two payoffs into one sample;
+# - the control variate is a European option on the same paths, whose exact
+#   price is the Black-Scholes call / bs_put. Its coefficient is estimated
+#   from the same running sums.
+
+
+@dataclass(frozen=True)
+class European:
+    K: float
+    option_type: str = 'call'
+
+    def __call__(self, paths):
+        return _vanilla(paths[:, -1], self.K, self.option_type)
+
+
+# arithmetic average of the monitored spots against a fixed strike
+@dataclass(frozen=True)
+class Asian:
+    K: float
+    option_type: str = 'call'
+
+    def __call__(self, paths):
+        return _vanilla(paths.mean(axis=1), self.K, self.option_type)
+
+
+# knock-out / knock-in on the monitored spots; kind is one of 'up-and-out',
+# 'up-and-in', 'down-and-out' and 'down-and-in'
+@dataclass(frozen=True)
+class Barrier:
+    K: float
+    barrier: float
+    kind: str = 'up-and-out'
+    option_type: str = 'call'
+
+    def __call__(self, paths):
+        direction, knock = self.kind.split('-and-')
+        if direction == 'up':
+            crossed = paths.max(axis=1) >= self.barrier
+        else:
+            crossed = paths.min(axis=1) <= self.barrier
+        alive = crossed if knock == 'in' else ~crossed
+        return np.where(alive, _vanilla(paths[:, -1], self.K, self.option_type), 0.0)
+
+
+# floating strike: the call pays S_T - min(S), the put max(S) - S_T
+@dataclass(frozen=True)
+class Lookback:
+    option_type: str = 'call'
+
+    def __call__(self, paths):
+        if self.option_type == 'call':
+            return paths[:, -1] - paths.min(axis=1)
+        return paths.max(axis=1) - paths[:, -1]
+
+
+@dataclass
+class MonteCarloResult:
+    __slots__ = ('price', 'std_error', 'paths', 'elapsed', 'paths_per_second')
+    price: float
+    std_error: float
+    paths: int
+    elapsed: float
+    paths_per_second: float
+
+
+def _vanilla(spot, K, option_type):
+    if option_type == 'call':
+        return np.maximum(spot - K, 0.0)
+    return np.maximum(K - spot, 0.0)
+
+
+# simulate n_paths GBM paths monitored at steps equally spaced dates up to T
+# (the starting spot is not included)
+def simulate_paths(S, T, r, sigma, steps, n_paths, rng, antithetic=False):
+    dt = T / steps
+    drift = (r - 0.5 * sigma**2) * dt
+    vol = sigma * np.sqrt(dt)
+    if antithetic:
+        z = rng.standard_normal((n_paths // 2, steps))
+        z = np.concatenate((z, -z))
+    else:
+        z = rng.standard_normal((n_paths, steps))
+    z *= vol
+    z += drift
+    np.cumsum(z, axis=1, out=z)
+    np.exp(z, out=z)
+    z *= S
+    return z
+
+
+# simulate one block and reduce it to the sums the estimator needs:
+# n, sum(y), sum(y^2), sum(c), sum(c^2), sum(y * c)
+def _block_sums(seed, S, T, r, sigma, payoff, control, steps, block_size, antithetic):
+    rng = np.random.default_rng(seed)
+    paths = simulate_paths(S, T, r, sigma, steps, block_size, rng, antithetic)
+    discount = np.exp(-r * T)
+    y = discount * payoff(paths)
+    c = discount * control(paths) if control is not None else np.zeros_like(y)
+    if antithetic:
+        half = len(y) // 2
+        y = 0.5 * (y[:half] + y[half:])
+        c = 0.5 * (c[:half] + c[half:])
+    return np.array([len(y), y.sum(), y @ y, c.sum(), c @ c, y @ c])
+
+
+def price(
+    payoff,
+    S,
+    T,
+    r,
+    sigma,
+    n_paths=1_000_000,
+    steps=100,
+    block_size=50_000,
+    antithetic=True,
+    control_variate=True,
+    control_strike=None,
+    seed=None,
+    workers=None,
+):
+    start = time.perf_counter()
+    if antithetic:
+        block_size += block_size % 2
+    n_blocks = -(-n_paths // block_size)
+    seeds = np.random.SeedSequence(seed).spawn(n_blocks)
+
+    control = None
+    if control_variate:
+        option_type = getattr(payoff, 'option_type', 'call')
+        strike = control_strike or getattr(payoff, 'K', S)
+        control = European(strike, option_type)
+        closed_form = call if option_type == 'call' else bs_put
+        control_price = float(closed_form(S, strike, T, r, sigma))
+
+    args = (S, T, r, sigma, payoff, control, steps, block_size, antithetic)
+    if workers is None:
+        blocks = (_block_sums(s, *args) for s in seeds)
+        n, sy, syy, sc, scc, syc = sum(blocks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers or None) as pool:
+            n, sy, syy, sc, scc, syc = sum(
+                pool.map(_block_sums, seeds, *([a] * n_blocks for a in args))
+            )
+
+    mean_y = sy / n
+    var_y = (syy - n * mean_y**2) / (n - 1)
+    estimate, variance = mean_y, var_y
+    if control is not None:
+        mean_c = sc / n
+        var_c = (scc - n * mean_c**2) / (n - 1)
+        cov = (syc - n * mean_y * mean_c) / (n - 1)
+        if var_c > 0:
+            b = cov / var_c
+            estimate = mean_y - b * (mean_c - control_price)
+            variance = var_y - 2 * b * cov + b**2 * var_c
+
+    elapsed = time.perf_counter() - start
+    simulated = int(n) * (2 if antithetic else 1)
+    return MonteCarloResult(
+        price=float(estimate),
+        std_error=float(np.sqrt(max(variance, 0.0) / n)),
+        paths=simulated,
+        elapsed=elapsed,
+        paths_per_second=simulated / elapsed,
+    )
@@ -0,0 +1,175 @@
+# Standard normal CDF / PDF used by every pricing function, with a backend
+# that can be switched at runtime:
+#
+# - 'scipy': scipy.stats.norm for one float at a time, the default; arrays
+#            go to scipy.special.ndtr and a NumPy PDF, as with 'ndtr';
+# - 'erf':   math.erfc / math.exp, by far the cheapest for one float at a
+#            time, and scipy.special.erfc for arrays;
+# - 'ndtr':  scipy.special.ndtr and a NumPy PDF for everything.
+#
+# Every backend takes whole arrays in one vectorized call; they only differ
+# in what a single float costs.
+#
+#   import normal
+#   normal.set_backend('erf')
+#   with normal.use_backend('ndtr'):
+#       ...
+#
+# The starting backend can also be picked with the NORMAL_BACKEND environment
+# variable. SciPy and NumPy are only imported when a backend needs them, so
+# importing the pricing core stays cheap.
+import os
+from contextlib import contextmanager
+from math import erfc, exp, pi, sqrt
+
+SQRT2 = sqrt(2.0)
+SQRT_2PI = sqrt(2.0 * pi)
+
+
+def _array_pdf(np, x):
+    x = np.asarray(x, dtype=np.float64)
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+
+class ScipyBackend:
+    name = 'scipy'
+
+    def __init__(self):
+        import numpy as np
+        from scipy.special import ndtr
+        from scipy.stats import norm
+
+        self._np = np
+        self._norm = norm
+        self._ndtr = ndtr
+
+    def cdf(self, x):
+        if isinstance(x, (float, int)):
+            return self._norm.cdf(x)
+        return self._ndtr(x)
+
+    def cdfs(self, values):
+        return self._ndtr(values)
+
+    def pdf(self, x):
+        if isinstance(x, (float, int)):
+            return self._norm.pdf(x)
+        return _array_pdf(self._np, x)
+
+
+class ErfBackend:
+    name = 'erf'
+
+    def __init__(self):
+        self._np = None
+        self._erfc = None
+
+    def _load_array_functions(self):
+        import numpy as np
+        from scipy.special import erfc as array_erfc
+
+        self._np = np
+        self._erfc = array_erfc
+
+    @staticmethod
+    def _cdf(x):
+        return 0.5 * erfc(-x / SQRT2)
+
+    @staticmethod
+    def _pdf(x):
+        return exp(-0.5 * x * x) / SQRT_2PI
+
+    def cdf(self, x):
+        if isinstance(x, (float, int)):
+            return self._cdf(x)
+        if self._erfc is None:
+            self._load_array_functions()
+        return 0.5 * self._erfc(-self._np.asarray(x, dtype=self._np.float64) / SQRT2)
+
+    def cdfs(self, values):
+        return [self._cdf(x) for x in values]
+
+    def pdf(self, x):
+        if isinstance(x, (float, int)):
+            return self._pdf(x)
+        if self._np is None:
+            self._load_array_functions()
+        return _array_pdf(self._np, x)
+
+
+class NdtrBackend:
+    name = 'ndtr'
+
+    def __init__(self):
+        import numpy as np
+        from scipy.special import ndtr
+
+        self._np = np
+        self.cdf = ndtr
+
+    def cdfs(self, values):
+        return self.cdf(values)
+
+    def pdf(self, x):
+        return _array_pdf(self._np, x)
+
+
+BACKENDS = {
+    backend.name: backend for backend in (ScipyBackend, ErfBackend, NdtrBackend)
+}
+DEFAULT_BACKEND = os.getenv('NORMAL_BACKEND', 'scipy')
+
+# backends are instantiated (and their imports paid for) on first use
+_instances = {}
+_active = None
+_active_name = None
+
+
+def set_backend(name):
+    global _active, _active_name
+    if name not in BACKENDS:
+        raise ValueError(
+            'Unknown normal backend %r, expected one of %s' % (name, sorted(BACKENDS))
+        )
+    _active_name = name
+    _active = None
+
+
+def get_backend():
+    return _active_name
+
+
+@contextmanager
+def use_backend(name):
+    previous = get_backend()
+    set_backend(name)
+    try:
+        yield
+    finally:
+        set_backend(previous)
+
+
+def _backend():
+    global _active
+    if _active is None:
+        if _active_name not in _instances:
+            _instances[_active_name] = BACKENDS[_active_name]()
+        _active = _instances[_active_name]
+    return _active
+
+
+def cdf(x):
+    return _backend().cdf(x)
+
+
+# CDF of several scalars at once: a single call for the array backends,
+# one cheap call each for 'erf'
+def cdfs(values):
+    return _backend().cdfs(values)
+
+
+def pdf(x):
+    return _backend().pdf(x)
+
+
+set_backend(DEFAULT_BACKEND)
@@ -0,0 +1,111 @@
+# import packages
+from dataclasses import dataclass
+
+import numpy as np
+
+from vectorized import call
+
+# Scenario / stress-grid revaluation of a book of positions.
+#
+# Every position is revalued under every combination of spot, volatility and
+# time shocks in one broadcast Black-Scholes evaluation over a
+# (position, spot shock, vol shock, time shock) array, and the P&L against
+# today's value is returned as a cube with those four axes.
+#
+# Shocks:
+# - spot shocks are relative moves of the underlying (-0.2 is -20%);
+# - vol shocks are absolute changes of sigma (0.10 is +10 vol points);
+# - time shocks are calendar days of decay, taken off T.
+#
+# option_type is 'call', 'put' or 'stock' (a delta-one position in the
+# underlying, for which K, T and sigma are ignored). quantity is signed and
+# multiplier is the contract size, so P&L is in currency.
+
+MIN_SIGMA = 1e-4
+MIN_T = 1e-8
+
+
+@dataclass
+class ScenarioResult:
+    __slots__ = ('pnl', 'base_value', 'spot_shocks', 'vol_shocks', 'time_shocks')
+    pnl: np.ndarray  # (positions, spot shocks, vol shocks, time shocks)
+    base_value: np.ndarray  # (positions,)
+    spot_shocks: np.ndarray
+    vol_shocks: np.ndarray
+    time_shocks: np.ndarray
+
+    # P&L of the whole book for every scenario
+    def portfolio(self):
+        return self.pnl.sum(axis=0)
+
+    # P&L cubes summed per group label, e.g. per underlying
+    def by(self, groups):
+        groups = np.asarray(groups)
+        return {
+            group: self.pnl[groups == group].sum(axis=0) for group in np.unique(groups)
+        }
+
+
+# value of one unit of each position; at or past expiry the option is worth
+# (almost exactly) its intrinsic value
+def unit_value(S, K, T, r, sigma, option_type):
+    T = np.maximum(T, MIN_T)
+    sigma = np.maximum(sigma, MIN_SIGMA)
+    # K and T of stock positions are meaningless, so ignore what they produce
+    with np.errstate(divide='ignore', invalid='ignore'):
+        call_value = call(S, K, T, r, sigma)
+    put_value = call_value - S + K * np.exp(-r * T)
+    return np.where(
+        option_type == 'stock',
+        S,
+        np.where(option_type == 'call', call_value, put_value),
+    )
+
+
+def stress(
+    S,
+    K,
+    T,
+    r,
+    sigma,
+    option_type,
+    quantity,
+    spot_shocks=(0.0,),
+    vol_shocks=(0.0,),
+    time_shocks=(0.0,),
+    multiplier=100.0,
+):
+    S, K, T, r, sigma, quantity, multiplier = (
+        np.atleast_1d(np.asarray(x, dtype=np.float64))
+        for x in (S, K, T, r, sigma, quantity, multiplier)
+    )
+    option_type = np.atleast_1d(np.asarray(option_type))
+    S, K, T, r, sigma, quantity, multiplier, option_type = np.broadcast_arrays(
+        S, K, T, r, sigma, quantity, multiplier, option_type
+    )
+    spot_shocks, vol_shocks, time_shocks = (
+        np.atleast_1d(np.asarray(x, dtype=np.float64))
+        for x in (spot_shocks, vol_shocks, time_shocks)
+    )
+
+    # positions along axis 0, then one axis per shock dimension
+    def position_axis(x):
+        return x.reshape(-1, 1, 1, 1)
+
+    base = unit_value(S, K, T, r, sigma, option_type)
+    shocked = unit_value(
+        position_axis(S) * (1.0 + spot_shocks.reshape(1, -1, 1, 1)),
+        position_axis(K),
+        position_axis(T) - time_shocks.reshape(1, 1, 1, -1) / 365,
+        position_axis(r),
+        position_axis(sigma) + vol_shocks.reshape(1, 1, -1, 1),
+        position_axis(option_type),
+    )
+    size = quantity * np.where(option_type == 'stock', 1.0, multiplier)
+    return ScenarioResult(
+        pnl=position_axis(size) * (shocked - position_axis(base)),
+        base_value=size * base,
+        spot_shocks=spot_shocks,
+        vol_shocks=vol_shocks,
+        time_shocks=time_shocks,
+    )
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import vectorized as vbs
+from batch_pricing import OUTPUT_FIELDS, price_file
+
+try:
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def make_contracts(n=1000):
+    rng = np.random.default_rng(1)
+    return pd.DataFrame(
+        {
+            'symbol': [f'OPT{i}' for i in range(n)],
+            'S': 100.0,
+            'K': rng.uniform(50.0, 150.0, n),
+            'T': rng.uniform(0.01, 2.0, n),
+            'r': 4.5,
+            'sigma': rng.uniform(10.0, 80.0, n),
+        }
+    )
+
+
+# TEST SUITE
+class TestBatchPricing(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.contracts = make_contracts()
+        self.expected = vbs.price_chain(
+            self.contracts['S'],
+            self.contracts['K'],
+            self.contracts['T'],
+            self.contracts['r'] / 100,
+            self.contracts['sigma'] / 100,
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def check(self, priced):
+        self.assertEqual(len(priced), len(self.contracts))
+        self.assertEqual(list(priced['symbol']), list(self.contracts['symbol']))
+        for name in OUTPUT_FIELDS:
+            np.testing.assert_allclose(priced[name], getattr(self.expected, name))
+
+    def test_csv_in_chunks(self):
+        self.contracts.to_csv(self.path('in.csv'), index=False)
+        count = price_file(self.path('in.csv'), self.path('out.csv'), chunksize=64)
+        self.assertEqual(count, len(self.contracts))
+        self.check(pd.read_csv(self.path('out.csv')))
+
+    def test_process_pool(self):
+        self.contracts.to_csv(self.path('in.csv'), index=False)
+        price_file(self.path('in.csv'), self.path('out.csv'), chunksize=100, workers=2)
+        self.check(pd.read_csv(self.path('out.csv')))
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_parquet_in_chunks(self):
+        self.contracts.to_parquet(self.path('in.parquet'), index=False)
+        price_file(self.path('in.parquet'), self.path('out.parquet'), chunksize=128)
+        self.check(pd.read_parquet(self.path('out.parquet')))
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_csv_chunks_with_int_and_float_prices_to_parquet(self):
+        with open(self.path('in.csv'), 'w') as f:
+            f.write('symbol,S,K,T,r,sigma\nA,100,100,1,5,20\nB,100,90,1,5,20\n')
+            f.write('C,100.5,110.5,0.5,4.5,25.5\n')
+        self.assertEqual(
+            price_file(self.path('in.csv'), self.path('out.parquet'), chunksize=2), 3
+        )
+        priced = pd.read_parquet(self.path('out.parquet'))
+        self.assertEqual(list(priced['S']), [100.0, 100.0, 100.5])
+        self.assertEqual(priced['S'].dtype, np.float64)
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_empty_input_keeps_every_column(self):
+        columns = list(self.contracts) + OUTPUT_FIELDS
+        self.contracts[:0].to_parquet(self.path('in.parquet'), index=False)
+        self.contracts[:0].to_csv(self.path('in.csv'), index=False)
+        for source, target in [
+            ('in.parquet', 'out.parquet'),
+            ('in.csv', 'out.csv'),
+            ('in.csv', 'out.parquet'),
+        ]:
+            count = price_file(self.path(source), self.path(target), chunksize=64)
+            self.assertEqual(count, 0)
+            read = pd.read_parquet if target.endswith('.parquet') else pd.read_csv
+            self.assertEqual(list(read(self.path(target))), columns)
+        schema = pd.read_parquet(self.path('out.parquet')).dtypes
+        self.assertEqual(schema['S'], np.float64)
+
+
+if __name__ == '__main__':
+    unittest.main()
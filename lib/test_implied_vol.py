@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+import black_scholes as bs
+import vectorized as vbs
+from implied_vol import CONVERGED, EXPIRED, OUT_OF_BOUNDS, implied_volatility
+
+
+# TEST SUITE
+class TestImpliedVolatility(unittest.TestCase):
+    def test_round_trip_chain(self):
+        rng = np.random.default_rng(0)
+        n = 2000
+        S = 100.0
+        K = rng.uniform(60.0, 140.0, n)
+        T = rng.uniform(0.02, 2.0, n)
+        sigma = rng.uniform(0.05, 1.2, n)
+        option_type = np.where(rng.random(n) < 0.5, 'call', 'put')
+        price = np.array(
+            [
+                bs.call(S, k, t, 0.04, s)
+                if o == 'call'
+                else bs.bs_put(S, k, t, 0.04, s)
+                for k, t, s, o in zip(K, T, sigma, option_type)
+            ]
+        )
+
+        result = implied_volatility(price, S, K, T, 0.04, option_type)
+
+        # quotes with essentially no time value carry no information about sigma
+        informative = 100.0 * vbs.call_vega(S, K, T, 0.04, sigma) > 1.0
+        self.assertTrue(np.all(result.status[informative] == CONVERGED))
+        np.testing.assert_allclose(
+            result.sigma[informative], sigma[informative], atol=1e-6
+        )
+
+    def test_scalar_quote(self):
+        price = bs.call(100.0, 105.0, 0.5, 0.05, 0.3)
+        result = implied_volatility(price, 100.0, 105.0, 0.5, 0.05)
+        self.assertEqual(result.status, CONVERGED)
+        self.assertAlmostEqual(float(result.sigma), 0.3, places=7)
+
+    def test_arbitrage_violations(self):
+        # below intrinsic value, and above the underlying
+        result = implied_volatility([1.0, 120.0], 110.0, 100.0, 0.5, 0.0)
+        self.assertTrue(np.all(result.status == OUT_OF_BOUNDS))
+        self.assertTrue(np.all(np.isnan(result.sigma)))
+
+    def test_expired_quotes(self):
+        price = bs.call(100.0, 95.0, 0.5, 0.05, 0.3)
+        result = implied_volatility(price, 100.0, 95.0, [0.5, 0.0, -0.01], 0.05)
+        np.testing.assert_array_equal(result.status, [CONVERGED, EXPIRED, EXPIRED])
+        self.assertTrue(np.all(np.isnan(result.sigma[1:])))
+        np.testing.assert_array_equal(result.iterations[1:], 0)
+
+    def test_near_zero_vega_uses_bracketing(self):
+        # far out of the money with a week to go: vega is ~0 at the start
+        price = bs.bs_put(100.0, 70.0, 7 / 365, 0.01, 0.9)
+        result = implied_volatility(price, 100.0, 70.0, 7 / 365, 0.01, 'put')
+        self.assertEqual(result.status, CONVERGED)
+        self.assertAlmostEqual(float(result.sigma), 0.9, places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
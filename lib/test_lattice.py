@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+import vectorized as vbs
+from lattice import binomial, trinomial
+
+S = 100.0
+K = np.array([80.0, 95.0, 100.0, 105.0, 120.0])
+T = 0.5
+R = 0.05
+SIGMA = 0.25
+
+
+# TEST SUITE
+class TestLattice(unittest.TestCase):
+    def test_european_converges_to_black_scholes(self):
+        for pricer in (binomial, trinomial):
+            for option_type, closed_form in (('call', vbs.call), ('put', vbs.bs_put)):
+                np.testing.assert_allclose(
+                    pricer(S, K, T, R, SIGMA, option_type, steps=800, american=False),
+                    closed_form(S, K, T, R, SIGMA),
+                    atol=5e-3,
+                    err_msg=f'{pricer.__name__} {option_type}',
+                )
+
+    def test_american_call_without_dividends_is_european(self):
+        for pricer in (binomial, trinomial):
+            np.testing.assert_allclose(
+                pricer(S, K, T, R, SIGMA, 'call', steps=800),
+                vbs.call(S, K, T, R, SIGMA),
+                atol=5e-3,
+            )
+
+    def test_american_put_early_exercise_premium(self):
+        # Hull, Options, Futures and Other Derivatives: American put worth 4.28
+        self.assertAlmostEqual(binomial(50.0, 50.0, 5 / 12, 0.1, 0.4), 4.28, places=2)
+        self.assertAlmostEqual(trinomial(50.0, 50.0, 5 / 12, 0.1, 0.4), 4.28, places=2)
+        american = binomial(S, K, T, R, SIGMA, 'put')
+        self.assertTrue(np.all(american >= vbs.bs_put(S, K, T, R, SIGMA)))
+
+    def test_batch_matches_one_by_one(self):
+        option_type = np.array(['call', 'put', 'put', 'call', 'put'])
+        batch = binomial(S, K, T, R, SIGMA, option_type, steps=200)
+        single = [
+            binomial(S, k, T, R, SIGMA, o, steps=200) for k, o in zip(K, option_type)
+        ]
+        np.testing.assert_allclose(batch, single, rtol=1e-12)
+        self.assertIsInstance(single[0], float)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from datetime import date, datetime, timedelta
+import numpy as np
+import pandas as pd
+from market_calendar import ExchangeCalendar, adjust_for_weekend, get_holidays
+
+YEARS = range(2023 - 100, 2023 + 100)
+
+
+def reference_name(day):
+    # the original per-call computation the calendar memoizes
+    adjusted = {
+        adjust_for_weekend(d): name for d, name in get_holidays(day.year).items()
+    }
+    return adjusted.get(day)
+
+
+# TEST SUITE
+class TestExchangeCalendar(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.calendar = ExchangeCalendar()
+        start = date(YEARS[0], 1, 1)
+        cls.days = [start + timedelta(days=i) for i in range(365 * len(YEARS))]
+
+    def test_matches_original_rules(self):
+        for day in self.days:
+            name = reference_name(day)
+            self.assertEqual(self.calendar.holiday_name(day), name)
+            self.assertEqual(self.calendar.is_holiday(day), name is not None)
+
+    def test_accepts_datetimes(self):
+        self.assertTrue(self.calendar.is_holiday(datetime(2023, 7, 4, 9, 30)))
+        self.assertEqual(
+            self.calendar.holiday_name(datetime(2023, 7, 4)), 'Independence Day'
+        )
+
+    def test_masks_match_scalar_lookups(self):
+        trading = self.calendar.trading_day_mask(self.days)
+        holidays = self.calendar.holiday_mask(pd.Series(pd.to_datetime(self.days)))
+        np.testing.assert_array_equal(
+            trading, [self.calendar.is_trading_day(d) for d in self.days]
+        )
+        np.testing.assert_array_equal(
+            holidays,
+            [self.calendar.is_holiday(d) and d.weekday() < 5 for d in self.days],
+        )
+
+    def test_trading_days_between(self):
+        # Christmas 2023 was a Monday: 20 trading days in December
+        self.assertEqual(
+            self.calendar.trading_days_between('2023-12-01', '2024-01-01'), 20
+        )
+        counts = self.calendar.trading_days_between(
+            ['2024-01-01', '2024-01-01'], ['2024-01-02', '2025-01-01']
+        )
+        # 262 weekdays less the 9 weekday holidays of 2024 (no Juneteenth rule)
+        np.testing.assert_array_equal(counts, [0, 253])
+        trading = self.calendar.trading_day_mask(self.days)
+        self.assertEqual(
+            self.calendar.trading_days_between(self.days[0], self.days[-1]),
+            trading[:-1].sum(),
+        )
+
+    def test_next_and_previous_trading_day(self):
+        # Thanksgiving 2023 was Thursday the 23rd
+        np.testing.assert_array_equal(
+            self.calendar.next_trading_day(['2023-11-22', '2023-11-24', '2023-12-29']),
+            np.array(['2023-11-24', '2023-11-27', '2024-01-02'], dtype='datetime64[D]'),
+        )
+        np.testing.assert_array_equal(
+            self.calendar.previous_trading_day(['2023-11-24', '2024-01-02']),
+            np.array(['2023-11-22', '2023-12-29'], dtype='datetime64[D]'),
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from datetime import date, datetime, timedelta
+import numpy as np
+import pytz
+from market_calendar import calendar
+from maturity import (
+    SESSION_MINUTES,
+    calendar_days,
+    time_to_maturity,
+    trading_days,
+    trading_minutes,
+)
+
+# 14:00 US/Eastern on the Wednesday before Thanksgiving 2023
+WEDNESDAY_AFTERNOON = datetime(2023, 11, 22, 19, 0)
+EXPIRATIONS = np.array(
+    ['2023-11-22', '2023-11-24', '2023-11-27', '2023-12-15'], dtype='datetime64[D]'
+)
+
+
+# TEST SUITE
+class TestMaturity(unittest.TestCase):
+    def test_calendar_mode_matches_legacy_convention(self):
+        now = datetime(2023, 11, 22, 19, 37, 12)
+        expirations = [datetime(2023, 11, 1) + timedelta(days=i) for i in range(90)]
+        expected = [(expiry - now).days / 365 for expiry in expirations]
+        np.testing.assert_allclose(
+            time_to_maturity(expirations, 'calendar', now), expected
+        )
+        np.testing.assert_array_equal(
+            calendar_days(expirations, now), [round(t * 365) for t in expected]
+        )
+
+    def test_trading_minutes_skip_holidays_and_weekends(self):
+        # 120 minutes left today, Thanksgiving closed, the weekend skipped
+        np.testing.assert_array_equal(
+            trading_minutes(EXPIRATIONS, WEDNESDAY_AFTERNOON), [120, 510, 900, 6360]
+        )
+        T = time_to_maturity(EXPIRATIONS, 'minutes', WEDNESDAY_AFTERNOON)
+        np.testing.assert_allclose(T, [120, 510, 900, 6360] / np.float64(252 * 390))
+
+    def test_trading_minutes_around_the_session(self):
+        expiry = np.datetime64('2023-11-27')
+        before_open = datetime(2023, 11, 24, 13, 0)  # 08:00 ET Friday
+        after_close = datetime(2023, 11, 24, 22, 0)  # 17:00 ET Friday
+        saturday = datetime(2023, 11, 25, 16, 0)
+        self.assertEqual(trading_minutes(expiry, before_open), 2 * SESSION_MINUTES)
+        self.assertEqual(trading_minutes(expiry, after_close), SESSION_MINUTES)
+        self.assertEqual(trading_minutes(expiry, saturday), SESSION_MINUTES)
+        self.assertEqual(trading_minutes(np.datetime64('2023-11-24'), after_close), 0)
+
+    def test_trading_days_match_calendar_loop(self):
+        today = WEDNESDAY_AFTERNOON.date()
+        expirations = [today + timedelta(days=i) for i in range(400)]
+        expected = [
+            sum(
+                calendar.is_trading_day(today + timedelta(days=d))
+                for d in range((expiry - today).days + 1)
+            )
+            for expiry in expirations
+        ]
+        np.testing.assert_array_equal(
+            trading_days(expirations, WEDNESDAY_AFTERNOON), expected
+        )
+        # after the close today's session no longer counts
+        after_close = WEDNESDAY_AFTERNOON + timedelta(hours=3)
+        np.testing.assert_array_equal(
+            trading_days(expirations, after_close), np.array(expected) - 1
+        )
+
+    def test_expired_contracts_have_no_time_left(self):
+        expired = np.array(['2023-11-01', '2023-11-21'], dtype='datetime64[D]')
+        np.testing.assert_array_equal(trading_days(expired, WEDNESDAY_AFTERNOON), 0)
+        np.testing.assert_array_equal(trading_minutes(expired, WEDNESDAY_AFTERNOON), 0)
+        for mode in ('trading', 'minutes'):
+            self.assertEqual(
+                time_to_maturity('2023-11-01', mode, WEDNESDAY_AFTERNOON), 0.0
+            )
+
+    def test_scalars_and_aware_datetimes(self):
+        now = pytz.timezone('US/Eastern').localize(datetime(2023, 11, 22, 14, 0))
+        T = time_to_maturity(date(2023, 11, 24), 'minutes', now)
+        self.assertIsInstance(T, float)
+        self.assertAlmostEqual(T, 510 / (252 * 390))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            time_to_maturity(EXPIRATIONS, 'business')
+
+
+if __name__ == '__main__':
+    unittest.main()
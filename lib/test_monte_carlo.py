@@ -0,0 +1,48 @@
+import unittest
+import vectorized as vbs
+import monte_carlo as mc
+
+S, T, R, SIGMA = 100.0, 1.0, 0.05, 0.2
+OPTIONS = dict(n_paths=100_000, steps=50, block_size=20_000, seed=7)
+
+
+# TEST SUITE
+class TestMonteCarlo(unittest.TestCase):
+    def test_european_matches_black_scholes(self):
+        result = mc.price(
+            mc.European(105.0, 'put'), S, T, R, SIGMA, control_variate=False, **OPTIONS
+        )
+        expected = float(vbs.bs_put(S, 105.0, T, R, SIGMA))
+        self.assertLess(abs(result.price - expected), 4 * result.std_error)
+
+    def test_reproducible_across_workers(self):
+        payoff = mc.Asian(100.0)
+        serial = mc.price(payoff, S, T, R, SIGMA, **OPTIONS)
+        pooled = mc.price(payoff, S, T, R, SIGMA, workers=2, **OPTIONS)
+        self.assertAlmostEqual(serial.price, pooled.price, places=12)
+        self.assertEqual(serial.paths, OPTIONS['n_paths'])
+
+    def test_variance_reduction(self):
+        payoff = mc.Asian(100.0)
+        plain = mc.price(
+            payoff, S, T, R, SIGMA, antithetic=False, control_variate=False, **OPTIONS
+        )
+        reduced = mc.price(payoff, S, T, R, SIGMA, **OPTIONS)
+        self.assertLess(reduced.std_error, 0.5 * plain.std_error)
+        self.assertLess(abs(reduced.price - plain.price), 4 * plain.std_error)
+
+    def test_path_dependent_bounds(self):
+        vanilla = float(vbs.call(S, 100.0, T, R, SIGMA))
+        knock_out = mc.price(mc.Barrier(100.0, 130.0), S, T, R, SIGMA, **OPTIONS)
+        knock_in = mc.price(
+            mc.Barrier(100.0, 130.0, 'up-and-in'), S, T, R, SIGMA, **OPTIONS
+        )
+        lookback = mc.price(mc.Lookback(), S, T, R, SIGMA, **OPTIONS)
+        self.assertLess(knock_out.price, vanilla)
+        # in + out parity
+        self.assertAlmostEqual(knock_out.price + knock_in.price, vanilla, delta=0.05)
+        self.assertGreater(lookback.price, vanilla)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+import normal
+import black_scholes as bs
+import vectorized as vbs
+
+X = np.linspace(-12.0, 12.0, 241)
+
+
+# TEST SUITE
+class TestNormalBackends(unittest.TestCase):
+    def test_backends_agree(self):
+        with normal.use_backend('scipy'):
+            cdf, pdf = normal.cdf(X), normal.pdf(X)
+        for name in normal.BACKENDS:
+            with normal.use_backend(name):
+                np.testing.assert_allclose(normal.cdf(X), cdf, rtol=1e-13, atol=1e-300)
+                np.testing.assert_allclose(normal.pdf(X), pdf, rtol=1e-13)
+                self.assertAlmostEqual(normal.cdf(0.5), float(cdf[125]), places=15)
+                np.testing.assert_allclose(
+                    normal.cdfs((-1.0, 0.0, 1.0)),
+                    normal.cdf(np.array([-1.0, 0.0, 1.0])),
+                )
+
+    def test_pricing_follows_backend(self):
+        prices = {}
+        for name in normal.BACKENDS:
+            with normal.use_backend(name):
+                result = bs.price_and_greeks(100.0, 105.0, 0.5, 0.05, 0.25)
+                prices[name] = (
+                    bs.call(100.0, 105.0, 0.5, 0.05, 0.25),
+                    result.put,
+                    float(vbs.call(100.0, 105.0, 0.5, 0.05, 0.25)),
+                )
+        for name, values in prices.items():
+            np.testing.assert_allclose(
+                values, prices['scipy'], rtol=1e-13, err_msg=name
+            )
+
+    def test_array_inputs_take_the_vectorized_path(self):
+        with normal.use_backend('ndtr'):
+            cdf, pdf = normal.cdf(X), normal.pdf(X)
+        for name in normal.BACKENDS:
+            with normal.use_backend(name):
+                np.testing.assert_allclose(normal.cdf(X), cdf, rtol=1e-13, atol=1e-300)
+                np.testing.assert_array_equal(normal.pdf(X), pdf)
+                self.assertEqual(normal.cdf(X[:240].reshape(12, 20)).shape, (12, 20))
+
+    def test_switching(self):
+        previous = normal.get_backend()
+        with normal.use_backend('erf'):
+            self.assertEqual(normal.get_backend(), 'erf')
+        self.assertEqual(normal.get_backend(), previous)
+        with self.assertRaises(ValueError):
+            normal.set_backend('nope')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+import black_scholes as bs
+from scenarios import stress
+
+SPOT_SHOCKS = np.linspace(-0.2, 0.2, 5)
+VOL_SHOCKS = np.array([-0.1, 0.0, 0.1])
+TIME_SHOCKS = np.array([0.0, 7.0])
+
+
+def make_book():
+    return dict(
+        S=[100.0, 100.0, 250.0, 250.0],
+        K=[105.0, 95.0, 250.0, 0.0],
+        T=[0.5, 0.5, 30 / 365, 0.0],
+        r=0.05,
+        sigma=[0.25, 0.3, 0.4, 0.0],
+        option_type=['call', 'put', 'call', 'stock'],
+        quantity=[2, -3, 1, -50],
+    )
+
+
+# TEST SUITE
+class TestScenarios(unittest.TestCase):
+    def setUp(self):
+        self.result = stress(
+            **make_book(),
+            spot_shocks=SPOT_SHOCKS,
+            vol_shocks=VOL_SHOCKS,
+            time_shocks=TIME_SHOCKS,
+        )
+
+    def test_cube_shape_and_base_scenario(self):
+        self.assertEqual(self.result.pnl.shape, (4, 5, 3, 2))
+        np.testing.assert_allclose(self.result.pnl[:, 2, 1, 0], 0.0, atol=1e-9)
+
+    def test_matches_scalar_revaluation(self):
+        # first position, spot -20%, vol +10 points, one week later
+        shocked = bs.call(80.0, 105.0, 0.5 - 7 / 365, 0.05, 0.35)
+        base = bs.call(100.0, 105.0, 0.5, 0.05, 0.25)
+        self.assertAlmostEqual(
+            self.result.pnl[0, 0, 2, 1], 2 * 100 * (shocked - base), places=8
+        )
+
+    def test_stock_position_is_linear(self):
+        np.testing.assert_allclose(
+            self.result.pnl[3, :, 1, 0], -50 * 250.0 * SPOT_SHOCKS, atol=1e-9
+        )
+
+    def test_aggregation(self):
+        np.testing.assert_allclose(self.result.portfolio(), self.result.pnl.sum(axis=0))
+        groups = self.result.by(['XYZ', 'XYZ', 'ABC', 'ABC'])
+        np.testing.assert_allclose(
+            groups['XYZ'] + groups['ABC'], self.result.portfolio(), atol=1e-9
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+import numpy as np
+import black_scholes as bs
+import vectorized as vbs
+
+FUNCTIONS = [
+    'd1',
+    'd2',
+    'call',
+    'bs_put',
+    'call_delta',
+    'call_gamma',
+    'call_vega',
+    'call_theta',
+    'call_rho',
+    'put_delta',
+    'put_gamma',
+    'put_vega',
+    'put_theta',
+    'put_rho',
+]
+
+CHAIN_KEYS = {
+    'call': 'call',
+    'put': 'bs_put',
+    'call_delta': 'call_delta',
+    'put_delta': 'put_delta',
+    'gamma': 'call_gamma',
+    'vega': 'call_vega',
+    'call_theta': 'call_theta',
+    'put_theta': 'put_theta',
+    'call_rho': 'call_rho',
+    'put_rho': 'put_rho',
+}
+
+
+def make_chain():
+    strikes = np.linspace(50.0, 150.0, 21)
+    expiries = np.array([7 / 365, 0.25, 1.0, 2.5])
+    K, T = np.meshgrid(strikes, expiries)
+    return 100.0, K.ravel(), T.ravel(), 0.045, 0.3
+
+
+# TEST SUITE
+class TestScalarReference(unittest.TestCase):
+    def test_hull_textbook_example(self):
+        # Hull, Options, Futures and Other Derivatives, Example 15.6
+        self.assertAlmostEqual(bs.call(42.0, 40.0, 0.5, 0.1, 0.2), 4.76, places=2)
+        self.assertAlmostEqual(bs.bs_put(42.0, 40.0, 0.5, 0.1, 0.2), 0.81, places=2)
+
+
+class TestFusedKernel(unittest.TestCase):
+    def test_price_and_greeks_matches_scalar(self):
+        S, K, T, r, sigma = make_chain()
+        for k, t in zip(K, T):
+            result = bs.price_and_greeks(S, k, t, r, sigma)
+            for key, name in CHAIN_KEYS.items():
+                self.assertAlmostEqual(
+                    getattr(result, key),
+                    getattr(bs, name)(S, k, t, r, sigma),
+                    places=10,
+                    msg=key,
+                )
+
+    def test_result_has_slots(self):
+        result = bs.price_and_greeks(100.0, 100.0, 0.25, 0.05, 0.2)
+        self.assertFalse(hasattr(result, '__dict__'))
+
+
+class TestVectorizedMatchesScalar(unittest.TestCase):
+    def test_functions_match_scalar(self):
+        S, K, T, r, sigma = make_chain()
+        for name in FUNCTIONS:
+            expected = [getattr(bs, name)(S, k, t, r, sigma) for k, t in zip(K, T)]
+            actual = getattr(vbs, name)(S, K, T, r, sigma)
+            np.testing.assert_allclose(
+                actual, expected, rtol=1e-9, atol=1e-12, err_msg=name
+            )
+
+    def test_price_chain_matches_scalar(self):
+        S, K, T, r, sigma = make_chain()
+        chain = vbs.price_chain(S, K, T, r, sigma)
+        for key, name in CHAIN_KEYS.items():
+            expected = [getattr(bs, name)(S, k, t, r, sigma) for k, t in zip(K, T)]
+            np.testing.assert_allclose(
+                getattr(chain, key), expected, rtol=1e-9, atol=1e-12, err_msg=key
+            )
+
+    def test_broadcasting(self):
+        S = np.array([90.0, 100.0, 110.0])[:, None]
+        K = np.array([95.0, 105.0])
+        prices = vbs.call(S, K, 0.5, 0.05, 0.2)
+        self.assertEqual(prices.shape, (3, 2))
+        self.assertAlmostEqual(prices[1, 0], bs.call(100.0, 95.0, 0.5, 0.05, 0.2))
+
+    def test_put_call_parity(self):
+        S, K, T, r, sigma = make_chain()
+        chain = vbs.price_chain(S, K, T, r, sigma)
+        np.testing.assert_allclose(
+            chain.call - chain.put, S - K * np.exp(-r * T), atol=1e-9
+        )
+
+
+# central differences of the first-order greeks, with the same scaling as the
+# higher greeks: per vol point for sigma, 0.01 and time passing for T
+def bump(fn, S, K, T, r, sigma, wrt, h):
+    args = {'S': S, 'K': K, 'T': T, 'r': r, 'sigma': sigma}
+    up, down = dict(args), dict(args)
+    up[wrt] = args[wrt] + h
+    down[wrt] = args[wrt] - h
+    derivative = (fn(**up) - fn(**down)) / (2 * h)
+    return {'S': 1.0, 'sigma': 0.01, 'T': -0.01}[wrt] * derivative
+
+
+class TestHigherGreeks(unittest.TestCase):
+    def setUp(self):
+        self.chain = make_chain()
+        self.greeks = vbs.higher_greeks(*self.chain)
+
+    def assert_matches(self, key, fn, wrt, h):
+        expected = bump(fn, *self.chain, wrt, h)
+        np.testing.assert_allclose(
+            getattr(self.greeks, key), expected, rtol=1e-5, atol=1e-9, err_msg=key
+        )
+
+    def test_vanna(self):
+        self.assert_matches('vanna', vbs.call_delta, 'sigma', 1e-5)
+        # vanna is also the spot sensitivity of vega
+        self.assert_matches('vanna', vbs.call_vega, 'S', 1e-4)
+
+    def test_volga(self):
+        self.assert_matches('volga', vbs.call_vega, 'sigma', 1e-5)
+
+    def test_charm_is_the_same_for_calls_and_puts(self):
+        self.assert_matches('charm', vbs.call_delta, 'T', 1e-6)
+        self.assert_matches('charm', vbs.put_delta, 'T', 1e-6)
+
+    def test_gamma_sensitivities(self):
+        self.assert_matches('speed', vbs.call_gamma, 'S', 1e-4)
+        self.assert_matches('zomma', vbs.call_gamma, 'sigma', 1e-5)
+        self.assert_matches('color', vbs.call_gamma, 'T', 1e-6)
+
+    def test_book_greeks_matches_the_separate_passes(self):
+        prices, greeks = vbs.book_greeks(*self.chain)
+        chain = vbs.price_chain(*self.chain)
+        for key in chain.__slots__:
+            np.testing.assert_array_equal(getattr(prices, key), getattr(chain, key))
+        for key in greeks.__slots__:
+            np.testing.assert_array_equal(
+                getattr(greeks, key), getattr(self.greeks, key)
+            )
+        self.assertFalse(hasattr(greeks, '__dict__'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import numpy as np
+import vectorized as vbs
+from vol_surface import VolSurface
+
+S = 100.0
+R = 0.03
+EXPIRIES = np.array([0.1, 0.5, 1.0])
+STRIKES = np.linspace(80.0, 120.0, 9)
+
+
+def smile(K, T):
+    k = np.log(K / S) - R * T
+    return 0.2 - 0.1 * k + 0.5 * k**2
+
+
+def forward(T):
+    return S * np.exp(R * T)
+
+
+def make_surface():
+    K, T = np.meshgrid(STRIKES, EXPIRIES)
+    return VolSurface(S, R, K, T, smile(K, T))
+
+
+# TEST SUITE
+class TestVolSurface(unittest.TestCase):
+    def test_reprices_quotes_on_each_slice(self):
+        surface = make_surface()
+        for t in EXPIRIES:
+            np.testing.assert_allclose(
+                surface.sigma(STRIKES, t), smile(STRIKES, t), atol=2e-3
+            )
+
+    def test_linear_in_total_variance_between_expiries(self):
+        surface = make_surface()
+        # interpolation is at fixed log-moneyness against the forward
+        moneyness = np.array([0.9, 1.0, 1.1])
+        w_lo = surface.total_variance(moneyness * forward(0.5), 0.5)
+        w_hi = surface.total_variance(moneyness * forward(1.0), 1.0)
+        np.testing.assert_allclose(
+            surface.total_variance(moneyness * forward(0.75), 0.75),
+            0.5 * (w_lo + w_hi),
+            rtol=1e-12,
+        )
+
+    def test_flat_extrapolation(self):
+        surface = make_surface()
+        np.testing.assert_allclose(
+            surface.sigma(forward(0.01), 0.01), surface.sigma(forward(0.1), 0.1)
+        )
+        np.testing.assert_allclose(
+            surface.sigma(forward(3.0), 3.0), surface.sigma(forward(1.0), 1.0)
+        )
+        np.testing.assert_allclose(surface.sigma(10.0, 0.5), surface.sigma(80.0, 0.5))
+
+    def test_update_refits_only_its_slice(self):
+        surface = make_surface()
+        before = surface.sigma(STRIKES[:, None], EXPIRIES)
+        surface.update(100.0, 0.5, 0.35)
+        after = surface.sigma(STRIKES[:, None], EXPIRIES)
+        np.testing.assert_array_equal(after[:, [0, 2]], before[:, [0, 2]])
+        self.assertFalse(np.allclose(after[:, 1], before[:, 1]))
+
+    def test_update_adds_new_expiry(self):
+        surface = make_surface()
+        surface.update(STRIKES, 2.0, 0.4)
+        np.testing.assert_array_equal(surface.expiries, [0.1, 0.5, 1.0, 2.0])
+        np.testing.assert_allclose(surface.sigma(STRIKES, 2.0), 0.4)
+
+    def test_from_prices(self):
+        K, T = np.meshgrid(STRIKES, EXPIRIES)
+        price = vbs.call(S, K, T, R, smile(K, T))
+        surface = VolSurface.from_prices(price, S, K, T, R)
+        np.testing.assert_allclose(
+            surface.sigma(K, T), make_surface().sigma(K, T), atol=1e-6
+        )
+
+    def test_needs_at_least_one_quote(self):
+        with self.assertRaises(ValueError):
+            VolSurface(S, R, [], [], [])
+        # below intrinsic value, so no quote inverts
+        with self.assertRaisesRegex(ValueError, 'no quote converged'):
+            VolSurface.from_prices(0.01, S, [50.0, 60.0], 0.5, R)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import unittest
+import numpy as np
+import pandas as pd
+from vectorized import price_chain
+from volatility import (
+    EWMAVolatility,
+    RollingVolatility,
+    close_to_close,
+    estimate,
+    ewma,
+    garman_klass,
+    parkinson,
+    yang_zhang,
+)
+
+ESTIMATORS = {
+    'close': lambda o, hi, lo, c, window: close_to_close(c, window),
+    'parkinson': lambda o, hi, lo, c, window: parkinson(hi, lo, window),
+    'garman_klass': garman_klass,
+    'yang_zhang': yang_zhang,
+}
+RANGE_ONLY = ('parkinson', 'garman_klass')
+
+
+# daily OHLC bars of a geometric Brownian motion, sampled every 5 minutes of
+# a 6.5 hour session, with an overnight gap; one column per ticker
+def simulate_bars(sigmas, days=500, steps=78, overnight=0.2, seed=7):
+    rng = np.random.default_rng(seed)
+    sigmas = np.asarray(sigmas, dtype=np.float64)
+    day = sigmas / np.sqrt(252)
+    shape = (days, len(sigmas))
+    gaps = rng.standard_normal(shape) * day * np.sqrt(overnight)
+    moves = (
+        rng.standard_normal((days, steps, len(sigmas)))
+        * day
+        * np.sqrt((1 - overnight) / steps)
+    )
+    opens = np.empty(shape)
+    highs, lows, closes = np.empty(shape), np.empty(shape), np.empty(shape)
+    price = np.full(len(sigmas), 100.0)
+    for t in range(days):
+        opens[t] = price * np.exp(gaps[t])
+        path = opens[t] * np.exp(np.cumsum(moves[t], axis=0))
+        highs[t] = np.maximum(path.max(axis=0), opens[t])
+        lows[t] = np.minimum(path.min(axis=0), opens[t])
+        closes[t] = price = path[-1]
+    return opens, highs, lows, closes
+
+
+# TEST SUITE
+class TestRollingEstimators(unittest.TestCase):
+    def setUp(self):
+        self.bars = simulate_bars([0.15, 0.3, 0.6])
+
+    def test_close_to_close_matches_pandas(self):
+        closes = pd.DataFrame(self.bars[3], columns=['SPY', 'AAPL', 'TSLA'])
+        sigma = close_to_close(closes, window=21)
+        expected = np.log(closes).diff().rolling(21).std() * np.sqrt(252)
+        self.assertIsInstance(sigma, pd.DataFrame)
+        self.assertEqual(list(sigma.columns), ['SPY', 'AAPL', 'TSLA'])
+        pd.testing.assert_frame_equal(sigma, expected)
+
+    def test_range_estimators_match_their_definitions(self):
+        o, hi, lo, c = (x[:, 1] for x in self.bars)
+        window = 10
+        t = slice(len(c) - window, len(c))
+        hl, co = np.log(hi[t] / lo[t]), np.log(c[t] / o[t])
+        self.assertAlmostEqual(
+            parkinson(hi, lo, window)[-1],
+            np.sqrt(np.mean(hl**2) / (4 * np.log(2)) * 252),
+        )
+        self.assertAlmostEqual(
+            garman_klass(o, hi, lo, c, window)[-1],
+            np.sqrt(np.mean(0.5 * hl**2 - (2 * np.log(2) - 1) * co**2) * 252),
+        )
+        overnight = np.log(o[t] / c[len(c) - window - 1 : -1])
+        rogers_satchell = np.log(hi[t] / c[t]) * np.log(hi[t] / o[t]) + np.log(
+            lo[t] / c[t]
+        ) * np.log(lo[t] / o[t])
+        k = 0.34 / (1.34 + (window + 1) / (window - 1))
+        variance = (
+            np.var(overnight, ddof=1)
+            + k * np.var(co, ddof=1)
+            + (1 - k) * np.mean(rogers_satchell)
+        )
+        self.assertAlmostEqual(
+            yang_zhang(o, hi, lo, c, window)[-1], np.sqrt(variance * 252)
+        )
+
+    def test_warm_up_rows_are_nan(self):
+        o, hi, lo, c = self.bars
+        for name, estimator in ESTIMATORS.items():
+            sigma = estimator(o, hi, lo, c, window=20)
+            first = 19 if name in RANGE_ONLY else 20
+            with self.subTest(estimator=name):
+                self.assertEqual(sigma.shape, c.shape)
+                self.assertTrue(np.isnan(sigma[:first]).all())
+                self.assertFalse(np.isnan(sigma[first:]).any())
+        self.assertTrue(np.isnan(close_to_close(c[:5], window=20)).all())
+
+    def test_estimators_recover_the_simulated_volatility(self):
+        o, hi, lo, c = self.bars
+        sigmas = np.array([0.15, 0.3, 0.6])
+        for name, estimator in ESTIMATORS.items():
+            sigma = np.nanmean(estimator(o, hi, lo, c, window=60), axis=0)
+            # the range estimators only see the session, not the overnight gap
+            expected = sigmas * (np.sqrt(0.8) if name in RANGE_ONLY else 1)
+            with self.subTest(estimator=name):
+                np.testing.assert_allclose(sigma, expected, rtol=0.1)
+        np.testing.assert_allclose(
+            np.nanmean(ewma(c), axis=0), [0.15, 0.3, 0.6], rtol=0.1
+        )
+
+    def test_latest_row_feeds_the_pricer(self):
+        o, hi, lo, c = self.bars
+        sigma = yang_zhang(o, hi, lo, c)[-1]
+        result = price_chain(c[-1], c[-1], 0.25, 0.05, sigma)
+        self.assertEqual(result.call.shape, (3,))
+        # at the money, the call is worth more per dollar of spot as sigma rises
+        self.assertTrue((np.diff(result.call / c[-1]) > 0).all())
+
+    def test_estimate_reads_only_the_prices_it_needs(self):
+        o, hi, lo, c = self.bars
+        bars = pd.DataFrame({'open': o[:, 0], 'high': hi[:, 0], 'close': c[:, 0]})
+        self.assertEqual(estimate(bars, 'close'), close_to_close(c)[-1, 0])
+        self.assertEqual(estimate(bars, 'ewma', window=30), ewma(c, window=30)[-1, 0])
+        with self.assertRaises(KeyError):
+            estimate(bars, 'yang_zhang')
+
+    def test_unknown_estimator(self):
+        with self.assertRaises(ValueError):
+            RollingVolatility('hodges_tompkins')
+        with self.assertRaises(ValueError):
+            close_to_close(self.bars[3], window=1)
+
+
+class TestIncrementalEstimators(unittest.TestCase):
+    def test_rolling_updates_match_the_batch_estimates(self):
+        o, hi, lo, c = simulate_bars([0.2, 0.4], days=300)
+        for name, estimator in ESTIMATORS.items():
+            live = RollingVolatility(name, window=20, tickers=2)
+            updates = np.array(
+                [live.update(o[t], hi[t], lo[t], c[t]) for t in range(len(c))]
+            )
+            with self.subTest(estimator=name):
+                np.testing.assert_allclose(
+                    updates, estimator(o, hi, lo, c, window=20), rtol=1e-9
+                )
+
+    def test_rolling_update_takes_only_the_prices_it_needs(self):
+        _, _, _, c = simulate_bars([0.25], days=50)
+        live = RollingVolatility('close', window=10)
+        for close in c:
+            sigma = live.update(close=close)
+        self.assertAlmostEqual(sigma[0], close_to_close(c, window=10)[-1, 0])
+
+    def test_ewma_updates_match_the_batch_estimate(self):
+        _, _, _, c = simulate_bars([0.2, 0.4], days=200)
+        live = EWMAVolatility(lam=0.97, window=10)
+        updates = np.array([live.update(close) for close in c])
+        np.testing.assert_allclose(updates, ewma(c, lam=0.97, window=10))
+        self.assertTrue(np.isnan(updates[:10]).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
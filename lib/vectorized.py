@@ -0,0 +1,190 @@
+# import packages
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+import normal
+from black_scholes import PriceAndGreeks
+
+# Vectorized counterparts of the pricing functions in black_scholes.py.
+#
+# Every function takes NumPy arrays (or any broadcastable mix of arrays and
+# scalars) for S, K, T, r and sigma and prices the whole option chain in one
+# pass, returning an array shaped like the broadcast of its inputs. The
+# conventions match the scalar functions exactly: vega, theta and rho are
+# scaled by 0.01, and r and sigma are decimals (0.05, not 5). The normal CDF /
+# PDF come from the backend selected in normal.py, all of which handle arrays
+# in one vectorized call.
+#
+# higher_greeks adds the second- and third-order greeks, following the same
+# scaling: everything taken with respect to sigma (vanna, volga, zomma) is per
+# vol point and everything taken with respect to time (charm, color) is scaled
+# by 0.01 like theta.
+
+
+def _broadcast(S, K, T, r, sigma):
+    return np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (S, K, T, r, sigma))
+    )
+
+
+# factor by which present value of contingent receipt
+# of stock exceeds current stock price
+def d1(S, K, T, r, sigma):
+    S, K, T, r, sigma = _broadcast(S, K, T, r, sigma)
+    return (np.log(S / K) + (r + sigma**2 / 2.0) * T) / (sigma * np.sqrt(T))
+
+
+# the risk-adjusted probability that the option will be exercised
+def d2(S, K, T, r, sigma):
+    S, K, T, r, sigma = _broadcast(S, K, T, r, sigma)
+    return d1(S, K, T, r, sigma) - sigma * np.sqrt(T)
+
+
+# define the call options price function
+def call(S, K, T, r, sigma):
+    S, K, T, r, sigma = _broadcast(S, K, T, r, sigma)
+    return S * normal.cdf(d1(S, K, T, r, sigma)) - K * np.exp(-r * T) * normal.cdf(
+        d2(S, K, T, r, sigma)
+    )
+
+
+# define the put options price function
+def bs_put(S, K, T, r, sigma):
+    S, K, T, r, sigma = _broadcast(S, K, T, r, sigma)
+    return K * np.exp(-r * T) - S + call(S, K, T, r, sigma)
+
+
+# define the Call_Greeks of an option
+def call_delta(S, K, T, r, sigma):
+    return normal.cdf(d1(S, K, T, r, sigma))
+
+
+def call_gamma(S, K, T, r, sigma):
+    S, K, T, r, sigma = _broadcast(S, K, T, r, sigma)
+    return normal.pdf(d1(S, K, T, r, sigma)) / (S * sigma * np.sqrt(T))
+
+
+def call_vega(S, K, T, r, sigma):
+    S, K, T, r, sigma = _broadcast(S, K, T, r, sigma)
+    return 0.01 * (S * normal.pdf(d1(S, K, T, r, sigma)) * np.sqrt(T))
+
+
+def call_theta(S, K, T, r, sigma):
+    S, K, T, r, sigma = _broadcast(S, K, T, r, sigma)
+    return 0.01 * (
+        -(S * normal.pdf(d1(S, K, T, r, sigma)) * sigma) / (2 * np.sqrt(T))
+        - r * K * np.exp(-r * T) * normal.cdf(d2(S, K, T, r, sigma))
+    )
+
+
+def call_rho(S, K, T, r, sigma):
+    S, K, T, r, sigma = _broadcast(S, K, T, r, sigma)
+    return 0.01 * (K * T * np.exp(-r * T) * normal.cdf(d2(S, K, T, r, sigma)))
+
+
+# define the Put_Greeks of an option
+def put_delta(S, K, T, r, sigma):
+    return -normal.cdf(-d1(S, K, T, r, sigma))
+
+
+def put_gamma(S, K, T, r, sigma):
+    return call_gamma(S, K, T, r, sigma)
+
+
+def put_vega(S, K, T, r, sigma):
+    return call_vega(S, K, T, r, sigma)
+
+
+def put_theta(S, K, T, r, sigma):
+    S, K, T, r, sigma = _broadcast(S, K, T, r, sigma)
+    return 0.01 * (
+        -(S * normal.pdf(d1(S, K, T, r, sigma)) * sigma) / (2 * np.sqrt(T))
+        + r * K * np.exp(-r * T) * normal.cdf(-d2(S, K, T, r, sigma))
+    )
+
+
+def put_rho(S, K, T, r, sigma):
+    S, K, T, r, sigma = _broadcast(S, K, T, r, sigma)
+    return 0.01 * (-K * T * np.exp(-r * T) * normal.cdf(-d2(S, K, T, r, sigma)))
+
+
+# d1, d2, n(d1), sqrt(T) and the discounted strike, shared by the chain
+# functions below
+def _intermediates(S, K, T, r, sigma):
+    S, K, T, r, sigma = _broadcast(S, K, T, r, sigma)
+    sqrt_T = np.sqrt(T)
+    sigma_sqrt_T = sigma * sqrt_T
+    d_1 = (np.log(S / K) + (r + sigma**2 / 2.0) * T) / sigma_sqrt_T
+    d_2 = d_1 - sigma_sqrt_T
+    return S, K, T, r, sigma, sqrt_T, sigma_sqrt_T, d_1, d_2, normal.pdf(d_1)
+
+
+def _price_chain(S, K, T, r, sigma, sqrt_T, sigma_sqrt_T, d_1, d_2, pdf_d1):
+    pv_strike = K * np.exp(-r * T)
+    cdf_d1 = normal.cdf(d_1)
+    cdf_d2 = normal.cdf(d_2)
+    cdf_neg_d1 = normal.cdf(-d_1)
+    cdf_neg_d2 = normal.cdf(-d_2)
+    gamma = pdf_d1 / (S * sigma_sqrt_T)
+    vega = 0.01 * (S * pdf_d1 * sqrt_T)
+    decay = -(S * pdf_d1 * sigma) / (2 * sqrt_T)
+    call_price = S * cdf_d1 - pv_strike * cdf_d2
+    return PriceAndGreeks(
+        call=call_price,
+        put=pv_strike - S + call_price,
+        call_delta=cdf_d1,
+        put_delta=-cdf_neg_d1,
+        gamma=gamma,
+        vega=vega,
+        call_theta=0.01 * (decay - r * pv_strike * cdf_d2),
+        put_theta=0.01 * (decay + r * pv_strike * cdf_neg_d2),
+        call_rho=0.01 * (T * pv_strike * cdf_d2),
+        put_rho=0.01 * (-T * pv_strike * cdf_neg_d2),
+    )
+
+
+# second- and third-order greeks, the same for calls and puts (no dividends)
+@dataclass
+class HigherGreeks:
+    __slots__ = ('vanna', 'volga', 'charm', 'speed', 'zomma', 'color')
+    vanna: float | np.ndarray  # d delta / d sigma = d vega / d S
+    volga: float | np.ndarray  # d vega / d sigma, a.k.a. vomma
+    charm: float | np.ndarray  # d delta / d t, the delta decay as time passes
+    speed: float | np.ndarray  # d gamma / d S
+    zomma: float | np.ndarray  # d gamma / d sigma
+    color: float | np.ndarray  # d gamma / d t, the gamma decay as time passes
+
+
+def _higher_greeks(S, K, T, r, sigma, sqrt_T, sigma_sqrt_T, d_1, d_2, pdf_d1):
+    gamma = pdf_d1 / (S * sigma_sqrt_T)
+    # d d1 / d T; time passing is the opposite sign
+    d1_dT = (2 * r * T - d_2 * sigma_sqrt_T) / (2 * T * sigma_sqrt_T)
+    return HigherGreeks(
+        vanna=0.01 * (-pdf_d1 * d_2 / sigma),
+        volga=0.0001 * (S * pdf_d1 * sqrt_T * d_1 * d_2 / sigma),
+        charm=0.01 * (-pdf_d1 * d1_dT),
+        speed=-gamma / S * (d_1 / sigma_sqrt_T + 1),
+        zomma=0.01 * (gamma * (d_1 * d_2 - 1) / sigma),
+        color=0.01 * (gamma * (1 / (2 * T) + d_1 * d1_dT)),
+    )
+
+
+# price the whole chain and every greek in a single vectorized pass; the
+# fields of the returned PriceAndGreeks are arrays
+def price_chain(S, K, T, r, sigma):
+    return _price_chain(*_intermediates(S, K, T, r, sigma))
+
+
+# vanna, volga, charm, speed, zomma and color of the whole chain in one pass;
+# the fields of the returned HigherGreeks are arrays
+def higher_greeks(S, K, T, r, sigma):
+    return _higher_greeks(*_intermediates(S, K, T, r, sigma))
+
+
+# price_chain and higher_greeks together, computing d1, d2 and n(d1) once
+def book_greeks(S, K, T, r, sigma):
+    shared = _intermediates(S, K, T, r, sigma)
+    return _price_chain(*shared), _higher_greeks(*shared)
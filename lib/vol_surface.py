@@ -0,0 +1,127 @@
+# import packages
+import numpy as np
+
+from implied_vol import CONVERGED, implied_volatility
+
+# Implied volatility surface over strike x expiry.
+#
+# Each expiry slice is fitted once with a polynomial smile in total variance
+# w = sigma^2 * T against log-moneyness k = log(K / F), where F = S * exp(rT)
+# is the forward. The fitted coefficients of every slice are kept stacked in
+# one array, so a query for any number of (K, T) points is a handful of
+# vectorized operations: evaluate the two neighbouring smiles at each point's
+# log-moneyness and interpolate linearly in total variance across expiries.
+# Outside the quoted strikes a smile is held flat, before the first expiry
+# the first slice's volatility is used and after the last the last slice's.
+
+
+class VolSurface:
+    def __init__(self, S, r, K, T, sigma, degree=2):
+        self.S = float(S)
+        self.r = float(r)
+        self.degree = degree
+        self._quotes = {}
+        self._expiries = np.empty(0)
+        self._coefs = np.empty((0, degree + 1))
+        self._k_lo = np.empty(0)
+        self._k_hi = np.empty(0)
+
+        K, T, sigma = (
+            np.ravel(x).astype(np.float64) for x in np.broadcast_arrays(K, T, sigma)
+        )
+        for k, t, s in zip(K, T, sigma):
+            self._quotes.setdefault(t, {})[k] = s
+        if not self._quotes:
+            raise ValueError('a volatility surface needs at least one quote')
+        for t in sorted(self._quotes):
+            self._fit(t)
+
+    # build a surface straight from market prices, dropping the quotes whose
+    # implied volatility did not converge
+    @classmethod
+    def from_prices(cls, price, S, K, T, r, option_type='call', degree=2, **solver):
+        price, K, T = (np.ravel(x) for x in np.broadcast_arrays(price, K, T))
+        result = implied_volatility(price, S, K, T, r, option_type, **solver)
+        ok = np.ravel(result.status) == CONVERGED
+        if not ok.any():
+            raise ValueError('no quote converged to an implied volatility')
+        return cls(S, r, K[ok], T[ok], np.ravel(result.sigma)[ok], degree=degree)
+
+    @property
+    def expiries(self):
+        return self._expiries.copy()
+
+    def log_moneyness(self, K, T):
+        return np.log(np.asarray(K, dtype=np.float64) / self.S) - self.r * np.asarray(
+            T, dtype=np.float64
+        )
+
+    # fit one expiry slice and store its coefficients in the stacked arrays
+    def _fit(self, t):
+        quotes = self._quotes[t]
+        K = np.fromiter(quotes.keys(), dtype=np.float64)
+        sigma = np.fromiter(quotes.values(), dtype=np.float64)
+        k = self.log_moneyness(K, t)
+        w = sigma**2 * t
+        degree = min(self.degree, len(k) - 1)
+        coefs = np.zeros(self.degree + 1)
+        # np.polyfit returns the highest power first; store lowest first
+        coefs[: degree + 1] = np.polyfit(k, w, degree)[::-1]
+
+        i = np.searchsorted(self._expiries, t)
+        if i < len(self._expiries) and self._expiries[i] == t:
+            self._coefs[i] = coefs
+            self._k_lo[i] = k.min()
+            self._k_hi[i] = k.max()
+        else:
+            self._expiries = np.insert(self._expiries, i, t)
+            self._coefs = np.insert(self._coefs, i, coefs, axis=0)
+            self._k_lo = np.insert(self._k_lo, i, k.min())
+            self._k_hi = np.insert(self._k_hi, i, k.max())
+
+    # evaluate the smiles of slices i at log-moneyness k, held flat
+    # outside each slice's quoted range
+    def _slice_variance(self, i, k):
+        k = np.clip(k, self._k_lo[i], self._k_hi[i])
+        coefs = self._coefs[i]
+        w = coefs[..., -1]
+        for j in range(self.degree - 1, -1, -1):
+            w = w * k + coefs[..., j]
+        return np.maximum(w, 0.0)
+
+    def total_variance(self, K, T):
+        K, T = np.broadcast_arrays(
+            np.asarray(K, dtype=np.float64), np.asarray(T, dtype=np.float64)
+        )
+        k = self.log_moneyness(K, T)
+        expiries = self._expiries
+        last = len(expiries) - 1
+
+        hi = np.clip(np.searchsorted(expiries, T), 0, last)
+        lo = np.clip(hi - 1, 0, last)
+        t_lo, t_hi = expiries[lo], expiries[hi]
+        w_lo = self._slice_variance(lo, k)
+        w_hi = self._slice_variance(hi, k)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(hi == lo, 1.0, (T - t_lo) / (t_hi - t_lo))
+        w = w_lo + weight * (w_hi - w_lo)
+        # flat volatility beyond the first and last expiries
+        w = np.where(T <= expiries[0], w_hi * T / expiries[0], w)
+        return np.where(T >= expiries[last], w_hi * T / expiries[last], w)
+
+    def sigma(self, K, T):
+        T = np.asarray(T, dtype=np.float64)
+        return np.sqrt(self.total_variance(K, T) / T)
+
+    # change (or add) quotes and refit only the expiry slices they touch
+    def update(self, K, T, sigma):
+        K, T, sigma = (
+            np.ravel(x).astype(np.float64) for x in np.broadcast_arrays(K, T, sigma)
+        )
+        touched = set()
+        for k, t, s in zip(K, T, sigma):
+            self._quotes.setdefault(t, {})[k] = s
+            touched.add(t)
+        for t in touched:
+            self._fit(t)
@@ -0,0 +1,267 @@
+# import packages
+from math import log
+
+import numpy as np
+
+# Historical volatility estimators, annualized, for the pricing functions'
+# sigma argument.
+#
+# Bars are along axis 0 and anything after it (tickers, usually) is
+# broadcast, so one call estimates a whole universe; pandas DataFrames (rows
+# are bars, columns are tickers) come back as DataFrames. Prices must be
+# positive and free of NaNs. The first window bars (close-to-close, Yang-Zhang
+# and EWMA need the previous close) or window - 1 bars (Parkinson,
+# Garman-Klass) are NaN.
+#
+#   sigma = yang_zhang(opens, highs, lows, closes, window=20)[-1]
+#   vectorized.price_chain(S, K, T, r, sigma)
+#
+# Every rolling estimator is a combination of window means and variances of
+# per-bar log terms, computed with cumulative sums, so a whole history costs
+# O(bars) however long the window. RollingVolatility keeps the same window
+# sums for live data and updates them in O(1) per bar; EWMAVolatility does
+# the same for the exponentially weighted estimator.
+
+TRADING_DAYS = 252
+LOG2 = log(2.0)
+ESTIMATORS = ('close', 'parkinson', 'garman_klass', 'yang_zhang')
+# the bar prices each estimator reads
+ESTIMATOR_INPUTS = {
+    'close': ('close',),
+    'parkinson': ('high', 'low'),
+    'garman_klass': ('open', 'high', 'low', 'close'),
+    'yang_zhang': ('open', 'high', 'low', 'close'),
+    'ewma': ('close',),
+}
+
+
+def _values(x):
+    return np.asarray(getattr(x, 'values', x), dtype=np.float64)
+
+
+# results keep the index and columns of a pandas input
+def _like(template, values):
+    if hasattr(template, 'index'):
+        import pandas as pd
+
+        if getattr(template, 'ndim', 1) == 1:
+            return pd.Series(values, index=template.index, name=template.name)
+        return pd.DataFrame(values, index=template.index, columns=template.columns)
+    return values
+
+
+# per-bar log terms of an estimator and, for each, whether its window
+# variance (True) or mean (False) is needed
+def _terms(estimator, open, high, low, close, prev_close):
+    if estimator == 'close':
+        return [np.log(close / prev_close)], [True]
+    hl = np.log(high / low)
+    if estimator == 'parkinson':
+        return [hl * hl / (4 * LOG2)], [False]
+    co = np.log(close / open)
+    if estimator == 'garman_klass':
+        return [0.5 * hl * hl - (2 * LOG2 - 1) * co * co], [False]
+    if estimator == 'yang_zhang':
+        rogers_satchell = np.log(high / close) * np.log(high / open) + np.log(
+            low / close
+        ) * np.log(low / open)
+        return [np.log(open / prev_close), co, rogers_satchell], [True, True, False]
+    raise ValueError(
+        'Unknown estimator %r, expected one of %s' % (estimator, list(ESTIMATORS))
+    )
+
+
+# per-bar variance from the window moments of the estimator's terms
+def _combine(estimator, window, moments):
+    if estimator == 'yang_zhang':
+        k = 0.34 / (1.34 + (window + 1) / (window - 1))
+        overnight, open_close, rogers_satchell = moments
+        return overnight + k * open_close + (1 - k) * rogers_satchell
+    return moments[0]
+
+
+def _moment(sum_x, sum_xx, window, variance):
+    if not variance:
+        return sum_x / window
+    return np.maximum((sum_xx - sum_x * sum_x / window) / (window - 1), 0.0)
+
+
+def _rolling_sum(x, window):
+    out = np.full(x.shape, np.nan)
+    if len(x) >= window:
+        c = np.cumsum(x, axis=0)
+        out[window - 1] = c[window - 1]
+        out[window:] = c[window:] - c[:-window]
+    return out
+
+
+def _rolling(estimator, window, annualization, open, high, low, close):
+    if window < 2:
+        raise ValueError('window has to be at least 2 bars')
+    template = next(x for x in (close, high) if x is not None)
+    arrays = [None if x is None else _values(x) for x in (open, high, low, close)]
+    open, high, low, close = np.broadcast_arrays(
+        *(x if x is not None else np.nan for x in arrays)
+    )
+    # terms that need the previous close start at the second bar
+    needs_prev = estimator in ('close', 'yang_zhang')
+    start = 1 if needs_prev else 0
+    terms, variances = _terms(
+        estimator,
+        open[start:],
+        high[start:],
+        low[start:],
+        close[start:],
+        close[:-1] if needs_prev else None,
+    )
+    moments = [
+        _moment(
+            _rolling_sum(term, window),
+            _rolling_sum(term * term, window) if variance else None,
+            window,
+            variance,
+        )
+        for term, variance in zip(terms, variances)
+    ]
+    sigma = np.full(close.shape, np.nan)
+    sigma[start:] = np.sqrt(_combine(estimator, window, moments) * annualization)
+    return _like(template, sigma)
+
+
+def close_to_close(close, window=20, annualization=TRADING_DAYS):
+    return _rolling('close', window, annualization, None, None, None, close)
+
+
+def parkinson(high, low, window=20, annualization=TRADING_DAYS):
+    return _rolling('parkinson', window, annualization, None, high, low, None)
+
+
+def garman_klass(open, high, low, close, window=20, annualization=TRADING_DAYS):
+    return _rolling('garman_klass', window, annualization, open, high, low, close)
+
+
+def yang_zhang(open, high, low, close, window=20, annualization=TRADING_DAYS):
+    return _rolling('yang_zhang', window, annualization, open, high, low, close)
+
+
+# RiskMetrics EWMA: var_t = lam * var_{t-1} + (1 - lam) * r_t^2, seeded with
+# the mean squared return of the first window returns
+def ewma(close, lam=0.94, window=20, annualization=TRADING_DAYS):
+    values = _values(close)
+    returns = np.log(values[1:] / values[:-1])
+    sigma = np.full(values.shape, np.nan)
+    if len(returns) >= window:
+        var = np.mean(returns[:window] ** 2, axis=0)
+        sigma[window] = var
+        for t in range(window, len(returns)):
+            var = lam * var + (1 - lam) * returns[t] ** 2
+            sigma[t + 1] = var
+        sigma = np.sqrt(sigma * annualization)
+    return _like(close, sigma)
+
+
+# the newest estimate from bars, a mapping (or DataFrame) of open, high, low
+# and close arrays; close-to-close and EWMA only need the closes
+def estimate(bars, estimator='yang_zhang', window=20, annualization=TRADING_DAYS):
+    if estimator == 'ewma':
+        sigma = ewma(bars['close'], window=window, annualization=annualization)
+    else:
+        prices = {
+            name: bars[name] if name in ESTIMATOR_INPUTS[estimator] else None
+            for name in ('open', 'high', 'low', 'close')
+        }
+        sigma = _rolling(
+            estimator,
+            window,
+            annualization,
+            prices['open'],
+            prices['high'],
+            prices['low'],
+            prices['close'],
+        )
+    return _values(sigma)[-1]
+
+
+# Live rolling estimate for a set of tickers: update() takes the newest bar
+# (one value per ticker) and returns every ticker's annualized sigma, NaN
+# until the window is full. The window's terms sit in a ring buffer and their
+# running sums are adjusted by the bar entering and the bar leaving, with a
+# full re-sum once per window to keep rounding errors from building up.
+class RollingVolatility:
+    def __init__(
+        self, estimator='yang_zhang', window=20, tickers=1, annualization=TRADING_DAYS
+    ):
+        if window < 2:
+            raise ValueError('window has to be at least 2 bars')
+        _, self._variances = _terms(estimator, *([np.ones(1)] * 5))
+        self.estimator = estimator
+        self.window = window
+        self.annualization = annualization
+        shape = (len(self._variances), window, tickers)
+        self._buffer = np.zeros(shape)
+        self._sum = np.zeros((len(self._variances), tickers))
+        self._sum_sq = np.zeros_like(self._sum)
+        self._count = 0
+        self._prev_close = None
+
+    def update(self, open=None, high=None, low=None, close=None):
+        nan = np.full(self._sum.shape[1], np.nan)
+        open, high, low, close = (
+            nan if x is None else np.asarray(x, dtype=np.float64)
+            for x in (open, high, low, close)
+        )
+        needs_prev = self.estimator in ('close', 'yang_zhang')
+        prev_close, self._prev_close = self._prev_close, close
+        if needs_prev and prev_close is None:
+            return nan
+        terms, _ = _terms(self.estimator, open, high, low, close, prev_close)
+        slot = self._count % self.window
+        terms = np.stack(terms)
+        old = self._buffer[:, slot]
+        if self._count >= self.window:
+            self._sum += terms - old
+            self._sum_sq += terms * terms - old * old
+        else:
+            self._sum += terms
+            self._sum_sq += terms * terms
+        self._buffer[:, slot] = terms
+        self._count += 1
+        if self._count % self.window == 0:
+            self._sum = self._buffer.sum(axis=1)
+            self._sum_sq = (self._buffer * self._buffer).sum(axis=1)
+        if self._count < self.window:
+            return nan
+        moments = [
+            _moment(self._sum[i], self._sum_sq[i], self.window, variance)
+            for i, variance in enumerate(self._variances)
+        ]
+        return np.sqrt(
+            _combine(self.estimator, self.window, moments) * self.annualization
+        )
+
+
+# Live EWMA estimate, matching ewma(): update() takes the newest closes
+class EWMAVolatility:
+    def __init__(self, lam=0.94, window=20, annualization=TRADING_DAYS):
+        self.lam = lam
+        self.window = window
+        self.annualization = annualization
+        self._prev_close = None
+        self._var = None
+        self._seed = []
+
+    def update(self, close):
+        close = np.asarray(close, dtype=np.float64)
+        prev_close, self._prev_close = self._prev_close, close
+        if prev_close is None:
+            return np.full(close.shape, np.nan)
+        squared = np.log(close / prev_close) ** 2
+        if self._var is None:
+            self._seed.append(squared)
+            if len(self._seed) < self.window:
+                return np.full(close.shape, np.nan)
+            self._var = np.mean(self._seed, axis=0)
+            self._seed = None
+        else:
+            self._var = self.lam * self._var + (1 - self.lam) * squared
+        return np.sqrt(self._var * self.annualization)